@@ -1,4 +1,6 @@
+import os
 from app import app
+from app.routes import warm_example_conversions
 
 if __name__ == '__main__':
     # Debugging: Print all registered routes
@@ -6,4 +8,9 @@ if __name__ == '__main__':
     for rule in app.url_map.iter_rules():
         print(f"Endpoint: {rule.endpoint}, Methods: {rule.methods}, Rule: {rule.rule}")
     print("--------------------\n")
+    # Optionally convert every example at startup so that example clicks are cache hits.
+    # The debug reloader runs this script twice; only its child (WERKZEUG_RUN_MAIN) serves requests.
+    warm = os.environ.get('AUTOMATA_WARM_EXAMPLES', '').lower() in ('1', 'true', 'yes')
+    if warm and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_example_conversions()
     app.run(debug=True) 
\ No newline at end of file
@@ -10,5 +10,17 @@ app = Flask(
     static_folder=os.path.join(basedir, 'static')
 )
 
+# Persistent conversion result store, SQLite in the instance folder unless DATABASE_URL is set.
+# Nothing touches the database until the store is first used, see ResultStore.
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', 'sqlite:///' + os.path.join(app.instance_path, 'conversions.db'))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True}
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Wait for another worker's write instead of failing with "database is locked"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS']['connect_args'] = {'timeout': 15}
+
+from .result_store import db
+db.init_app(app)
+
 # Import routes to register them with the app
-from . import routes 
\ No newline at end of file
+from . import routes 
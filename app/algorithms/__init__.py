@@ -5,11 +5,19 @@ This package contains implementations of various automata theory algorithms
 including conversions between regular expressions, NFAs, and DFAs.
 """
 
-from .automata_structures import State, Transition, NFA, DFA, AutomataUtils
+from .automata_structures import State, Transition, NFA, DFA, AutomataUtils, AlphabetPartition
 from .regex_to_dfa import RegexToDFAConverter
+from .regex_to_nfa import RegexToNFAConverter
 from .nfa_to_dfa import NFAToDFAConverter
 from .dfa_to_regex import DFAToRegexConverter
 from .nfa_to_regex import NFAToRegexConverter
+from .dfa_minimization import DFAMinimizer
+from .lazy_dfa import LazyDFAMatcher
+from .regex_ast import RegexBuilder, RegexNode
+from .regex_simplifier import RegexSimplifier
+from .regex_derivatives import DerivativeDFABuilder
+from .equivalence import EquivalenceChecker
+from .step_trace import StepTrace, Snapshot, reconstruct_steps
 
 __all__ = [
     'State',
@@ -17,8 +25,20 @@ __all__ = [
     'NFA',
     'DFA',
     'AutomataUtils',
+    'AlphabetPartition',
     'RegexToDFAConverter',
+    'RegexToNFAConverter',
     'NFAToDFAConverter',
     'DFAToRegexConverter',
-    'NFAToRegexConverter'
+    'NFAToRegexConverter',
+    'DFAMinimizer',
+    'LazyDFAMatcher',
+    'RegexBuilder',
+    'RegexNode',
+    'RegexSimplifier',
+    'DerivativeDFABuilder',
+    'EquivalenceChecker',
+    'StepTrace',
+    'Snapshot',
+    'reconstruct_steps'
 ]
@@ -3,20 +3,200 @@ Core data structures for automata theory algorithms
 """
 
 import json
-from typing import List, Set, Dict, Optional, Any
+from array import array
+from collections.abc import Mapping, ValuesView, ItemsView
+from typing import List, Set, Dict, Optional, Any, Iterable, Iterator, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Symbols that label an epsilon transition
+EPSILON_SYMBOLS = frozenset({'ε', 'epsilon'})
+
+class StateStore(Mapping):
+    """Struct-of-arrays storage for the states of an automaton.
+    
+    Each state is a row across parallel columns (IDs, a flag byte and x/y
+    coordinates). Labels are only stored when they differ from the ID.
+    The store behaves like a ``{state_id: State}`` dict, but ``State``
+    objects are thin views that are created only when they are requested.
+    """
+    
+    START = 1
+    FINAL = 2
+    
+    def __init__(self, states: Iterable['State'] = ()):
+        self._ids: List[Optional[str]] = []
+        self._index: Dict[str, int] = {}
+        self._labels: Dict[int, str] = {}
+        self._flags = bytearray()
+        self._xs = array('i')
+        self._ys = array('i')
+        for state in states:
+            self.add(state)
+    
+    def append(self, state_id: str, label: str = None, is_start: bool = False,
+               is_final: bool = False, x: int = 0, y: int = 0) -> int:
+        """Add a state from raw values and return its row"""
+        row = self._index.get(state_id)
+        if row is None:
+            row = len(self._ids)
+            self._ids.append(state_id)
+            self._index[state_id] = row
+            self._flags.append(0)
+            self._xs.append(0)
+            self._ys.append(0)
+        
+        self._set_label(row, label)
+        self._flags[row] = (self.START if is_start else 0) | (self.FINAL if is_final else 0)
+        self._xs[row] = int(x)
+        self._ys[row] = int(y)
+        return row
+    
+    def add(self, state: 'State'):
+        """Copy a state into the store and rebind the State object to it"""
+        store, row = state._store, state._index
+        new_row = self.append(store._ids[row], store._labels.get(row),
+                              store.is_start(row), store.is_final(row),
+                              store._xs[row], store._ys[row])
+        state._store = self
+        state._index = new_row
+    
+    def remove(self, state_id: str):
+        """Remove a state, leaving a tombstone row behind"""
+        row = self._index.pop(state_id)
+        self._ids[row] = None
+        self._labels.pop(row, None)
+    
+    def row(self, state_id: str) -> Optional[int]:
+        """Get the row of a state, or None if it is not stored"""
+        return self._index.get(state_id)
+    
+    def is_start(self, row: int) -> bool:
+        return bool(self._flags[row] & self.START)
+    
+    def is_final(self, row: int) -> bool:
+        return bool(self._flags[row] & self.FINAL)
+    
+    def set_flag(self, row: int, flag: int, value: bool):
+        if value:
+            self._flags[row] |= flag
+        else:
+            self._flags[row] &= ~flag & 0xFF
+    
+    def label(self, row: int) -> str:
+        return self._labels.get(row, self._ids[row])
+    
+    def _set_label(self, row: int, label: Optional[str]):
+        if label and label != self._ids[row]:
+            self._labels[row] = label
+        else:
+            self._labels.pop(row, None)
+    
+    def set_positions(self, positions: List[Dict[str, int]]):
+        """Assign visualization coordinates to the live states in row order"""
+        rows = (row for row, state_id in enumerate(self._ids) if state_id is not None)
+        for row, position in zip(rows, positions):
+            self._xs[row] = int(position['x'])
+            self._ys[row] = int(position['y'])
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Serialize every state straight from the columns"""
+        labels = self._labels
+        flags = self._flags
+        xs = self._xs
+        ys = self._ys
+        start, final = self.START, self.FINAL
+        return [
+            {
+                'id': state_id,
+                'label': labels.get(row, state_id),
+                'isStart': bool(flags[row] & start),
+                'isFinal': bool(flags[row] & final),
+                'position': {'x': xs[row], 'y': ys[row]}
+            }
+            for row, state_id in enumerate(self._ids) if state_id is not None
+        ]
+    
+    def values(self) -> ValuesView:
+        return _StateValuesView(self)
+    
+    def __getitem__(self, state_id: str) -> 'State':
+        return State._view(self, self._index[state_id])
+    
+    def __iter__(self) -> Iterator[str]:
+        return (state_id for state_id in self._ids if state_id is not None)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, state_id) -> bool:
+        return state_id in self._index
+
+class _StateValuesView(ValuesView):
+    def __iter__(self):
+        store = self._mapping
+        view = State._view
+        return (view(store, row) for row, state_id in enumerate(store._ids) if state_id is not None)
+
 class State:
-    """Represents a state in an automaton"""
+    """Represents a state in an automaton.
+    
+    A State is a view onto one row of a StateStore. States created directly
+    get a private single-row store; adding them to an automaton moves them
+    onto the automaton's store.
+    """
+    
+    __slots__ = ('_store', '_index')
     
     def __init__(self, state_id: str, label: str = None, is_start: bool = False, is_final: bool = False):
-        self.id = state_id
-        self.label = label or state_id
-        self.is_start = is_start
-        self.is_final = is_final
-        self.position = {'x': 0, 'y': 0}  # For visualization
+        self._store = StateStore()
+        self._index = self._store.append(state_id, label, is_start, is_final)
+    
+    @classmethod
+    def _view(cls, store: StateStore, row: int) -> 'State':
+        state = cls.__new__(cls)
+        state._store = store
+        state._index = row
+        return state
+    
+    @property
+    def id(self) -> str:
+        return self._store._ids[self._index]
+    
+    @property
+    def label(self) -> str:
+        return self._store.label(self._index)
+    
+    @label.setter
+    def label(self, value: str):
+        self._store._set_label(self._index, value)
+    
+    @property
+    def is_start(self) -> bool:
+        return self._store.is_start(self._index)
+    
+    @is_start.setter
+    def is_start(self, value: bool):
+        self._store.set_flag(self._index, StateStore.START, value)
+    
+    @property
+    def is_final(self) -> bool:
+        return self._store.is_final(self._index)
+    
+    @is_final.setter
+    def is_final(self, value: bool):
+        self._store.set_flag(self._index, StateStore.FINAL, value)
+    
+    @property
+    def position(self) -> Dict[str, int]:
+        """Coordinates for visualization"""
+        return {'x': self._store._xs[self._index], 'y': self._store._ys[self._index]}
+    
+    @position.setter
+    def position(self, value: Dict[str, int]):
+        self._store._xs[self._index] = int(value['x'])
+        self._store._ys[self._index] = int(value['y'])
     
     def to_dict(self):
         """Convert state to dictionary for JSON serialization"""
@@ -28,6 +208,13 @@ class State:
             'position': self.position
         }
     
+    def __eq__(self, other):
+        return (isinstance(other, State) and self._store is other._store
+                and self._index == other._index)
+    
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+    
     def __str__(self):
         return f"State({self.id}, start={self.is_start}, final={self.is_final})"
     
@@ -37,11 +224,18 @@ class State:
 class Transition:
     """Represents a transition between states"""
     
+    __slots__ = ('from_state', 'to_state', 'symbol', '_id')
+    
     def __init__(self, from_state: str, to_state: str, symbol: str, transition_id: str = None):
         self.from_state = from_state
         self.to_state = to_state
         self.symbol = symbol
-        self.id = transition_id or f"{from_state}-{to_state}-{symbol}"
+        self._id = transition_id
+    
+    @property
+    def id(self) -> str:
+        """Transition ID, derived from the endpoints unless given explicitly"""
+        return self._id or f"{self.from_state}-{self.to_state}-{self.symbol}"
     
     def to_dict(self):
         """Convert transition to dictionary for JSON serialization"""
@@ -58,23 +252,326 @@ class Transition:
     def __repr__(self):
         return self.__str__()
 
+class TransitionStore(Mapping):
+    """Struct-of-arrays transition collection with adjacency indexes.
+    
+    Transitions are rows across parallel from/to/symbol columns, with
+    symbols interned into a small table; explicit IDs are kept sparsely
+    and all other IDs are derived on demand. The store behaves like the
+    ``{transition_id: Transition}`` dict it replaces, creating Transition
+    objects only when they are requested.
+    
+    Outgoing, incoming and ``(state, symbol)`` indexes are built the first
+    time they are queried and are then kept up to date on every add/remove,
+    so neighbor queries cost O(degree) instead of a scan over every
+    transition.
+    """
+    
+    def __init__(self, transitions: Iterable[Transition] = ()):
+        self._from: List[Optional[str]] = []
+        self._to: List[Optional[str]] = []
+        self._symbol = array('i')
+        self._symbols: List[str] = []
+        self._symbol_index: Dict[str, int] = {}
+        self._explicit_ids: Dict[int, str] = {}
+        self._rows_by_explicit_id: Dict[str, int] = {}
+        self._count = 0
+        self._reset_indexes()
+        for transition in transitions:
+            self.add(transition)
+    
+    def _reset_indexes(self):
+        """Drop the lazily built indexes; they are rebuilt on the next query"""
+        self._outgoing: Optional[Dict[str, List[int]]] = None
+        self._incoming: Optional[Dict[str, List[int]]] = None
+        self._targets: Optional[Dict[Tuple[str, str], List[str]]] = None
+        self._rows_by_id: Optional[Dict[str, int]] = None
+    
+    def _live_rows(self) -> Iterator[int]:
+        return (row for row, from_state in enumerate(self._from) if from_state is not None)
+    
+    def _intern_symbol(self, symbol: str) -> int:
+        index = self._symbol_index.get(symbol)
+        if index is None:
+            index = len(self._symbols)
+            self._symbols.append(symbol)
+            self._symbol_index[symbol] = index
+        return index
+    
+    def _row_id(self, row: int) -> str:
+        explicit = self._explicit_ids.get(row)
+        if explicit is not None:
+            return explicit
+        return f"{self._from[row]}-{self._to[row]}-{self._symbols[self._symbol[row]]}"
+    
+    def _find_row(self, transition_id: str) -> Optional[int]:
+        row = self._rows_by_explicit_id.get(transition_id)
+        if row is not None:
+            return row
+        if self._rows_by_id is None:
+            self._rows_by_id = {self._row_id(r): r for r in self._live_rows()}
+        return self._rows_by_id.get(transition_id)
+    
+    def _find_duplicate(self, from_state: str, to_state: str, symbol: str) -> Optional[int]:
+        symbol_index = self._symbol_index.get(symbol)
+        if symbol_index is None:
+            return None
+        to_column = self._to
+        symbol_column = self._symbol
+        explicit = self._explicit_ids
+        for row in self._outgoing_index().get(from_state, ()):
+            if to_column[row] == to_state and symbol_column[row] == symbol_index and row not in explicit:
+                return row
+        return None
+    
+    def add(self, transition: Transition):
+        """Add a transition, replacing any existing one with the same ID"""
+        self.append(transition.from_state, transition.to_state, transition.symbol, transition._id)
+    
+    def append(self, from_state: str, to_state: str, symbol: str, transition_id: str = None,
+               check_duplicates: bool = True) -> int:
+        """Add a transition from raw values and return its row.
+        
+        Transitions are identified by their explicit ID if they have one and
+        by (from, to, symbol) otherwise; adding a transition that is already
+        present replaces it. Bulk builders that never produce duplicates can
+        pass ``check_duplicates=False`` to skip the lookup.
+        """
+        row = None
+        if check_duplicates:
+            if transition_id is not None:
+                row = self._rows_by_explicit_id.get(transition_id)
+            else:
+                row = self._find_duplicate(from_state, to_state, symbol)
+                if row is not None:
+                    return row
+        
+        if row is not None:
+            # Replace in place so the transition keeps its position
+            self._remove_row(row)
+            self._from[row] = from_state
+            self._to[row] = to_state
+            self._symbol[row] = self._intern_symbol(symbol)
+        else:
+            row = len(self._from)
+            self._from.append(from_state)
+            self._to.append(to_state)
+            self._symbol.append(self._intern_symbol(symbol))
+        self._count += 1
+        if transition_id is not None:
+            self._explicit_ids[row] = transition_id
+            self._rows_by_explicit_id[transition_id] = row
+        
+        if self._outgoing is not None:
+            self._outgoing.setdefault(from_state, []).append(row)
+        if self._incoming is not None:
+            self._incoming.setdefault(to_state, []).append(row)
+        if self._targets is not None:
+            self._targets.setdefault((from_state, symbol), []).append(to_state)
+        if self._rows_by_id is not None:
+            self._rows_by_id[self._row_id(row)] = row
+        return row
+    
+    def _remove_row(self, row: int) -> Transition:
+        transition = self._transition(row)
+        from_state = self._from[row]
+        to_state = self._to[row]
+        
+        if self._outgoing is not None:
+            rows = self._outgoing[from_state]
+            rows.remove(row)
+            if not rows:
+                del self._outgoing[from_state]
+        if self._incoming is not None:
+            rows = self._incoming[to_state]
+            rows.remove(row)
+            if not rows:
+                del self._incoming[to_state]
+        if self._targets is not None:
+            key = (from_state, transition.symbol)
+            targets = self._targets[key]
+            targets.remove(to_state)
+            if not targets:
+                del self._targets[key]
+        if self._rows_by_id is not None:
+            self._rows_by_id.pop(transition.id, None)
+        explicit = self._explicit_ids.pop(row, None)
+        if explicit is not None:
+            del self._rows_by_explicit_id[explicit]
+        
+        self._from[row] = None
+        self._to[row] = None
+        self._count -= 1
+        return transition
+    
+    def _compact(self):
+        """Drop tombstone rows once they make up most of the columns"""
+        if len(self._from) <= 64 or self._count * 2 >= len(self._from):
+            return
+        live = list(self._live_rows())
+        new_rows = {old: new for new, old in enumerate(live)}
+        self._from = [self._from[row] for row in live]
+        self._to = [self._to[row] for row in live]
+        self._symbol = array('i', (self._symbol[row] for row in live))
+        self._explicit_ids = {new_rows[row]: tid for row, tid in self._explicit_ids.items()}
+        self._rows_by_explicit_id = {tid: row for row, tid in self._explicit_ids.items()}
+        self._reset_indexes()
+    
+    def remove(self, transition_id: str) -> Transition:
+        """Remove a transition by ID and return it"""
+        row = self._find_row(transition_id)
+        if row is None:
+            raise KeyError(transition_id)
+        transition = self._remove_row(row)
+        self._compact()
+        return transition
+    
+    def remove_state(self, state_id: str) -> List[Transition]:
+        """Remove every transition entering or leaving a state"""
+        touching = dict.fromkeys(self._outgoing_index().get(state_id, []))
+        touching.update(dict.fromkeys(self._incoming_index().get(state_id, [])))
+        removed = [self._remove_row(row) for row in touching]
+        self._compact()
+        return removed
+    
+    def _outgoing_index(self) -> Dict[str, List[int]]:
+        if self._outgoing is None:
+            self._outgoing = {}
+            for row in self._live_rows():
+                self._outgoing.setdefault(self._from[row], []).append(row)
+        return self._outgoing
+    
+    def _incoming_index(self) -> Dict[str, List[int]]:
+        if self._incoming is None:
+            self._incoming = {}
+            for row in self._live_rows():
+                self._incoming.setdefault(self._to[row], []).append(row)
+        return self._incoming
+    
+    def _targets_index(self) -> Dict[Tuple[str, str], List[str]]:
+        if self._targets is None:
+            self._targets = {}
+            symbols = self._symbols
+            for row in self._live_rows():
+                key = (self._from[row], symbols[self._symbol[row]])
+                self._targets.setdefault(key, []).append(self._to[row])
+        return self._targets
+    
+    def _transition(self, row: int) -> Transition:
+        return Transition(self._from[row], self._to[row], self._symbols[self._symbol[row]],
+                          self._explicit_ids.get(row))
+    
+    def outgoing(self, state_id: str) -> List[Transition]:
+        """Get all transitions leaving a state"""
+        return [self._transition(row) for row in self._outgoing_index().get(state_id, ())]
+    
+    def incoming(self, state_id: str) -> List[Transition]:
+        """Get all transitions entering a state"""
+        return [self._transition(row) for row in self._incoming_index().get(state_id, ())]
+    
+    def targets(self, state_id: str, symbol: str) -> List[str]:
+        """Get destination states for transitions from state on symbol"""
+        return self._targets_index().get((state_id, symbol), [])
+    
+    def columns(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate (from, to, symbol) rows without creating Transition objects"""
+        symbols = self._symbols
+        symbol_column = self._symbol
+        to_column = self._to
+        return (
+            (from_state, to_column[row], symbols[symbol_column[row]])
+            for row, from_state in enumerate(self._from) if from_state is not None
+        )
+    
+    def to_dicts(self) -> List[Dict[str, str]]:
+        """Serialize every transition straight from the columns"""
+        explicit = self._explicit_ids
+        symbols = self._symbols
+        symbol_column = self._symbol
+        to_column = self._to
+        result = []
+        for row, from_state in enumerate(self._from):
+            if from_state is None:
+                continue
+            to_state = to_column[row]
+            symbol = symbols[symbol_column[row]]
+            result.append({
+                'id': explicit.get(row) or f"{from_state}-{to_state}-{symbol}",
+                'from': from_state,
+                'to': to_state,
+                'symbol': symbol
+            })
+        return result
+    
+    def values(self) -> ValuesView:
+        return _TransitionValuesView(self)
+    
+    def items(self) -> ItemsView:
+        return _TransitionItemsView(self)
+    
+    def __getitem__(self, transition_id: str) -> Transition:
+        row = self._find_row(transition_id)
+        if row is None:
+            raise KeyError(transition_id)
+        return self._transition(row)
+    
+    def __iter__(self) -> Iterator[str]:
+        return (self._row_id(row) for row in self._live_rows())
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __contains__(self, transition_id) -> bool:
+        return self._find_row(transition_id) is not None
+
+class _TransitionValuesView(ValuesView):
+    def __iter__(self):
+        store = self._mapping
+        return (store._transition(row) for row in store._live_rows())
+
+class _TransitionItemsView(ItemsView):
+    def __iter__(self):
+        store = self._mapping
+        return ((store._row_id(row), store._transition(row)) for row in store._live_rows())
+
 class Automaton:
     """Base class for automata"""
     
-    def __init__(self, states: List[State], transitions: List[Transition], alphabet: List[str]):
-        self.states = {state.id: state for state in states}
-        self.transitions = {trans.id: trans for trans in transitions}
+    def __init__(self, states: Iterable[State], transitions: Iterable[Transition], alphabet: List[str]):
+        # Builders that fill a store directly can hand it over as-is
+        self.states = states if isinstance(states, StateStore) else StateStore(states)
+        self.transitions = transitions if isinstance(transitions, TransitionStore) else TransitionStore(transitions)
         self.alphabet = set(alphabet)
-        self._build_transition_map()
     
-    def _build_transition_map(self):
-        """Build transition lookup map for efficient access"""
-        self.transition_map = {}
-        for transition in self.transitions.values():
-            key = (transition.from_state, transition.symbol)
-            if key not in self.transition_map:
-                self.transition_map[key] = []
-            self.transition_map[key].append(transition.to_state)
+    @property
+    def transition_map(self) -> Dict[Tuple[str, str], List[str]]:
+        """Lookup map from (state, symbol) to destination states"""
+        return self.transitions._targets_index()
+    
+    def _invalidate(self):
+        """Drop anything derived from the states or transitions"""
+    
+    def add_state(self, state: State):
+        """Add a state (replacing any state with the same ID)"""
+        self.states.add(state)
+        self._invalidate()
+    
+    def remove_state(self, state_id: str):
+        """Remove a state together with all transitions touching it"""
+        self.states.remove(state_id)
+        self.transitions.remove_state(state_id)
+        self._invalidate()
+    
+    def add_transition(self, transition: Transition):
+        """Add a transition (replacing any transition with the same ID)"""
+        self.transitions.add(transition)
+        self._invalidate()
+    
+    def remove_transition(self, transition_id: str) -> Transition:
+        """Remove a transition by ID"""
+        transition = self.transitions.remove(transition_id)
+        self._invalidate()
+        return transition
     
     def get_state(self, state_id: str) -> Optional[State]:
         """Get state by ID"""
@@ -82,21 +579,21 @@ class Automaton:
     
     def get_transitions_from(self, state_id: str) -> List[Transition]:
         """Get all transitions from a given state"""
-        return [t for t in self.transitions.values() if t.from_state == state_id]
+        return self.transitions.outgoing(state_id)
     
     def get_transitions_to(self, state_id: str) -> List[Transition]:
         """Get all transitions to a given state"""
-        return [t for t in self.transitions.values() if t.to_state == state_id]
+        return self.transitions.incoming(state_id)
     
     def get_transitions_on_symbol(self, state_id: str, symbol: str) -> List[str]:
         """Get destination states for transitions from state on symbol"""
-        return self.transition_map.get((state_id, symbol), [])
+        return self.transitions.targets(state_id, symbol)
     
     def to_dict(self):
         """Convert automaton to dictionary for JSON serialization"""
         return {
-            'states': [state.to_dict() for state in self.states.values()],
-            'transitions': [trans.to_dict() for trans in self.transitions.values()],
+            'states': self.states.to_dicts(),
+            'transitions': self.transitions.to_dicts(),
             'alphabet': list(self.alphabet)
         }
     
@@ -121,20 +618,170 @@ class NFA(Automaton):
         for state_id in self.final_states:
             if state_id in self.states:
                 self.states[state_id].is_final = True
+        
+        self._invalidate()
+    
+    def _invalidate(self):
+        """Drop the state bit numbering and the precomputed closures"""
+        self._state_order = None
+        self._state_bits = None
+        self._closures = None
+        self._successors = None
+    
+    def state_bits(self) -> Dict[str, int]:
+        """Map every state ID to its bit number in state-set bitmasks.
+        
+        States are numbered in order, followed by any IDs that only appear
+        as transition endpoints or start/final states.
+        """
+        if self._state_bits is None:
+            order = list(self.states)
+            bits = {state_id: i for i, state_id in enumerate(order)}
+            for from_state, to_state, _ in self.transitions.columns():
+                for state_id in (from_state, to_state):
+                    if state_id not in bits:
+                        bits[state_id] = len(order)
+                        order.append(state_id)
+            for state_id in [*self.start_states, *self.final_states]:
+                if state_id not in bits:
+                    bits[state_id] = len(order)
+                    order.append(state_id)
+            self._state_order = order
+            self._state_bits = bits
+        return self._state_bits
+    
+    def states_to_mask(self, states: Iterable[str]) -> int:
+        """Convert a collection of state IDs to a bitmask"""
+        bits = self.state_bits()
+        mask = 0
+        for state_id in states:
+            bit = bits.get(state_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+    
+    def mask_to_states(self, mask: int) -> Set[str]:
+        """Convert a bitmask back to a set of state IDs"""
+        self.state_bits()
+        order = self._state_order
+        return {order[bit] for bit in AutomataUtils.bits(mask)}
+    
+    def epsilon_closure_masks(self) -> List[int]:
+        """Get the ε-closure of every state as a bitmask, indexed by bit number.
+        
+        The closures are computed once with an iterative Tarjan pass over the
+        ε-transition graph: states in one strongly connected component share
+        a closure, and Tarjan emits components in reverse topological order,
+        so each component's closure is its own members OR-ed with the already
+        finished closures of the components it points to.
+        """
+        if self._closures is not None:
+            return self._closures
+        
+        bits = self.state_bits()
+        n = len(self._state_order)
+        graph = [[] for _ in range(n)]
+        for from_state, to_state, symbol in self.transitions.columns():
+            if symbol in EPSILON_SYMBOLS:
+                graph[bits[from_state]].append(bits[to_state])
+        
+        closures = [0] * n
+        indices = [-1] * n
+        low = [0] * n
+        component = [-1] * n
+        on_stack = bytearray(n)
+        stack = []
+        counter = 0
+        components = 0
+        
+        for root in range(n):
+            if indices[root] != -1:
+                continue
+            indices[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, 0)]
+            
+            while work:
+                v, i = work[-1]
+                edges = graph[v]
+                if i < len(edges):
+                    work[-1] = (v, i + 1)
+                    w = edges[i]
+                    if indices[w] == -1:
+                        indices[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        work.append((w, 0))
+                    elif on_stack[w] and indices[w] < low[v]:
+                        low[v] = indices[w]
+                    continue
+                
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] != indices[v]:
+                    continue
+                
+                # v is the root of a finished component: pop and close it
+                members = []
+                mask = 0
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = components
+                    members.append(w)
+                    mask |= 1 << w
+                    if w == v:
+                        break
+                for w in members:
+                    for x in graph[w]:
+                        if component[x] != components:
+                            mask |= closures[x]
+                for w in members:
+                    closures[w] = mask
+                components += 1
+        
+        self._closures = closures
+        return closures
+    
+    def closure_mask(self, mask: int) -> int:
+        """ε-closure of a state set given as a bitmask"""
+        closures = self.epsilon_closure_masks()
+        result = mask
+        for bit in AutomataUtils.bits(mask):
+            result |= closures[bit]
+        return result
     
     def epsilon_closure(self, states: Set[str]) -> Set[str]:
         """Compute epsilon closure of a set of states"""
-        closure = set(states)
-        stack = list(states)
-        
-        while stack:
-            current = stack.pop()
-            for transition in self.get_transitions_from(current):
-                if transition.symbol in ['ε', 'epsilon'] and transition.to_state not in closure:
-                    closure.add(transition.to_state)
-                    stack.append(transition.to_state)
+        return self.mask_to_states(self.closure_mask(self.states_to_mask(states)))
+    
+    def symbol_successor_masks(self) -> Dict[str, List[int]]:
+        """For every non-ε symbol, the ε-closed successor mask of each state.
         
-        return closure
+        ``successors[symbol][bit]`` is the ε-closure of the states reachable
+        from state ``bit`` on ``symbol``, so the successor of a whole state
+        set is the OR of its members' entries.
+        """
+        if self._successors is None:
+            closures = self.epsilon_closure_masks()
+            bits = self._state_bits
+            n = len(closures)
+            successors = {}
+            for from_state, to_state, symbol in self.transitions.columns():
+                if symbol in EPSILON_SYMBOLS:
+                    continue
+                row = successors.get(symbol)
+                if row is None:
+                    row = successors[symbol] = [0] * n
+                row[bits[from_state]] |= closures[bits[to_state]]
+            self._successors = successors
+        return self._successors
     
     def to_dict(self):
         """Convert NFA to dictionary"""
@@ -162,6 +809,37 @@ class DFA(Automaton):
         for state_id in self.final_states:
             if state_id in self.states:
                 self.states[state_id].is_final = True
+        
+        self._compiled = None
+    
+    @property
+    def start_state(self) -> str:
+        return self._start_state
+    
+    @start_state.setter
+    def start_state(self, state_id: str):
+        self._start_state = state_id
+        self._invalidate()
+    
+    @property
+    def final_states(self) -> Set[str]:
+        """Accepting state IDs; call _invalidate() after changing the set in place"""
+        return self._final_states
+    
+    @final_states.setter
+    def final_states(self, state_ids: Iterable[str]):
+        self._final_states = set(state_ids)
+        self._invalidate()
+    
+    def _invalidate(self):
+        """Drop the cached compiled table after a structural change"""
+        self._compiled = None
+    
+    def compile(self) -> 'CompiledDFA':
+        """Get the dense transition table form of this DFA (built once, then cached)"""
+        if self._compiled is None:
+            self._compiled = CompiledDFA(self)
+        return self._compiled
     
     def get_transition(self, state_id: str, symbol: str) -> Optional[str]:
         """Get the single destination state for DFA transition"""
@@ -170,19 +848,11 @@ class DFA(Automaton):
     
     def accepts(self, input_string: str) -> bool:
         """Check if the DFA accepts the given input string"""
-        current_state = self.start_state
-        
-        for symbol in input_string:
-            if symbol not in self.alphabet:
-                return False
-            
-            next_state = self.get_transition(current_state, symbol)
-            if next_state is None:
-                return False
-            
-            current_state = next_state
-        
-        return current_state in self.final_states
+        return self.compile().accepts(input_string)
+    
+    def accepts_many(self, input_strings: Iterable[str]) -> List[bool]:
+        """Check a batch of input strings, returning one result per string"""
+        return self.compile().accepts_many(input_strings)
     
     def to_dict(self):
         """Convert DFA to dictionary"""
@@ -194,9 +864,188 @@ class DFA(Automaton):
         })
         return data
 
+class AlphabetPartition:
+    """Partition of an alphabet into classes of interchangeable symbols.
+    
+    Symbols with equal signatures (everything an automaton can observe
+    about them, such as their transitions) cannot be told apart, so
+    algorithms can work with one column per class and map symbols to
+    classes only when reading input. Classes are ordered by their smallest
+    symbol, and symbols within a class are sorted.
+    """
+    
+    def __init__(self, signatures: Dict[str, Any]):
+        groups = {}
+        for symbol in sorted(signatures):
+            groups.setdefault(signatures[symbol], []).append(symbol)
+        self.classes: List[List[str]] = list(groups.values())
+        self.class_of: Dict[str, int] = {
+            symbol: i for i, members in enumerate(self.classes) for symbol in members
+        }
+    
+    def __len__(self) -> int:
+        return len(self.classes)
+
+class CompiledDFA:
+    """DFA compiled to a dense integer transition table.
+    
+    States are interned to small integers, and symbols that move every
+    state the same way share one column (see AlphabetPartition), so the
+    table grows with the number of symbol classes rather than the alphabet.
+    Transitions are stored row-major in a flat ``array`` so that
+    ``next[state, column]`` is a single index operation, and
+    ``symbol_index`` maps a symbol to its column. Two extra indices make
+    the table total:
+    
+    * column ``num_classes`` stands for any character outside the alphabet;
+    * state ``dead`` is a non-accepting sink that every missing transition
+      (and every out-of-alphabet character) leads to.
+    """
+    
+    def __init__(self, dfa: 'DFA'):
+        self.state_ids = list(dfa.states.keys())
+        self.state_index = {state_id: i for i, state_id in enumerate(self.state_ids)}
+        self.symbols = sorted(dfa.alphabet)
+        self.num_states = len(self.state_ids)
+        self.dead = self.num_states
+        
+        # Keep the first transition seen per (state, symbol), as DFA.get_transition does
+        moves = {symbol: {} for symbol in self.symbols}
+        for from_state, to_state, symbol in dfa.transitions.columns():
+            row = self.state_index.get(from_state)
+            target = self.state_index.get(to_state)
+            symbol_moves = moves.get(symbol)
+            if row is None or target is None or symbol_moves is None:
+                continue
+            symbol_moves.setdefault(row, target)
+        
+        self.partition = AlphabetPartition({
+            symbol: frozenset(symbol_moves.items()) for symbol, symbol_moves in moves.items()
+        })
+        self.symbol_index = self.partition.class_of
+        self.class_symbols = self.partition.classes
+        self.num_classes = len(self.class_symbols)
+        self.width = self.num_classes + 1
+        
+        width = self.width
+        table = array('i', [self.dead]) * ((self.num_states + 1) * width)
+        for column, members in enumerate(self.class_symbols):
+            for row, target in moves[members[0]].items():
+                table[row * width + column] = target
+        self.table = table
+        
+        self.accepting = bytearray(self.num_states + 1)
+        for state_id in dfa.final_states:
+            index = self.state_index.get(state_id)
+            if index is not None:
+                self.accepting[index] = 1
+        
+        self.start = self.state_index.get(dfa.start_state, self.dead)
+    
+    def next_state(self, state: int, symbol: str) -> int:
+        """Get the successor of an interned state on a symbol"""
+        column = self.symbol_index.get(symbol, self.num_classes)
+        return self.table[state * self.width + column]
+    
+    def encode(self, input_string: str) -> List[int]:
+        """Map each character of a string to its column"""
+        lookup = self.symbol_index.get
+        other = self.num_classes
+        return [lookup(char, other) for char in input_string]
+    
+    def run(self, input_string: str) -> int:
+        """Return the interned state reached after reading the whole string"""
+        table = self.table
+        width = self.width
+        dead = self.dead
+        state = self.start
+        for column in self.encode(input_string):
+            state = table[state * width + column]
+            if state == dead:
+                break
+        return state
+    
+    def state_id(self, state: int) -> Optional[str]:
+        """Map an interned state back to its DFA state ID (None for the dead state)"""
+        return self.state_ids[state] if state < self.num_states else None
+    
+    def accepts(self, input_string: str) -> bool:
+        """Check if the DFA accepts the given input string"""
+        return bool(self.accepting[self.run(input_string)])
+    
+    def run_many(self, input_strings: Iterable[str]) -> List[int]:
+        """Return the final interned state for every string in a batch.
+        
+        All strings advance together one character per step, and strings
+        that fall into the dead state are dropped from the active set, so
+        each step only touches the strings that can still be accepted.
+        """
+        encoded = [self.encode(s) for s in input_strings]
+        finals = [self.start] * len(encoded)
+        table = self.table
+        width = self.width
+        dead = self.dead
+        
+        active = [i for i, symbols in enumerate(encoded) if symbols]
+        step = 0
+        while active:
+            still_active = []
+            for i in active:
+                symbols = encoded[i]
+                state = table[finals[i] * width + symbols[step]]
+                finals[i] = state
+                if state != dead and step + 1 < len(symbols):
+                    still_active.append(i)
+            active = still_active
+            step += 1
+        
+        return finals
+    
+    def accepts_many(self, input_strings: Iterable[str]) -> List[bool]:
+        """Check a batch of input strings, returning one result per string"""
+        accepting = self.accepting
+        return [bool(accepting[state]) for state in self.run_many(input_strings)]
+
 class AutomataUtils:
     """Utility functions for automata operations"""
     
+    # Bit numbers set in each byte value, for walking large bitmasks
+    _BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+    
+    @staticmethod
+    def bits(mask: int) -> List[int]:
+        """List the set bit numbers of a bitmask in increasing order"""
+        count = bin(mask).count('1')
+        if count <= 1:
+            return [mask.bit_length() - 1] if count else []
+        if count <= 8:
+            result = []
+            while mask:
+                low = mask & -mask
+                result.append(low.bit_length() - 1)
+                mask ^= low
+            return result
+        
+        result = []
+        byte_bits = AutomataUtils._BYTE_BITS
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        for offset, value in enumerate(data):
+            if value:
+                base = offset * 8
+                result.extend(base + bit for bit in byte_bits[value])
+        return result
+    
+    @staticmethod
+    def mask(bit_numbers: Iterable[int]) -> int:
+        """Build a bitmask from bit numbers in a single pass over a byte buffer"""
+        bit_numbers = list(bit_numbers)
+        if not bit_numbers:
+            return 0
+        data = bytearray(max(bit_numbers) // 8 + 1)
+        for bit in bit_numbers:
+            data[bit >> 3] |= 1 << (bit & 7)
+        return int.from_bytes(data, 'little')
+    
     @staticmethod
     def validate_automaton(automaton: Automaton) -> List[str]:
         """Validate automaton structure and return list of errors"""
@@ -205,7 +1054,9 @@ class AutomataUtils:
         if not automaton.states:
             errors.append("Automaton must have at least one state")
         
-        if not automaton.alphabet:
+        # Only ε-moves need no alphabet, as in the NFA for the regex ε
+        if not automaton.alphabet and any(transition.symbol not in EPSILON_SYMBOLS
+                                          for transition in automaton.transitions.values()):
             errors.append("Automaton must have non-empty alphabet")
         
         # Check transitions reference valid states
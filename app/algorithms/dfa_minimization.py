@@ -0,0 +1,169 @@
+"""
+DFA minimization using Hopcroft's partition refinement algorithm
+"""
+
+from collections import deque
+from typing import List, Dict, Any
+from .automata_structures import DFA, StateStore, TransitionStore, AutomataUtils
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DFAMinimizer:
+    """Minimize a DFA by merging indistinguishable states.
+    
+    The DFA is first completed with an explicit dead state (missing
+    transitions lead there), restricted to the states reachable from the
+    start state, and then refined with Hopcroft's algorithm in
+    O(n·k·log n), where k counts symbol classes rather than symbols.
+    States that end up equivalent to the dead state can never lead to
+    acceptance, so they are dropped from the result together with the
+    transitions into them.
+    """
+    
+    def __init__(self, dfa: DFA):
+        self.dfa = dfa
+        self.merged_states = {}  # Representative state ID -> merged state IDs
+    
+    def minimize(self) -> DFA:
+        """Return the minimal DFA accepting the same language"""
+        compiled = self.dfa.compile()
+        reachable = self.find_reachable(compiled)
+        block_of = self.refine(compiled, reachable)
+        return self.build_minimal_dfa(compiled, reachable, block_of)
+    
+    def find_reachable(self, compiled) -> List[int]:
+        """List the interned states reachable from the start state, in BFS order"""
+        table = compiled.table
+        width = compiled.width
+        seen = bytearray(compiled.num_states + 1)
+        seen[compiled.start] = 1
+        order = [compiled.start]
+        queue = deque(order)
+        
+        while queue:
+            state = queue.popleft()
+            base = state * width
+            for column in range(compiled.num_classes):
+                target = table[base + column]
+                if not seen[target]:
+                    seen[target] = 1
+                    order.append(target)
+                    queue.append(target)
+        
+        # Keep the dead state in the partition so partial DFAs refine correctly
+        if not seen[compiled.dead]:
+            order.append(compiled.dead)
+        return order
+    
+    def refine(self, compiled, reachable: List[int]) -> Dict[int, int]:
+        """Hopcroft partition refinement over the reachable states; maps each state to its block"""
+        table = compiled.table
+        width = compiled.width
+        num_classes = compiled.num_classes
+        accepting = compiled.accepting
+        
+        # Inverse transitions: inverse[column][target] -> sources
+        inverse = [dict() for _ in range(num_classes)]
+        for state in reachable:
+            base = state * width
+            for column in range(num_classes):
+                inverse[column].setdefault(table[base + column], []).append(state)
+        
+        finals = {state for state in reachable if accepting[state]}
+        non_finals = {state for state in reachable if not accepting[state]}
+        blocks = [block for block in (finals, non_finals) if block]
+        block_of = {}
+        for index, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = index
+        
+        # Start from the smaller initial block on every symbol
+        smallest = min(range(len(blocks)), key=lambda index: len(blocks[index]))
+        worklist = {(smallest, column) for column in range(num_classes)}
+        
+        while worklist:
+            splitter, column = worklist.pop()
+            predecessors = inverse[column]
+            touched = {}
+            for state in blocks[splitter]:
+                for source in predecessors.get(state, ()):
+                    touched.setdefault(block_of[source], set()).add(source)
+            
+            for block_index, hit in touched.items():
+                block = blocks[block_index]
+                if len(hit) == len(block):
+                    continue
+                
+                # Split: the hit states move into a new block
+                block -= hit
+                new_index = len(blocks)
+                blocks.append(hit)
+                for state in hit:
+                    block_of[state] = new_index
+                
+                for column in range(num_classes):
+                    if (block_index, column) in worklist:
+                        worklist.add((new_index, column))
+                    elif len(hit) <= len(block):
+                        worklist.add((new_index, column))
+                    else:
+                        worklist.add((block_index, column))
+        
+        return block_of
+    
+    def build_minimal_dfa(self, compiled, reachable: List[int], block_of: Dict[int, int]) -> DFA:
+        """Build the quotient DFA, naming each block after its first-discovered state"""
+        dead_block = block_of[compiled.dead]
+        start_block = block_of[compiled.start]
+        table = compiled.table
+        width = compiled.width
+        
+        # Blocks in BFS discovery order of their first member
+        representatives = {}
+        for state in reachable:
+            block_index = block_of[state]
+            if block_index not in representatives and (block_index != dead_block or block_index == start_block):
+                representatives[block_index] = state
+        
+        block_ids = {index: compiled.state_ids[state] if state != compiled.dead else 'dead'
+                     for index, state in representatives.items()}
+        
+        self.merged_states = {state_id: [] for state_id in block_ids.values()}
+        for state in reachable:
+            block_index = block_of[state]
+            if block_index in block_ids and state != compiled.dead:
+                self.merged_states[block_ids[block_index]].append(compiled.state_ids[state])
+        
+        states = StateStore()
+        final_states = []
+        for index, state_id in block_ids.items():
+            is_final = bool(compiled.accepting[representatives[index]])
+            states.append(state_id, state_id, index == start_block, is_final)
+            if is_final:
+                final_states.append(state_id)
+        
+        transitions = TransitionStore()
+        for index, state_id in block_ids.items():
+            base = representatives[index] * width
+            for column, members in enumerate(compiled.class_symbols):
+                target_block = block_of[table[base + column]]
+                if target_block == dead_block:
+                    continue
+                for symbol in members:
+                    transitions.append(state_id, block_ids[target_block], symbol, check_duplicates=False)
+        
+        minimized = DFA(states, transitions, list(self.dfa.alphabet), block_ids[start_block], final_states)
+        minimized.states.set_positions(AutomataUtils.generate_state_positions(len(block_ids)))
+        
+        logger.debug(f"Minimized DFA from {len(self.dfa.states)} to {len(block_ids)} states")
+        return minimized
+    
+    def summary(self, minimized: DFA) -> Dict[str, Any]:
+        """Describe the minimization for a conversion step"""
+        return {
+            'statesBefore': len(self.dfa.states),
+            'statesAfter': len(minimized.states),
+            'mergedStates': {state_id: members for state_id, members in self.merged_states.items()
+                             if len(members) > 1}
+        }
@@ -2,177 +2,288 @@
 DFA to Regular Expression conversion using state elimination algorithm
 """
 
-from typing import List, Set, Dict, Optional, Any
+from typing import List, Set, Dict, Optional, Any, Tuple, Union, Iterator, Generator
 from .automata_structures import DFA, State, Transition, AutomataUtils
+from .dfa_minimization import DFAMinimizer
+from .regex_ast import RegexBuilder, RegexNode
+from .regex_simplifier import RegexSimplifier
+from .step_trace import StepTrace, Snapshot, DEFAULT_TRACE_DETAIL, collect_steps
 import logging
 
 logger = logging.getLogger(__name__)
 
 class GeneralizedNFA:
-    """Generalized NFA for state elimination"""
+    """Generalized NFA for state elimination.
+    
+    Edge labels are hash-consed RegexNode terms, so rerouting a path around
+    an eliminated state shares the existing labels instead of copying their
+    text. Edges are indexed by source and by target, so eliminating a state
+    only touches the edges incident to it. Missing edges stand for ∅.
+    """
     
     def __init__(self):
-        self.states = set()
-        self.transitions = {}  # (from, to) -> regex
+        self.states = {}  # Insertion-ordered set, so ties are broken the same way on every run
+        self.regex = RegexBuilder()
+        self.outgoing = {}  # from -> {to: regex}
+        self.incoming = {}  # to -> {from: regex}
         self.start_state = None
         self.final_state = None
+        self._scc_rank = None
+        self._labels: Dict[int, str] = {}  # Rendered text of edge labels, by node ID
     
-    def _concatenate_regex(self, r1: str, r2: str) -> str:
-        """Helper to concatenate regexes with proper handling of ∅ and ε."""
-        if r1 == '∅' or r2 == '∅':
-            return '∅'
-        if r1 == 'ε':
-            return r2
-        if r2 == 'ε':
-            return r1
-
-        # Add parentheses if the regex contains union and is part of a concatenation
-        if '|' in r1 and len(r1) > 1 and not (r1.startswith('(') and r1.endswith(')')):
-            r1 = f"({r1})"
-        if '|' in r2 and len(r2) > 1 and not (r2.startswith('(') and r2.endswith(')')):
-            r2 = f"({r2})"
-
-        return r1 + r2
-    
-    def _union_regex(self, r1: str, r2: str) -> str:
-        """Helper to union regexes with proper handling of ∅ and ε."""
-        if r1 == '∅':
-            return r2
-        if r2 == '∅':
-            return r1
-        if r1 == 'ε' and r2 == 'ε': # Redundant, but explicit
-            return 'ε'
-        if r1 == r2:
-            return r1 # Avoid redundant union like a|a
-
-        # Canonicalize order for consistent representation
-        if r1 > r2:
-            r1, r2 = r2, r1
-
-        return f"({r1}|{r2})"
+    @property
+    def transitions(self) -> Dict[Tuple[str, str], RegexNode]:
+        """All edges as a (from, to) -> regex mapping"""
+        return {
+            (from_state, to_state): regex
+            for from_state, targets in self.outgoing.items()
+            for to_state, regex in targets.items()
+        }
     
     def add_state(self, state_id: str):
         """Add state to GNFA"""
-        self.states.add(state_id)
+        self.states[state_id] = None
+        self.outgoing.setdefault(state_id, {})
+        self.incoming.setdefault(state_id, {})
     
-    def add_transition(self, from_state: str, to_state: str, regex: str):
-        """Add transition with regex label"""
-        key = (from_state, to_state)
-        if key in self.transitions:
-            self.transitions[key] = self._union_regex(self.transitions[key], regex)
-        else:
-            self.transitions[key] = regex
+    def add_transition(self, from_state: str, to_state: str, regex: Union[str, RegexNode]):
+        """Add transition with regex label, unioned with any existing label"""
+        regex = self.regex.term(regex)
+        targets = self.outgoing[from_state]
+        existing = targets.get(to_state)
+        if existing is not None:
+            regex = self.regex.union(existing, regex)
+        elif regex is self.regex.empty:
+            return
+        targets[to_state] = regex
+        self.incoming[to_state][from_state] = regex
     
-    def get_transition(self, from_state: str, to_state: str) -> Optional[str]:
+    def get_transition(self, from_state: str, to_state: str) -> RegexNode:
         """Get transition regex between states"""
-        return self.transitions.get((from_state, to_state), '∅')
+        return self.outgoing.get(from_state, {}).get(to_state, self.regex.empty)
     
     def remove_state(self, state_id: str):
-        """Remove state and reroute transitions through it"""
-        incoming_transitions = []
-        outgoing_transitions = []
-        self_loop = None
+        """Remove state and reroute transitions through it as R_ik (R_kk)* R_kj"""
+        regex = self.regex
+        outgoing = self.outgoing.pop(state_id)
+        incoming = self.incoming.pop(state_id)
+        self_loop = outgoing.pop(state_id, None)
+        incoming.pop(state_id, None)
+        loop_term = regex.star(self_loop) if self_loop is not None else regex.epsilon
         
-        # Find all transitions involving this state
-        for (from_state, to_state), regex in list(self.transitions.items()):
-            if to_state == state_id and from_state != state_id:
-                incoming_transitions.append((from_state, regex))
-            elif from_state == state_id and to_state != state_id:
-                outgoing_transitions.append((to_state, regex))
-            elif from_state == state_id and to_state == state_id:
-                self_loop = regex
+        for from_state in incoming:
+            del self.outgoing[from_state][state_id]
+        for to_state in outgoing:
+            del self.incoming[to_state][state_id]
         
         # Create new transitions bypassing the eliminated state
-        for from_state, in_regex in incoming_transitions:
-            for to_state, out_regex in outgoing_transitions:
-                # New transition from 'from_state' to 'to_state' is 'in_regex (self_loop*) out_regex'
-                # This corresponds to R_ik R_kk* R_kj
-
-                # Handle the self-loop part (R_kk*)
-                self_loop_term = 'ε'  # Default to epsilon if no self-loop
-                if self_loop:
-                    self_loop_term = f"({self_loop})*"  # Apply Kleene star
-
-                # Concatenate in_regex, self_loop_term, and out_regex
-                temp_regex = self._concatenate_regex(in_regex, self_loop_term)
-                new_regex = self._concatenate_regex(temp_regex, out_regex)
-
-                self.add_transition(from_state, to_state, new_regex)
-        
-        # Remove all transitions involving the eliminated state
-        keys_to_remove = [
-            key for key in self.transitions.keys()
-            if key[0] == state_id or key[1] == state_id
-        ]
+        for from_state, in_regex in incoming.items():
+            prefix = regex.concat(in_regex, loop_term)
+            for to_state, out_regex in outgoing.items():
+                self.add_transition(from_state, to_state, regex.concat(prefix, out_regex))
         
-        for key in keys_to_remove:
-            del self.transitions[key]
-        
-        self.states.remove(state_id)
+        del self.states[state_id]
     
     def get_states(self) -> List[str]:
         """Get list of states"""
         return list(self.states)
     
+    def intermediate_states(self) -> List[str]:
+        """States still to be eliminated (all but the new start and final states)"""
+        return [state for state in self.states if state != self.start_state and state != self.final_state]
+    
+    def degree_cost(self, state_id: str) -> int:
+        """Number of edges created by eliminating the state: in-degree × out-degree"""
+        incoming = len(self.incoming[state_id]) - (state_id in self.incoming[state_id])
+        outgoing = len(self.outgoing[state_id]) - (state_id in self.outgoing[state_id])
+        return incoming * outgoing
+    
+    def weight_cost(self, state_id: str) -> int:
+        """Growth in total label size caused by eliminating the state.
+        
+        Each incoming label is copied once per outgoing edge (and vice
+        versa) and the self-loop once per new edge, so the state's weight is
+        Σ|in|·(out-1) + Σ|out|·(in-1) + |loop|·(in·out-1).
+        """
+        incoming = [regex.size for source, regex in self.incoming[state_id].items() if source != state_id]
+        outgoing = [regex.size for target, regex in self.outgoing[state_id].items() if target != state_id]
+        loop = self.outgoing[state_id].get(state_id)
+        cost = sum(incoming) * (len(outgoing) - 1) + sum(outgoing) * (len(incoming) - 1)
+        if loop is not None:
+            cost += loop.size * (len(incoming) * len(outgoing) - 1)
+        return cost
+    
+    def scc_rank(self, state_id: str) -> int:
+        """Position of the state's strongly connected component in reverse topological order.
+        
+        Eliminating a state keeps every path between the remaining states,
+        so the components only ever shrink and the ranks computed on the
+        first call stay valid for the rest of the elimination.
+        """
+        if self._scc_rank is None:
+            self._scc_rank = self.strongly_connected_components()
+        return self._scc_rank[state_id]
+    
+    def strongly_connected_components(self) -> Dict[str, int]:
+        """Iterative Tarjan's algorithm; components are numbered sinks first"""
+        index = {}
+        low = {}
+        component = {}
+        stack = []
+        on_stack = set()
+        count = 0
+        
+        for root in self.states:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.outgoing[root]))]
+            while work:
+                state, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.outgoing[target])))
+                        break
+                    if target in on_stack:
+                        low[state] = min(low[state], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[state])
+                    if low[state] == index[state]:
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component[member] = count
+                            if member == state:
+                                break
+                        count += 1
+        return component
+    
+    def next_state_to_eliminate(self, strategy: str = None) -> Optional[str]:
+        """Pick the next state to eliminate with the given ordering strategy, or None when done"""
+        cost = ELIMINATION_STRATEGIES[validate_elimination_order(strategy or DEFAULT_ELIMINATION_ORDER)]
+        candidates = self.intermediate_states()
+        if not candidates:
+            return None
+        # min() keeps the first of equal-cost states, so ties go to insertion order
+        return min(candidates, key=lambda state: cost(self, state))
+    
+    def label_text(self, regex: RegexNode) -> str:
+        """Regex text of an edge label, rendered once per distinct term"""
+        text = self._labels.get(regex.id)
+        if text is None:
+            text = self._labels[regex.id] = regex.to_string()
+        return text
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
         return {
             'states': list(self.states),
-            'transitions': {f"{k[0]}->{k[1]}": v for k, v in self.transitions.items()},
+            'transitions': {f"{k[0]}->{k[1]}": self.label_text(v) for k, v in self.transitions.items()},
             'startState': self.start_state,
             'finalState': self.final_state
         }
 
+# State elimination orderings: each maps (gnfa, state) to a cost, and the
+# cheapest remaining state is eliminated next. Costs are recomputed after
+# every elimination, since removing a state changes its neighbours' edges.
+ELIMINATION_STRATEGIES = {
+    'arbitrary': lambda gnfa, state: 0,
+    'degree': GeneralizedNFA.degree_cost,
+    'weight': GeneralizedNFA.weight_cost,
+    'scc': lambda gnfa, state: (gnfa.scc_rank(state), gnfa.weight_cost(state)),
+}
+DEFAULT_ELIMINATION_ORDER = 'weight'
+
+def validate_elimination_order(strategy: str) -> str:
+    """Check that the ordering strategy exists"""
+    if strategy not in ELIMINATION_STRATEGIES:
+        raise ValueError(f"Unknown elimination order '{strategy}'; "
+                         f"expected one of: {', '.join(ELIMINATION_STRATEGIES)}")
+    return strategy
+
 class DFAToRegexConverter:
     """Convert DFA to Regular Expression using state elimination"""
     
-    def __init__(self, dfa: DFA):
+    def __init__(self, dfa: DFA, minimize: bool = False, elimination_order: str = DEFAULT_ELIMINATION_ORDER,
+                 detail: str = DEFAULT_TRACE_DETAIL):
         self.dfa = dfa
+        self.minimize = minimize
+        self.elimination_order = elimination_order  # Key of ELIMINATION_STRATEGIES
+        self.detail = detail  # Step trace detail level, see TRACE_DETAILS
+        self.source_dfa = dfa  # DFA the GNFA is built from (minimized when requested)
         self.steps = []
         self.gnfa = None
+        self.eliminated = []  # States in the order they were eliminated
     
     def convert(self) -> Dict[str, Any]:
         """Main conversion method"""
-        self.steps = []
-        
+        result = collect_steps(self.iter_convert())
+        self.steps = result['steps']
+        return result
+    
+    def iter_convert(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run the conversion, yielding ('step', step) as each step is recorded and then ('result', result)"""
         try:
+            self.trace = StepTrace(self.detail)
+            
             # Step 1: Validate input DFA
             self.validate_dfa()
-            self.add_step('validate', 'Validate Input DFA',
-                         'Check that the input DFA is well-formed',
-                         {'dfa': self.dfa.to_dict()})
+            yield from self.add_step('validate', 'Validate Input DFA',
+                                    'Check that the input DFA is well-formed',
+                                    {'dfa': Snapshot('dfa', self.dfa.to_dict)})
+            
+            # Optionally minimize the DFA first so fewer states are eliminated
+            self.source_dfa = self.dfa
+            if self.minimize:
+                minimizer = DFAMinimizer(self.dfa)
+                self.source_dfa = minimizer.minimize()
+                summary = minimizer.summary(self.source_dfa)
+                yield from self.add_step('minimize', 'Minimize DFA',
+                                        'Merge equivalent states using Hopcroft partition refinement '
+                                        f'({summary["statesBefore"]} → {summary["statesAfter"]} states)',
+                                        {'minimizedDFA': Snapshot('dfa', self.source_dfa.to_dict), **summary})
             
             # Step 2: Convert DFA to Generalized NFA
             self.gnfa = self.create_generalized_nfa()
-            self.add_step('create_gnfa', 'Create Generalized NFA',
-                         'Convert DFA to GNFA by adding new start and final states',
-                         {'gnfa': self.gnfa.to_dict()})
+            yield from self.add_step('create_gnfa', 'Create Generalized NFA',
+                                    'Convert DFA to GNFA by adding new start and final states',
+                                    {'gnfa': Snapshot('gnfa', self.gnfa.to_dict)})
             
             # Step 3: Eliminate states one by one
-            regex = self.eliminate_states()
-            self.add_step('eliminate_states', 'Eliminate States',
-                         'Remove intermediate states using state elimination algorithm',
-                         {'finalRegex': regex})
+            term = yield from self.eliminate_states()
+            # The raw regex can be huge, so it is only rendered for a full trace
+            regex = lambda: self.gnfa.label_text(term)
+            yield from self.add_step('eliminate_states', 'Eliminate States',
+                                    'Remove intermediate states using state elimination algorithm',
+                                    {'finalRegex': regex, 'eliminationOrder': self.elimination_order,
+                                     'eliminated': self.eliminated})
             
             # Step 4: Simplify the resulting regular expression
-            simplified_regex = self.simplify_regex(regex)
-            self.add_step('simplify', 'Simplify Regular Expression',
-                         'Apply simplification rules to make the regex more readable',
-                         {'originalRegex': regex, 'simplifiedRegex': simplified_regex})
+            simplified_regex = self.simplify_regex(term)
+            yield from self.add_step('simplify', 'Simplify Regular Expression',
+                                    'Apply algebraic identities, drop redundant alternatives and factor out '
+                                    'common prefixes and suffixes to make the regex more readable',
+                                    {'originalRegex': regex, 'simplifiedRegex': simplified_regex})
             
-            return {
+            yield 'result', {
                 'success': True,
                 'regex': simplified_regex,
-                'steps': self.steps,
                 'originalDfa': self.dfa.to_dict()
             }
             
         except Exception as e:
             logger.error(f"Error in dfa-to-regex conversion: {str(e)}")
-            return {
+            yield 'result', {
                 'success': False,
                 'error': str(e),
-                'steps': self.steps,
                 'originalDfa': self.dfa.to_dict()
             }
     
@@ -184,6 +295,8 @@ class DFAToRegexConverter:
         
         if not self.dfa.start_state:
             raise ValueError("DFA must have exactly one start state")
+        
+        validate_elimination_order(self.elimination_order)
     
     def create_generalized_nfa(self) -> GeneralizedNFA:
         """Create Generalized NFA from DFA"""
@@ -199,117 +312,63 @@ class DFAToRegexConverter:
         gnfa.final_state = new_final_state
         
         # Add all original states
-        for state_id in self.dfa.states.keys():
+        for state_id in self.source_dfa.states.keys():
             gnfa.add_state(state_id)
         
         # Add epsilon transition from new start to original start
-        gnfa.add_transition(new_start_state, self.dfa.start_state, 'ε')
+        gnfa.add_transition(new_start_state, self.source_dfa.start_state, 'ε')
         
         # Add epsilon transitions from all final states to new final state
-        for final_state_id in self.dfa.final_states:
+        for final_state_id in self.source_dfa.final_states:
             gnfa.add_transition(final_state_id, new_final_state, 'ε')
         
         # Add all original transitions
-        for transition in self.dfa.transitions.values():
+        for transition in self.source_dfa.transitions.values():
             gnfa.add_transition(transition.from_state, transition.to_state, transition.symbol)
         
         return gnfa
     
-    def eliminate_states(self) -> str:
-        """Eliminate states using state elimination algorithm"""
-        elimination_order = self.determine_elimination_order()
+    def eliminate_states(self) -> Generator[Tuple[str, Dict[str, Any]], None, RegexNode]:
+        """Eliminate states one at a time, cheapest first under the chosen ordering strategy.
         
-        for state_to_eliminate in elimination_order:
-            self.add_step('eliminate_state', f'Eliminate State {state_to_eliminate}',
-                         f'Remove state {state_to_eliminate} and reroute transitions',
-                         {
-                             'eliminatedState': state_to_eliminate,
-                             'gnfaBefore': self.gnfa.to_dict()
-                         })
+        Yields the step of each elimination and returns the final regex term.
+        """
+        self.eliminated = []
+        while True:
+            state_to_eliminate = self.gnfa.next_state_to_eliminate(self.elimination_order)
+            if state_to_eliminate is None:
+                break
+            self.eliminated.append(state_to_eliminate)
+            yield from self.add_step('eliminate_state', f'Eliminate State {state_to_eliminate}',
+                                    f'Remove state {state_to_eliminate} and reroute transitions',
+                                    {
+                                        'eliminatedState': state_to_eliminate,
+                                        'gnfaBefore': Snapshot('gnfa', self.gnfa.to_dict)
+                                    })
             
             self.gnfa.remove_state(state_to_eliminate)
-            
-            self.add_step('after_elimination', f'After Eliminating {state_to_eliminate}',
-                         f'GNFA state after eliminating {state_to_eliminate}',
-                         {
-                             'gnfaAfter': self.gnfa.to_dict()
-                         })
-
-            print(f"DEBUG: After eliminating {state_to_eliminate}, GNFA: {self.gnfa.to_dict()}")
+            logger.debug("Eliminated %s, %d regex terms interned", state_to_eliminate, len(self.gnfa.regex))
 
+            yield from self.add_step('after_elimination', f'After Eliminating {state_to_eliminate}',
+                                    f'GNFA state after eliminating {state_to_eliminate}',
+                                    {
+                                        'gnfaAfter': Snapshot('gnfa', self.gnfa.to_dict)
+                                    })
+        
         # The final regex is the transition from start to final state
         final_regex = self.gnfa.get_transition(self.gnfa.start_state, self.gnfa.final_state)
-        print(f"DEBUG: Final regex from GNFA: {final_regex}")
-        return final_regex or '∅'
-    
-    def determine_elimination_order(self) -> List[str]:
-        """Determine the order in which to eliminate states"""
-        states = self.gnfa.get_states()
-        return [state for state in states if state not in [self.gnfa.start_state, self.gnfa.final_state]]
+        logger.debug("Final regex from GNFA has %d nodes", final_regex.size)
+        return final_regex
     
-    def simplify_regex(self, regex: str) -> str:
-        """Simplify regular expression"""
-        if not regex or regex == '∅':
-            return '∅'
-        if regex == 'ε':
-            return 'ε'
-        
-        simplified = regex
-        
-        # Apply simplification rules iteratively
-        rules = [
-            # Remove unnecessary parentheses around single symbols
-            (r'\(([a-zA-Z0-9])\)', r'\1'),
-            
-            # Simplify epsilon
-            (r'ε\*', 'ε'),
-            (r'ε\+', 'ε'),
-            (r'ε\|ε', 'ε'),
-            
-            # Simplify empty set
-            (r'∅\*', 'ε'),
-            (r'∅\+', '∅'),
-            (r'∅\|(.+)', r'\1'),
-            (r'(.+)\|∅', r'\1'),
-            (r'∅(.+)', '∅'),
-            (r'(.+)∅', '∅'),
-            
-            # Simplify concatenation with epsilon
-            (r'ε(.+)', r'\1'),
-            (r'(.+)ε', r'\1'),
-            
-            # Simplify redundant stars
-            (r'\((.+)\*\)\*', r'(\1)*'),
-            
-            # Remove unnecessary outer parentheses
-            (r'^\((.+)\)$', r'\1'),
-        ]
-        
-        import re
-        max_iterations = 10
-        iteration = 0
-        
-        while iteration < max_iterations:
-            previous_simplified = simplified
-            for pattern, replacement in rules:
-                simplified = re.sub(pattern, replacement, simplified)
-            
-            if simplified == previous_simplified:
-                break
-            iteration += 1
-        
-        return simplified
+    def simplify_regex(self, regex: Union[str, RegexNode]) -> str:
+        """Simplify regular expression structurally with RegexSimplifier"""
+        return RegexSimplifier(self.gnfa.regex if self.gnfa else None).simplify_regex(regex)
     
-    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]):
-        """Add a conversion step"""
-        self.steps.append({
-            'id': f"step_{len(self.steps) + 1}",
-            'type': step_type,
-            'title': title,
-            'description': description,
-            'data': data,
-            'timestamp': len(self.steps) + 1
-        })
+    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Record a conversion step at the trace's detail level, yielding it to the step stream"""
+        step = self.trace.add(step_type, title, description, data)
+        if step is not None:
+            yield 'step', step
 
 # Builder class for creating test DFAs
 class DFABuilder:
@@ -0,0 +1,187 @@
+"""
+Language equivalence and inclusion checking on lazily explored product automata
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .automata_structures import NFA, DFA, AlphabetPartition, EPSILON_SYMBOLS
+
+class _DFAView:
+    """Step through a DFA on its compiled transition table"""
+    
+    def __init__(self, dfa: DFA):
+        self.compiled = dfa.compile()
+        self.start = self.compiled.start
+        self.symbols = set(self.compiled.symbols)
+    
+    def column(self, symbol: str) -> int:
+        # Symbols outside the alphabet get the extra column that leads to the dead state
+        return self.compiled.symbol_index.get(symbol, self.compiled.num_classes)
+    
+    def step(self, state: int, column: int) -> int:
+        compiled = self.compiled
+        return compiled.table[state * compiled.width + column]
+    
+    def accepting(self, state: int) -> bool:
+        return bool(self.compiled.accepting[state])
+
+class _NFAView:
+    """Step through an NFA one ε-closed state set (bitmask) at a time"""
+    
+    def __init__(self, nfa: NFA):
+        successors = nfa.symbol_successor_masks()
+        self.symbols = {symbol for symbol in nfa.alphabet if symbol not in EPSILON_SYMBOLS} | set(successors)
+        self.partition = AlphabetPartition({
+            symbol: tuple(successors.get(symbol, ())) for symbol in self.symbols
+        })
+        self._rows = [successors.get(members[0]) for members in self.partition.classes]
+        self.start = nfa.closure_mask(nfa.states_to_mask(nfa.start_states))
+        self._final_mask = nfa.states_to_mask(nfa.final_states)
+    
+    def column(self, symbol: str) -> int:
+        return self.partition.class_of.get(symbol, -1)
+    
+    def step(self, state: int, column: int) -> int:
+        row = self._rows[column] if column >= 0 else None
+        if row is None:
+            return 0
+        target = 0
+        while state:
+            low = state & -state
+            target |= row[low.bit_length() - 1]
+            state ^= low
+        return target
+    
+    def accepting(self, state: int) -> bool:
+        return bool(state & self._final_mask)
+
+class EquivalenceChecker:
+    """Compare the languages of two automata without determinizing them up front.
+    
+    Both automata are explored in lockstep, one pair of states at a time:
+    DFAs through their compiled tables and NFAs through ε-closed subsets
+    that are only built when the product reaches them. Symbols that both
+    automata treat alike share one column, so only one representative per
+    class is tried. Equivalence uses the Hopcroft–Karp union-find check,
+    which skips a pair whose states are already merged; inclusion needs
+    the plain product, since it is not an equivalence relation. Pairs are
+    explored breadth-first, so the first mismatch gives a shortest
+    distinguishing string.
+    """
+    
+    MAX_PAIRS = 100000  # Guard against subset blow-up on large NFAs
+    
+    def __init__(self, first: Union[NFA, DFA], second: Union[NFA, DFA]):
+        self.first = self._view(first)
+        self.second = self._view(second)
+        symbols = self.first.symbols | self.second.symbols
+        partition = AlphabetPartition({
+            symbol: (self.first.column(symbol), self.second.column(symbol)) for symbol in symbols
+        })
+        # One representative symbol per class, with its column in each automaton
+        self.letters: List[Tuple[str, int, int]] = [
+            (members[0], self.first.column(members[0]), self.second.column(members[0]))
+            for members in partition.classes
+        ]
+        self.pairs_explored = 0
+    
+    @staticmethod
+    def _view(automaton: Union[NFA, DFA]):
+        if isinstance(automaton, DFA):
+            return _DFAView(automaton)
+        if isinstance(automaton, NFA):
+            return _NFAView(automaton)
+        raise ValueError(f"Expected an NFA or a DFA, got {type(automaton).__name__}")
+    
+    def check_equivalence(self) -> Dict[str, Any]:
+        """Check L(first) = L(second), stopping at the first distinguishing string"""
+        parent: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        
+        def find(node: Tuple[int, int]) -> Tuple[int, int]:
+            root = node
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while node != root:
+                parent[node], node = root, parent[node]
+            return root
+        
+        def merge(left: int, right: int) -> bool:
+            """Union the classes of two states; False if they were already one class"""
+            a, b = find((0, left)), find((1, right))
+            if a == b:
+                return False
+            parent[a] = b
+            return True
+        
+        pair = (self.first.start, self.second.start)
+        merge(*pair)
+        mismatch = self._explore(pair, merge)
+        return self._result('equivalent', mismatch)
+    
+    def check_inclusion(self) -> Dict[str, Any]:
+        """Check L(second) ⊆ L(first); a counterexample is in L(second) but not in L(first)"""
+        seen = {(self.first.start, self.second.start)}
+        
+        def visit(left: int, right: int) -> bool:
+            if (left, right) in seen:
+                return False
+            seen.add((left, right))
+            return True
+        
+        mismatch = self._explore((self.first.start, self.second.start), visit,
+                                 lambda left, right: right and not left)
+        return self._result('included', mismatch)
+    
+    def _explore(self, start: Tuple[int, int], visit, differs=None) -> Optional[List[str]]:
+        """Breadth-first product search; returns the symbols of a shortest string reaching a differing pair"""
+        if differs is None:
+            differs = lambda left, right: left != right
+        first, second = self.first, self.second
+        
+        # Each queued pair keeps (parent entry, symbol) so the string can be rebuilt
+        trail: List[Tuple[int, Optional[str]]] = [(-1, None)]
+        pairs = [start]
+        queue = deque([0])
+        self.pairs_explored = 1
+        
+        entry = 0
+        found = differs(first.accepting(start[0]), second.accepting(start[1]))
+        while queue and not found:
+            index = queue.popleft()
+            left, right = pairs[index]
+            for symbol, first_column, second_column in self.letters:
+                targets = (first.step(left, first_column), second.step(right, second_column))
+                if not visit(*targets):
+                    continue
+                if len(pairs) >= self.MAX_PAIRS:
+                    raise ValueError(f"Product exploration exceeded {self.MAX_PAIRS} state pairs")
+                entry = len(pairs)
+                pairs.append(targets)
+                trail.append((index, symbol))
+                queue.append(entry)
+                self.pairs_explored += 1
+                if differs(first.accepting(targets[0]), second.accepting(targets[1])):
+                    found = True
+                    break
+        
+        if not found:
+            return None
+        symbols = []
+        while trail[entry][1] is not None:
+            entry, symbol = trail[entry]
+            symbols.append(symbol)
+        return symbols[::-1]
+    
+    def _result(self, key: str, mismatch: Optional[List[str]]) -> Dict[str, Any]:
+        result = {key: mismatch is None, 'counterexample': None, 'pairsExplored': self.pairs_explored}
+        if mismatch is not None:
+            result['counterexample'] = ''.join(mismatch)
+            if key == 'equivalent':
+                result['acceptedBy'] = 'first' if self._accepts(self.first, mismatch) else 'second'
+        return result
+    
+    def _accepts(self, view, symbols: List[str]) -> bool:
+        state = view.start
+        for symbol in symbols:
+            state = view.step(state, view.column(symbol))
+        return view.accepting(state)
@@ -0,0 +1,134 @@
+"""
+Lazy (on-the-fly) determinization of NFAs for string matching
+"""
+
+from typing import List, Dict, Set, Any, Iterable
+from .automata_structures import NFA, AutomataUtils, AlphabetPartition, EPSILON_SYMBOLS
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LazyDFAMatcher:
+    """Match strings against an NFA by determinizing only the subsets visited.
+    
+    Each DFA state is an ε-closed NFA state set (a bitmask) that is created
+    the first time an input leads to it, and each transition is computed
+    the first time it is followed. Discovered states live in a cache of at
+    most ``max_states`` entries; when the cache is full it is flushed and
+    matching continues from the current subset, as in RE2's lazy DFA. Memory
+    is therefore bounded by configuration while inputs that revisit the same
+    states run at DFA speed.
+    """
+    
+    DEFAULT_MAX_STATES = 10000
+    
+    def __init__(self, nfa: NFA, max_states: int = DEFAULT_MAX_STATES):
+        if max_states < 2:
+            raise ValueError("max_states must be at least 2")
+        
+        self.nfa = nfa
+        self.max_states = max_states
+        self.symbols = sorted(symbol for symbol in nfa.alphabet if symbol not in EPSILON_SYMBOLS)
+        
+        # Symbols with identical successors in every state share a cache column
+        successors = nfa.symbol_successor_masks()
+        size = len(nfa.epsilon_closure_masks())
+        self.partition = AlphabetPartition({
+            symbol: tuple(successors.get(symbol, ())) for symbol in self.symbols
+        })
+        self.symbol_index = self.partition.class_of
+        self._successors = [successors.get(members[0]) or [0] * size for members in self.partition.classes]
+        self._start_mask = nfa.closure_mask(nfa.states_to_mask(nfa.start_states))
+        self._final_mask = nfa.states_to_mask(nfa.final_states)
+        
+        self.flushes = 0
+        self.transitions_computed = 0
+        self._reset()
+    
+    def _reset(self):
+        """Start from an empty cache holding only the dead state"""
+        self._index: Dict[int, int] = {}
+        self._masks: List[int] = []
+        self._next: List[List[int]] = []
+        self._dead = self._add(0)
+    
+    def _flush(self):
+        """Drop every cached state and transition"""
+        self.flushes += 1
+        self._reset()
+    
+    def _add(self, mask: int) -> int:
+        index = len(self._masks)
+        self._index[mask] = index
+        self._masks.append(mask)
+        # -1 marks a transition that has not been computed yet
+        width = len(self._successors)
+        self._next.append([-1] * width if mask else [index] * width)
+        return index
+    
+    def _state_for(self, mask: int) -> int:
+        """Get the cached state for a subset, flushing the cache if it is full"""
+        index = self._index.get(mask)
+        if index is None:
+            if len(self._masks) >= self.max_states:
+                self._flush()
+            index = self._index.get(mask)
+            if index is None:
+                index = self._add(mask)
+        return index
+    
+    def _compute(self, state: int, column: int) -> int:
+        """Determinize one transition and cache it"""
+        row = self._successors[column]
+        target_mask = 0
+        for bit in AutomataUtils.bits(self._masks[state]):
+            target_mask |= row[bit]
+        self.transitions_computed += 1
+        
+        flushes = self.flushes
+        target = self._state_for(target_mask)
+        # After a flush the source state is gone, so the edge is not recorded
+        if flushes == self.flushes:
+            self._next[state][column] = target
+        return target
+    
+    def run(self, input_string: str) -> int:
+        """Return the NFA state bitmask reached after reading the whole string"""
+        symbol_index = self.symbol_index
+        state = self._state_for(self._start_mask)
+        for char in input_string:
+            column = symbol_index.get(char)
+            if column is None:
+                return 0
+            target = self._next[state][column]
+            if target < 0:
+                target = self._compute(state, column)
+            if target == self._dead:
+                return 0
+            state = target
+        return self._masks[state]
+    
+    def is_accepting(self, mask: int) -> bool:
+        """Check if a subset returned by run() contains a final state"""
+        return bool(mask & self._final_mask)
+    
+    def accepts(self, input_string: str) -> bool:
+        """Check if the NFA accepts the given input string"""
+        return self.is_accepting(self.run(input_string))
+    
+    def accepts_many(self, input_strings: Iterable[str]) -> List[bool]:
+        """Check a batch of input strings, sharing the state cache across them"""
+        return [self.accepts(input_string) for input_string in input_strings]
+    
+    def final_states(self, input_string: str) -> Set[str]:
+        """NFA states the automaton can be in after reading the string"""
+        return self.nfa.mask_to_states(self.run(input_string))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics for the matcher"""
+        return {
+            'cachedStates': len(self._masks),
+            'maxStates': self.max_states,
+            'transitionsComputed': self.transitions_computed,
+            'flushes': self.flushes
+        }
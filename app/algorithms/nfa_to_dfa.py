@@ -2,8 +2,14 @@
 NFA to DFA conversion using subset construction algorithm
 """
 
-from typing import List, Set, Dict, Optional, Any, Tuple
-from .automata_structures import DFA, NFA, State, Transition, AutomataUtils
+from collections import deque
+from typing import List, Set, Dict, Optional, Any, Tuple, Iterable, Iterator
+from .automata_structures import (
+    DFA, NFA, State, Transition, AutomataUtils, AlphabetPartition, StateStore, TransitionStore,
+    EPSILON_SYMBOLS
+)
+from .dfa_minimization import DFAMinimizer
+from .step_trace import StepTrace, Snapshot, DEFAULT_TRACE_DETAIL, collect_steps
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,60 +17,80 @@ logger = logging.getLogger(__name__)
 class NFAToDFAConverter:
     """Convert NFA to DFA using subset construction"""
     
-    def __init__(self, nfa: NFA):
+    def __init__(self, nfa: NFA, minimize: bool = True, detail: str = DEFAULT_TRACE_DETAIL):
         self.nfa = nfa
+        self.minimize = minimize  # Hopcroft minimization, or only drop unreachable states
+        self.detail = detail  # Step trace detail level, see TRACE_DETAILS
+        self.minimization = {}
+        self.merged_states = {}  # Minimized DFA state IDs -> merged subset DFA state IDs
         self.steps = []
-        self.epsilon_closures = {}  # Cache for epsilon closures
+        self.epsilon_closures = {}  # Per-state epsilon closures, for the step trace
         self.state_mapping = {}  # Maps DFA state IDs to NFA state sets
     
     def convert(self) -> Dict[str, Any]:
         """Main conversion method"""
-        self.steps = []
+        result = collect_steps(self.iter_convert())
+        self.steps = result['steps']
+        return result
+    
+    def iter_convert(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run the conversion, yielding ('step', step) as each step is recorded and then ('result', result)"""
         self.epsilon_closures.clear()
         self.state_mapping.clear()
         
         try:
+            self.trace = StepTrace(self.detail)
+            
             # Step 1: Validate input NFA
             self.validate_nfa()
-            self.add_step('validate', 'Validate Input NFA',
-                         'Check that the input NFA is well-formed',
-                         {'nfa': self.nfa.to_dict()})
+            yield from self.add_step('validate', 'Validate Input NFA',
+                                    'Check that the input NFA is well-formed',
+                                    {'nfa': Snapshot('nfa', self.nfa.to_dict)})
             
             # Step 2: Calculate epsilon closures for all states
             self.calculate_all_epsilon_closures()
-            self.add_step('epsilon_closures', 'Calculate Epsilon Closures',
-                         'Compute ε-closure for each state in the NFA',
-                         {'closures': self.serialize_epsilon_closures()})
+            yield from self.add_step('epsilon_closures', 'Calculate Epsilon Closures',
+                                    'Compute ε-closure for each state in the NFA',
+                                    {'closures': self.serialize_epsilon_closures})
             
             # Step 3: Construct DFA using subset construction
             dfa = self.subset_construction()
-            self.add_step('subset_construction', 'Subset Construction',
-                         'Build DFA states and transitions using subset construction algorithm',
-                         {'dfa': dfa.to_dict(), 'stateMapping': self.serialize_state_mapping()})
+            yield from self.add_step('subset_construction', 'Subset Construction',
+                                    'Build DFA states and transitions using subset construction algorithm',
+                                    {'dfa': Snapshot('dfa', dfa.to_dict), 'stateMapping': self.serialize_state_mapping})
             
-            # Step 4: Minimize DFA (remove unreachable states)
+            # Step 4: Minimize DFA
             minimized_dfa = self.minimize_dfa(dfa)
-            self.add_step('minimize', 'Minimize DFA',
-                         'Remove unreachable states and optimize DFA',
-                         {'minimizedDFA': minimized_dfa.to_dict()})
+            if self.minimize:
+                yield from self.add_step('minimize', 'Minimize DFA',
+                                        'Merge equivalent states using Hopcroft partition refinement '
+                                        f'({self.minimization["statesBefore"]} → {self.minimization["statesAfter"]} states)',
+                                        {'minimizedDFA': Snapshot('dfa', minimized_dfa.to_dict), **self.minimization})
+            else:
+                yield from self.add_step('minimize', 'Remove Unreachable States',
+                                        'Remove states that cannot be reached from the start state',
+                                        {'minimizedDFA': Snapshot('dfa', minimized_dfa.to_dict), **self.minimization})
             
-            return {
+            yield 'result', {
                 'success': True,
                 'dfa': minimized_dfa.to_dict(),
-                'steps': self.steps,
-                'stateMapping': self.state_mapping,
+                'stateMapping': self.minimized_state_mapping(minimized_dfa),
                 'nfa': self.nfa.to_dict()
             }
             
         except Exception as e:
             logger.error(f"Error in nfa-to-dfa conversion: {str(e)}")
-            return {
+            yield 'result', {
                 'success': False,
                 'error': str(e),
-                'steps': self.steps,
                 'nfa': self.nfa.to_dict()
             }
     
+    def build_dfa(self) -> DFA:
+        """Build the DFA directly, without recording conversion steps"""
+        self.validate_nfa()
+        return self.minimize_dfa(self.subset_construction())
+    
     def validate_nfa(self):
         """Validate the input NFA"""
         errors = AutomataUtils.validate_automaton(self.nfa)
@@ -76,122 +102,119 @@ class NFAToDFAConverter:
     
     def calculate_all_epsilon_closures(self):
         """Calculate epsilon closures for all states"""
+        closures = self.nfa.epsilon_closure_masks()
+        bits = self.nfa.state_bits()
         for state_id in self.nfa.states.keys():
-            self.get_epsilon_closure({state_id})
+            self.epsilon_closures[frozenset([state_id])] = self.nfa.mask_to_states(closures[bits[state_id]])
     
     def get_epsilon_closure(self, state_set: Set[str]) -> Set[str]:
         """Calculate epsilon closure for a set of states"""
-        key = frozenset(state_set)
-        
-        if key in self.epsilon_closures:
-            return self.epsilon_closures[key]
-        
-        closure = set(state_set)
-        stack = list(state_set)
-        
-        while stack:
-            current_state = stack.pop()
-            
-            # Find all epsilon transitions from current state
-            epsilon_transitions = [
-                t for t in self.nfa.get_transitions_from(current_state)
-                if t.symbol in ['ε', 'epsilon']
-            ]
-            
-            for transition in epsilon_transitions:
-                if transition.to_state not in closure:
-                    closure.add(transition.to_state)
-                    stack.append(transition.to_state)
-        
-        self.epsilon_closures[key] = closure
-        return closure
+        return self.nfa.epsilon_closure(state_set)
     
     def subset_construction(self) -> DFA:
-        """Subset construction algorithm"""
-        dfa_states = []
-        dfa_transitions = []
-        alphabet = [symbol for symbol in self.nfa.alphabet if symbol not in ['ε', 'epsilon']]
+        """Subset construction algorithm.
+        
+        DFA states are explored breadth-first as NFA state bitmasks, each
+        interned to an integer ID. The successor of a subset on a symbol is
+        the OR of its members' precomputed ε-closed successor masks, so no
+        closure is recomputed during exploration. Symbols with identical
+        successor masks in every state form one class and are explored
+        together. Readable ``{q0,q1}`` state IDs are only built once
+        exploration has finished.
+        """
+        alphabet = [symbol for symbol in self.nfa.alphabet if symbol not in EPSILON_SYMBOLS]
+        successors = self.nfa.symbol_successor_masks()
+        partition = AlphabetPartition({
+            symbol: tuple(successors[symbol]) for symbol in alphabet if symbol in successors
+        })
+        class_rows = [successors[members[0]] for members in partition.classes]
+        bits = AutomataUtils.bits
         
         # Start state: epsilon closure of NFA start states
-        start_state_closure = self.get_epsilon_closure(self.nfa.start_states)
-        start_state_id = self.state_set_to_id(start_state_closure)
+        start_mask = self.nfa.closure_mask(self.nfa.states_to_mask(self.nfa.start_states))
         
         # Queue for BFS construction
-        queue = [(start_state_id, start_state_closure)]
-        processed_states = {start_state_id}
-        
-        # Track state mapping
-        self.state_mapping[start_state_id] = list(start_state_closure)
+        subsets = [start_mask]
+        subset_index = {start_mask: 0}
+        queue = deque([start_mask])
+        edges = []
         
         while queue:
-            current_dfa_state_id, current_nfa_states = queue.pop(0)
-            
-            # Determine if this DFA state is final
-            is_final = bool(current_nfa_states.intersection(self.nfa.final_states))
-            
-            # Create DFA state
-            dfa_states.append(State(
-                current_dfa_state_id,
-                current_dfa_state_id,
-                current_dfa_state_id == start_state_id,
-                is_final
-            ))
+            current_mask = queue.popleft()
+            current = subset_index[current_mask]
+            members = bits(current_mask)
             
-            # For each symbol in alphabet
-            for symbol in alphabet:
-                next_nfa_states = set()
+            for column, row in enumerate(class_rows):
+                next_mask = 0
+                for member in members:
+                    next_mask |= row[member]
+                if not next_mask:
+                    continue
                 
-                # For each NFA state in current DFA state
-                for nfa_state_id in current_nfa_states:
-                    transitions_on_symbol = [
-                        t for t in self.nfa.get_transitions_from(nfa_state_id)
-                        if t.symbol == symbol
-                    ]
-                    
-                    for transition in transitions_on_symbol:
-                        next_nfa_states.add(transition.to_state)
-                
-                if next_nfa_states:
-                    # Calculate epsilon closure of reachable states
-                    next_state_closure = self.get_epsilon_closure(next_nfa_states)
-                    next_state_id = self.state_set_to_id(next_state_closure)
-                    
-                    # Add transition
-                    dfa_transitions.append(Transition(
-                        current_dfa_state_id,
-                        next_state_id,
-                        symbol
-                    ))
-                    
-                    # Add new state to queue if not processed
-                    if next_state_id not in processed_states:
-                        queue.append((next_state_id, next_state_closure))
-                        processed_states.add(next_state_id)
-                        self.state_mapping[next_state_id] = list(next_state_closure)
+                target = subset_index.get(next_mask)
+                if target is None:
+                    target = len(subsets)
+                    subset_index[next_mask] = target
+                    subsets.append(next_mask)
+                    queue.append(next_mask)
+                edges.append((current, target, column))
+        
+        return self.build_subset_dfa(subsets, edges, alphabet, partition.classes)
+    
+    def build_subset_dfa(self, subsets: List[int], edges: List[Tuple[int, int, int]],
+                         alphabet: List[str], class_symbols: List[List[str]]) -> DFA:
+        """Materialize the explored subsets as a DFA with readable state IDs and per-symbol transitions"""
+        final_mask = self.nfa.states_to_mask(self.nfa.final_states)
+        order = self.nfa._state_order
+        bits = AutomataUtils.bits
         
-        final_states = [s.id for s in dfa_states if s.is_final]
-        dfa = DFA(dfa_states, dfa_transitions, alphabet, start_state_id, final_states)
+        states = StateStore()
+        state_ids = []
+        final_states = []
+        for i, mask in enumerate(subsets):
+            members = sorted(order[bit] for bit in bits(mask))
+            state_id = self.state_set_to_id(members)
+            is_final = bool(mask & final_mask)
+            states.append(state_id, state_id, i == 0, is_final)
+            state_ids.append(state_id)
+            self.state_mapping[state_id] = members
+            if is_final:
+                final_states.append(state_id)
+        
+        transitions = TransitionStore()
+        for current, target, column in edges:
+            for symbol in class_symbols[column]:
+                transitions.append(state_ids[current], state_ids[target], symbol, check_duplicates=False)
+        
+        dfa = DFA(states, transitions, alphabet, state_ids[0], final_states)
         
         # Set positions for visualization
-        positions = AutomataUtils.generate_state_positions(len(dfa_states))
-        for i, state in enumerate(dfa_states):
-            if i < len(positions):
-                state.position = positions[i]
+        dfa.states.set_positions(AutomataUtils.generate_state_positions(len(state_ids)))
         
         return dfa
     
     def minimize_dfa(self, dfa: DFA) -> DFA:
-        """Minimize DFA by removing unreachable states"""
+        """Minimize DFA (or only remove unreachable states when minimization is off)"""
+        if self.minimize:
+            minimizer = DFAMinimizer(dfa)
+            minimized = minimizer.minimize()
+            self.minimization = minimizer.summary(minimized)
+            self.merged_states = minimizer.merged_states
+            return minimized
+        
         reachable_states = self.find_reachable_states(dfa)
-        return self.remove_unreachable_states(dfa, reachable_states)
+        trimmed = self.remove_unreachable_states(dfa, reachable_states)
+        self.merged_states = {state_id: [state_id] for state_id in trimmed.states.keys()}
+        self.minimization = {'statesBefore': len(dfa.states), 'statesAfter': len(trimmed.states)}
+        return trimmed
     
     def find_reachable_states(self, dfa: DFA) -> Set[str]:
         """Find all reachable states from start state"""
         reachable = {dfa.start_state}
-        queue = [dfa.start_state]
+        queue = deque([dfa.start_state])
         
         while queue:
-            current_state = queue.pop(0)
+            current_state = queue.popleft()
             
             for transition in dfa.get_transitions_from(current_state):
                 if transition.to_state not in reachable:
@@ -202,6 +225,9 @@ class NFAToDFAConverter:
     
     def remove_unreachable_states(self, dfa: DFA, reachable_states: Set[str]) -> DFA:
         """Remove unreachable states from DFA"""
+        if len(reachable_states) == len(dfa.states):
+            return dfa
+        
         new_states = [state for state in dfa.states.values() if state.id in reachable_states]
         new_transitions = [
             transition for transition in dfa.transitions.values()
@@ -212,22 +238,17 @@ class NFAToDFAConverter:
         
         return DFA(new_states, new_transitions, list(dfa.alphabet), dfa.start_state, new_final_states)
     
-    def state_set_to_id(self, state_set: Set[str]) -> str:
+    def state_set_to_id(self, state_set: Iterable[str]) -> str:
         """Convert set of states to state ID"""
         if not state_set:
             return "∅"
         return "{" + ",".join(sorted(state_set)) + "}"
     
-    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]):
-        """Add a conversion step"""
-        self.steps.append({
-            'id': f"step_{len(self.steps) + 1}",
-            'type': step_type,
-            'title': title,
-            'description': description,
-            'data': data,
-            'timestamp': len(self.steps) + 1
-        })
+    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Record a conversion step at the trace's detail level, yielding it to the step stream"""
+        step = self.trace.add(step_type, title, description, data)
+        if step is not None:
+            yield 'step', step
     
     def serialize_epsilon_closures(self) -> Dict[str, List[str]]:
         """Serialize epsilon closures for JSON"""
@@ -240,6 +261,16 @@ class NFAToDFAConverter:
     def serialize_state_mapping(self) -> Dict[str, List[str]]:
         """Serialize state mapping for JSON"""
         return {dfa_state_id: nfa_states for dfa_state_id, nfa_states in self.state_mapping.items()}
+    
+    def minimized_state_mapping(self, dfa: DFA) -> Dict[str, List[str]]:
+        """Map each state of the final DFA to the NFA states of the subsets merged into it"""
+        mapping = {}
+        for state_id in dfa.states.keys():
+            members = set()
+            for subset_id in self.merged_states.get(state_id, ()):
+                members.update(self.state_mapping.get(subset_id, ()))
+            mapping[state_id] = sorted(members)
+        return mapping
 
 # Builder class for creating NFAs from simple definitions
 class NFABuilder:
@@ -1,50 +1,80 @@
 """
 NFA to Regular Expression conversion using state elimination algorithm
 """
-from .automata_structures import NFA, State, Transition, AutomataUtils
-from typing import Dict, Any
+from .automata_structures import NFA, DFA, State, Transition, AutomataUtils
+from .nfa_to_dfa import NFAToDFAConverter
+from .dfa_to_regex import GeneralizedNFA, DEFAULT_ELIMINATION_ORDER, validate_elimination_order
+from .regex_ast import RegexNode
+from .regex_simplifier import RegexSimplifier
+from .step_trace import StepTrace, Snapshot, DEFAULT_TRACE_DETAIL, collect_steps
+from typing import Dict, Any, Union, Iterator, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 class NFAToRegexConverter:
     """Convert NFA to Regular Expression using state elimination"""
-    def __init__(self, nfa: NFA):
+    def __init__(self, nfa: NFA, minimize: bool = False, elimination_order: str = DEFAULT_ELIMINATION_ORDER,
+                 detail: str = DEFAULT_TRACE_DETAIL):
         self.nfa = nfa
+        self.minimize = minimize
+        self.elimination_order = elimination_order  # Key of ELIMINATION_STRATEGIES
+        self.detail = detail  # Step trace detail level, see TRACE_DETAILS
+        self.eliminated = []
+        self.source = nfa  # Automaton the GNFA is built from (minimal DFA when requested)
         self.steps = []
         self.gnfa = None
 
     def convert(self) -> Dict[str, Any]:
-        self.steps = []
+        """Main conversion method"""
+        result = collect_steps(self.iter_convert())
+        self.steps = result['steps']
+        return result
+
+    def iter_convert(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run the conversion, yielding ('step', step) as each step is recorded and then ('result', result)"""
         try:
+            self.trace = StepTrace(self.detail)
             self.validate_nfa()
-            self.add_step('validate', 'Validate Input NFA',
-                          'Check that the input NFA is well-formed',
-                          {'nfa': self.nfa.to_dict()})
+            yield from self.add_step('validate', 'Validate Input NFA',
+                                     'Check that the input NFA is well-formed',
+                                     {'nfa': Snapshot('nfa', self.nfa.to_dict)})
+            self.source = self.nfa
+            if self.minimize:
+                # Determinize and minimize first so fewer states are eliminated
+                determinizer = NFAToDFAConverter(self.nfa, minimize=True)
+                self.source = determinizer.minimize_dfa(determinizer.subset_construction())
+                yield from self.add_step('minimize', 'Determinize and Minimize',
+                                         'Convert the NFA to a minimal DFA before state elimination '
+                                         f'({len(self.nfa.states)} NFA states → {len(self.source.states)} DFA states)',
+                                         {'minimizedDFA': Snapshot('dfa', self.source.to_dict), 'statesBefore': len(self.nfa.states),
+                                          'statesAfter': len(self.source.states)})
             self.gnfa = self.create_generalized_nfa()
-            self.add_step('create_gnfa', 'Create Generalized NFA',
-                          'Convert NFA to GNFA by adding new start and final states',
-                          {'gnfa': self.gnfa.to_dict()})
-            regex = self.eliminate_states()
-            self.add_step('eliminate_states', 'Eliminate States',
-                          'Remove intermediate states using state elimination algorithm',
-                          {'finalRegex': regex})
-            simplified_regex = self.simplify_regex(regex)
-            self.add_step('simplify', 'Simplify Regular Expression',
-                          'Apply simplification rules to make the regex more readable',
-                          {'originalRegex': regex, 'simplifiedRegex': simplified_regex})
-            return {
+            yield from self.add_step('create_gnfa', 'Create Generalized NFA',
+                                     'Convert NFA to GNFA by adding new start and final states',
+                                     {'gnfa': Snapshot('gnfa', self.gnfa.to_dict)})
+            term = self.eliminate_states()
+            # The raw regex can be huge, so it is only rendered for a full trace
+            regex = lambda: self.gnfa.label_text(term)
+            yield from self.add_step('eliminate_states', 'Eliminate States',
+                                     'Remove intermediate states using state elimination algorithm',
+                                     {'finalRegex': regex, 'eliminationOrder': self.elimination_order,
+                                      'eliminated': self.eliminated})
+            simplified_regex = self.simplify_regex(term)
+            yield from self.add_step('simplify', 'Simplify Regular Expression',
+                                     'Apply algebraic identities, drop redundant alternatives and factor out '
+                                     'common prefixes and suffixes to make the regex more readable',
+                                     {'originalRegex': regex, 'simplifiedRegex': simplified_regex})
+            yield 'result', {
                 'success': True,
                 'regex': simplified_regex,
-                'steps': self.steps,
                 'originalNfa': self.nfa.to_dict()
             }
         except Exception as e:
             logger.error(f"Error in nfa-to-regex conversion: {str(e)}")
-            return {
+            yield 'result', {
                 'success': False,
                 'error': str(e),
-                'steps': self.steps,
                 'originalNfa': self.nfa.to_dict()
             }
 
@@ -54,12 +84,14 @@ class NFAToRegexConverter:
             raise ValueError(f"Invalid NFA: {'; '.join(errors)}")
         if not self.nfa.start_states:
             raise ValueError("NFA must have at least one start state")
+        validate_elimination_order(self.elimination_order)
 
     def add_step(self, key, title, desc, data):
-        self.steps.append({'key': key, 'title': title, 'description': desc, 'data': data})
+        step = self.trace.add(key, title, desc, data)
+        if step is not None:
+            yield 'step', step
 
     def create_generalized_nfa(self):
-        from .dfa_to_regex import GeneralizedNFA
         gnfa = GeneralizedNFA()
         new_start = 'qstart'
         new_final = 'qfinal'
@@ -67,54 +99,27 @@ class NFAToRegexConverter:
         gnfa.add_state(new_final)
         gnfa.start_state = new_start
         gnfa.final_state = new_final
-        for state_id in self.nfa.states.keys():
+        source = self.source
+        start_states = [source.start_state] if isinstance(source, DFA) else source.start_states
+        for state_id in source.states.keys():
             gnfa.add_state(state_id)
-        for s in self.nfa.start_states:
+        for s in start_states:
             gnfa.add_transition(new_start, s, 'ε')
-        for f in self.nfa.final_states:
+        for f in source.final_states:
             gnfa.add_transition(f, new_final, 'ε')
-        for t in self.nfa.transitions.values():
+        for t in source.transitions.values():
             gnfa.add_transition(t.from_state, t.to_state, t.symbol)
         return gnfa
 
     def eliminate_states(self):
-        states = self.gnfa.get_states()
-        elimination_order = [s for s in states if s not in [self.gnfa.start_state, self.gnfa.final_state]]
-        for state in elimination_order:
+        self.eliminated = []
+        state = self.gnfa.next_state_to_eliminate(self.elimination_order)
+        while state is not None:
+            self.eliminated.append(state)
             self.gnfa.remove_state(state)
-        return self.gnfa.get_transition(self.gnfa.start_state, self.gnfa.final_state) or '∅'
+            state = self.gnfa.next_state_to_eliminate(self.elimination_order)
+        return self.gnfa.get_transition(self.gnfa.start_state, self.gnfa.final_state)
 
-    def simplify_regex(self, regex: str) -> str:
-        # Use the same simplification as DFAToRegexConverter
-        import re
-        if not regex or regex == '∅':
-            return '∅'
-        if regex == 'ε':
-            return 'ε'
-        simplified = regex
-        rules = [
-            (r'\(([a-zA-Z0-9])\)', r'\1'),
-            (r'ε\*', 'ε'),
-            (r'ε\+', 'ε'),
-            (r'ε\|ε', 'ε'),
-            (r'∅\*', 'ε'),
-            (r'∅\+', '∅'),
-            (r'∅\|(.+)', r'\1'),
-            (r'(.+)\|∅', r'\1'),
-            (r'∅(.+)', '∅'),
-            (r'(.+)∅', '∅'),
-            (r'ε(.+)', r'\1'),
-            (r'(.+)ε', r'\1'),
-            (r'\((.+)\*\)\*', r'(\1)*'),
-            (r'^\((.+)\)$', r'\1'),
-        ]
-        max_iterations = 10
-        iteration = 0
-        while iteration < max_iterations:
-            previous = simplified
-            for pattern, replacement in rules:
-                simplified = re.sub(pattern, replacement, simplified)
-            if simplified == previous:
-                break
-            iteration += 1
-        return simplified 
\ No newline at end of file
+    def simplify_regex(self, regex: Union[str, RegexNode]) -> str:
+        # Same structural simplification as DFAToRegexConverter
+        return RegexSimplifier(self.gnfa.regex if self.gnfa else None).simplify_regex(regex)
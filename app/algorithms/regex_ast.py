@@ -0,0 +1,217 @@
+"""
+Hash-consed regular expression terms used as GNFA edge labels
+"""
+
+from typing import Dict, Iterator, List, Tuple, Union
+from .automata_structures import EPSILON_SYMBOLS
+
+# Binding strength of each operator, used to decide where parentheses go
+PRECEDENCE = {'union': 0, 'concat': 1, 'star': 2, 'symbol': 3, 'epsilon': 3, 'empty': 3}
+
+class RegexNode:
+    """Immutable regex term node.
+    
+    Nodes are only created through a RegexBuilder, which interns them, so
+    structurally equal terms are the same object: equality and hashing are
+    by identity and subterms are shared rather than copied. ``size`` is the
+    number of nodes the term would have if it were written out as a tree.
+    Concatenation and union nodes may have more than two children.
+    """
+    
+    __slots__ = ('id', 'type', 'symbol', 'children', 'size', 'nullable')
+    
+    def __init__(self, node_id: int, node_type: str, symbol: str = None,
+                 children: Tuple['RegexNode', ...] = ()):
+        self.id = node_id
+        self.type = node_type
+        self.symbol = symbol
+        self.children = children
+        self.size = 1 + sum(child.size for child in children)
+        if node_type == 'concat':
+            self.nullable = all(child.nullable for child in children)
+        elif node_type == 'union':
+            self.nullable = any(child.nullable for child in children)
+        else:
+            self.nullable = node_type in ('star', 'epsilon')
+    
+    def iter_text(self) -> Iterator[str]:
+        """Stream the regex text piece by piece without materializing it, parenthesizing only where precedence requires"""
+        stack: List[Union[str, Tuple['RegexNode', int]]] = [(self, 0)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+            
+            node, required = item
+            if node.type == 'symbol':
+                yield node.symbol
+                continue
+            if node.type == 'epsilon':
+                yield 'ε'
+                continue
+            if node.type == 'empty':
+                yield '∅'
+                continue
+            
+            # Pushed in reverse so the text comes out left to right
+            wrap = PRECEDENCE[node.type] < required
+            if wrap:
+                stack.append(')')
+            if node.type == 'star':
+                stack.append('*')
+                stack.append((node.children[0], PRECEDENCE['symbol']))
+            elif node.type == 'concat':
+                stack.extend((child, PRECEDENCE['concat']) for child in reversed(node.children))
+            else:
+                for i in range(len(node.children) - 1, -1, -1):
+                    stack.append((node.children[i], PRECEDENCE['union']))
+                    if i:
+                        stack.append('|')
+            if wrap:
+                yield '('
+    
+    def postorder(self) -> List['RegexNode']:
+        """Distinct subterms of the term, children before parents"""
+        order: List['RegexNode'] = []
+        seen = set()
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+            elif node.id not in seen:
+                seen.add(node.id)
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children if child.id not in seen)
+        return order
+    
+    def to_string(self) -> str:
+        """Render the term as regex text.
+        
+        Each distinct subterm is rendered once, bottom-up, and its text is
+        dropped as soon as every term that uses it has been rendered.
+        """
+        order = self.postorder()
+        uses: Dict[int, int] = {}
+        for node in order:
+            for child in node.children:
+                uses[child.id] = uses.get(child.id, 0) + 1
+        
+        text: Dict[int, str] = {}
+        for node in order:
+            if node.type == 'symbol':
+                text[node.id] = node.symbol
+                continue
+            if not node.children:
+                text[node.id] = 'ε' if node.type == 'epsilon' else '∅'
+                continue
+            
+            required = PRECEDENCE['symbol'] if node.type == 'star' else PRECEDENCE[node.type]
+            parts = []
+            for child in node.children:
+                part = text[child.id]
+                if PRECEDENCE[child.type] < required:
+                    part = f"({part})"
+                parts.append(part)
+                uses[child.id] -= 1
+                if not uses[child.id]:
+                    del text[child.id]
+            
+            if node.type == 'star':
+                text[node.id] = parts[0] + '*'
+            elif node.type == 'concat':
+                text[node.id] = ''.join(parts)
+            else:
+                text[node.id] = '|'.join(parts)
+        return text[self.id]
+    
+    def __str__(self) -> str:
+        return self.to_string()
+    
+    def __repr__(self) -> str:
+        return f"RegexNode({self.id}, {self.type!r}, size={self.size})"
+
+class RegexBuilder:
+    """Intern table and smart constructors for RegexNode terms.
+    
+    Every constructor looks the term up by its operator and the IDs of its
+    children, so building a term is O(1) whatever the size of its operands.
+    The constructors apply the local ∅/ε identities (∅r = ∅, εr = r,
+    r|∅ = r, r|r = r, ε* = ∅* = ε, r** = r*) and order union operands,
+    smallest first and then by node ID, so the same alternatives always
+    give the same term.
+    """
+    
+    def __init__(self):
+        self._nodes: Dict[tuple, RegexNode] = {}
+        self.empty = self._intern(('empty',), 'empty')
+        self.epsilon = self._intern(('epsilon',), 'epsilon')
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    def _intern(self, key: tuple, node_type: str, symbol: str = None,
+                children: Tuple[RegexNode, ...] = ()) -> RegexNode:
+        node = self._nodes.get(key)
+        if node is None:
+            node = RegexNode(len(self._nodes), node_type, symbol, children)
+            self._nodes[key] = node
+        return node
+    
+    def symbol(self, symbol: str) -> RegexNode:
+        """Term for a single transition label (ε and ∅ map to their constants)"""
+        if symbol in EPSILON_SYMBOLS:
+            return self.epsilon
+        if symbol == '∅':
+            return self.empty
+        return self._intern(('symbol', symbol), 'symbol', symbol)
+    
+    def term(self, label: Union[str, RegexNode]) -> RegexNode:
+        """Accept either an existing term or a transition label"""
+        if isinstance(label, RegexNode):
+            return label
+        return self.symbol(label)
+    
+    def concat(self, left: RegexNode, right: RegexNode) -> RegexNode:
+        if left is self.empty or right is self.empty:
+            return self.empty
+        if left is self.epsilon:
+            return right
+        if right is self.epsilon:
+            return left
+        return self._intern(('concat', left.id, right.id), 'concat', children=(left, right))
+    
+    def union(self, left: RegexNode, right: RegexNode) -> RegexNode:
+        if left is self.empty:
+            return right
+        if right is self.empty or left is right:
+            return left
+        if (left.size, left.id) > (right.size, right.id):
+            left, right = right, left
+        return self._intern(('union', left.id, right.id), 'union', children=(left, right))
+    
+    def sequence(self, items: List[RegexNode]) -> RegexNode:
+        """Concatenation of any number of terms as a single node (no identities applied)"""
+        if not items:
+            return self.epsilon
+        if len(items) == 1:
+            return items[0]
+        return self._intern(('concat',) + tuple(item.id for item in items), 'concat', children=tuple(items))
+    
+    def alternation(self, alternatives: List[RegexNode]) -> RegexNode:
+        """Union of any number of distinct terms as a single node, smallest first"""
+        if not alternatives:
+            return self.empty
+        if len(alternatives) == 1:
+            return alternatives[0]
+        alternatives = sorted(alternatives, key=lambda term: (term.size, term.id))
+        return self._intern(('union',) + tuple(term.id for term in alternatives), 'union',
+                            children=tuple(alternatives))
+    
+    def star(self, child: RegexNode) -> RegexNode:
+        if child is self.empty or child is self.epsilon:
+            return self.epsilon
+        if child.type == 'star':
+            return child
+        return self._intern(('star', child.id), 'star', children=(child,))
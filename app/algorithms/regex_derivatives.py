@@ -0,0 +1,191 @@
+"""
+Regular Expression to DFA conversion using Brzozowski derivatives
+"""
+
+from collections import deque
+from typing import Dict, List, Tuple
+from .automata_structures import DFA, AutomataUtils, AlphabetPartition, StateStore, TransitionStore, EPSILON_SYMBOLS
+from .regex_ast import RegexBuilder, RegexNode
+from .regex_simplifier import RegexSimplifier
+from .regex_to_dfa import RegexParser, SyntaxTreeNode
+
+class DerivativeDFABuilder:
+    """Build a DFA whose states are the derivatives of a regular expression.
+    
+    The derivative of r by a symbol a matches the rest of every string in r
+    that starts with a, so r itself is the start state, a derivative is the
+    target of an a-transition and the nullable derivatives are final.
+    Terms are hash-consed and kept in a normal form (∅/ε identities, union
+    modulo associativity, commutativity and idempotence, flattened
+    concatenation, collapsed stars), so similar derivatives are the same
+    node. That keeps the number of states finite, lets a state be looked up
+    by node identity, and usually lands close to the minimal DFA without a
+    minimization pass. Derivatives are memoized per (term, symbol class),
+    and symbols that occur in exactly the same leaves share one class.
+    """
+    
+    MAX_STATES = 10000  # Guard against blow-up on pathological expressions
+    
+    def __init__(self, tree: SyntaxTreeNode):
+        self.tree = tree
+        self.builder = RegexBuilder()
+        self.normalizer = RegexSimplifier(self.builder, factor=False)
+        self.leaf_symbols: Dict[int, frozenset] = {}  # Leaf node ID -> symbols it matches
+        self.term = self.build_term(tree)
+        self.partition = self.partition_alphabet()
+        self.leaf_classes = {
+            leaf_id: frozenset(self.partition.class_of[symbol] for symbol in symbols)
+            for leaf_id, symbols in self.leaf_symbols.items()
+        }
+        self._derivatives: Dict[Tuple[int, int], RegexNode] = {}
+        self.state_terms: List[RegexNode] = []
+    
+    @classmethod
+    def from_regex(cls, regex: str) -> 'DerivativeDFABuilder':
+        if not regex:
+            raise ValueError("Regular expression cannot be empty")
+        return cls(RegexParser(regex).parse())
+    
+    def build_term(self, tree: SyntaxTreeNode) -> RegexNode:
+        """Translate the syntax tree into a normalized term, one node per post-order step"""
+        builder = self.builder
+        normalizer = self.normalizer
+        terms: List[RegexNode] = []
+        for node in tree.postorder():
+            if node.is_leaf():
+                if node.symbol in EPSILON_SYMBOLS:
+                    terms.append(builder.epsilon)
+                elif not node.symbols:
+                    terms.append(builder.empty)
+                else:
+                    # Character classes stay one leaf, so their symbols fall into one class
+                    leaf = builder.symbol(node.symbol)
+                    self.leaf_symbols[leaf.id] = node.symbols
+                    terms.append(leaf)
+            elif node.type in ('star', 'plus', 'optional'):
+                child = terms.pop()
+                if node.type == 'star':
+                    terms.append(normalizer.star(child))
+                elif node.type == 'plus':
+                    terms.append(normalizer.concat([child, normalizer.star(child)]))
+                else:
+                    terms.append(normalizer.union([builder.epsilon, child]))
+            else:
+                right = terms.pop()
+                left = terms.pop()
+                if node.type == 'concat':
+                    terms.append(normalizer.concat([left, right]))
+                else:
+                    terms.append(normalizer.union([left, right]))
+        return terms.pop()
+    
+    def partition_alphabet(self) -> AlphabetPartition:
+        """Group symbols that occur in exactly the same leaves; they have identical derivatives"""
+        occurrences: Dict[str, List[int]] = {}
+        for leaf_id, symbols in self.leaf_symbols.items():
+            for symbol in symbols:
+                occurrences.setdefault(symbol, []).append(leaf_id)
+        return AlphabetPartition({symbol: tuple(leaves) for symbol, leaves in occurrences.items()})
+    
+    def derivative(self, term: RegexNode, column: int) -> RegexNode:
+        """Derivative of a term by any symbol of an alphabet class, computed iteratively and memoized"""
+        memo = self._derivatives
+        key = (term.id, column)
+        if key in memo:
+            return memo[key]
+        
+        stack = [(term, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if (node.id, column) in memo:
+                continue
+            if node.children and not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in self._needed(node) if (child.id, column) not in memo)
+                continue
+            memo[(node.id, column)] = self._derive(node, column)
+        return memo[key]
+    
+    @staticmethod
+    def _needed(node: RegexNode) -> Tuple[RegexNode, ...]:
+        """Children whose derivatives the node's derivative uses"""
+        if node.type != 'concat':
+            return node.children
+        for i, child in enumerate(node.children):
+            if not child.nullable:
+                return node.children[:i + 1]
+        return node.children
+    
+    def _derive(self, node: RegexNode, column: int) -> RegexNode:
+        """Derivative of one node, given the memoized derivatives of its children"""
+        builder = self.builder
+        normalizer = self.normalizer
+        memo = self._derivatives
+        
+        if node.type == 'symbol':
+            return builder.epsilon if column in self.leaf_classes[node.id] else builder.empty
+        if node.type in ('epsilon', 'empty'):
+            return builder.empty
+        if node.type == 'star':
+            # d(r*) = d(r) r*
+            return normalizer.concat([memo[(node.children[0].id, column)], node])
+        if node.type == 'union':
+            return normalizer.union([memo[(child.id, column)] for child in node.children])
+        
+        # d(r1 r2 ... rn) = d(r1) r2...rn | d(r2) r3...rn | ... for as long as the prefix is nullable
+        children = node.children
+        alternatives = []
+        for i, child in enumerate(children):
+            alternatives.append(normalizer.concat([memo[(child.id, column)], *children[i + 1:]]))
+            if not child.nullable:
+                break
+        return normalizer.union(alternatives)
+    
+    def build_dfa(self) -> DFA:
+        """Explore derivatives breadth-first from the expression itself"""
+        empty = self.builder.empty
+        columns = range(len(self.partition))
+        self.state_terms = [self.term]
+        state_index = {self.term.id: 0}
+        queue = deque([self.term])
+        edges = []
+        
+        while queue:
+            term = queue.popleft()
+            current = state_index[term.id]
+            for column in columns:
+                target_term = self.derivative(term, column)
+                if target_term is empty:
+                    continue  # The dead state is left implicit, as in the other constructions
+                
+                target = state_index.get(target_term.id)
+                if target is None:
+                    if len(self.state_terms) >= self.MAX_STATES:
+                        raise ValueError(f"Derivative construction exceeded {self.MAX_STATES} states")
+                    target = len(self.state_terms)
+                    state_index[target_term.id] = target
+                    self.state_terms.append(target_term)
+                    queue.append(target_term)
+                edges.append((current, target, column))
+        
+        states = StateStore()
+        state_ids = [f"q{i}" for i in range(len(self.state_terms))]
+        final_states = []
+        for i, term in enumerate(self.state_terms):
+            states.append(state_ids[i], state_ids[i], i == 0, term.nullable)
+            if term.nullable:
+                final_states.append(state_ids[i])
+        
+        transitions = TransitionStore()
+        for current, target, column in edges:
+            for symbol in self.partition.classes[column]:
+                transitions.append(state_ids[current], state_ids[target], symbol, check_duplicates=False)
+        
+        alphabet = sorted(self.partition.class_of)
+        dfa = DFA(states, transitions, alphabet, state_ids[0], final_states)
+        dfa.states.set_positions(AutomataUtils.generate_state_positions(len(state_ids)))
+        return dfa
+    
+    def serialize_derivatives(self) -> Dict[str, str]:
+        """Regex of every DFA state, for the step trace"""
+        return {f"q{i}": term.to_string() for i, term in enumerate(self.state_terms)}
@@ -0,0 +1,223 @@
+"""
+Algebraic simplification of regular expressions on their term structure
+"""
+
+from typing import Dict, List, Optional, Union
+from .regex_ast import RegexBuilder, RegexNode
+from .regex_to_dfa import RegexParser
+
+class RegexSimplifier:
+    """Structural regex simplifier shared by the state elimination converters.
+    
+    Terms are rewritten in one bottom-up pass. Every distinct subterm is
+    simplified once and memoized, so shared subterms cost nothing extra and
+    the pass is linear in the number of distinct nodes, apart from sorting
+    union alternatives. The rules are:
+    
+    - ∅r = r∅ = ∅, εr = rε = r, r|∅ = r, ∅* = ε* = ε
+    - nested concatenations and unions are flattened; r*r* = r*,
+      r*r = rr* and (ε|r)r* = r*
+    - unions drop repeated alternatives, alternatives made only of pieces
+      of a starred alternative (r|r* = r*, r*rr* ⊆ r*) and ε when another
+      alternative is nullable; ε|rr* = r*; the rest are listed in
+      canonical order
+    - (r*)* = r*, (ε|r)* = r*, (rr*)* = r*, (r*|s)* = (r|s)* and
+      (r*s*)* = (r|s)*
+    - common prefixes and suffixes of alternatives are factored out
+      (ab|ac = a(b|c)) whenever that makes the term smaller, unless
+      ``factor`` is off
+    """
+    
+    def __init__(self, builder: Optional[RegexBuilder] = None, factor: bool = True):
+        self.builder = builder or RegexBuilder()
+        self.factor_alternatives = factor
+        self._memo: Dict[int, RegexNode] = {}
+    
+    def simplify_regex(self, regex: Union[str, RegexNode]) -> str:
+        """Simplify a term, or a regex string parsed with RegexParser, and render it"""
+        if isinstance(regex, str):
+            if not regex:
+                return '∅'
+            regex = self.parse(regex)
+        return self.simplify(regex).to_string()
+    
+    def parse(self, regex: str) -> RegexNode:
+        """Build a term from regex text; character classes are kept as single symbols"""
+        builder = self.builder
+        terms: List[RegexNode] = []
+        for node in RegexParser(regex).parse().postorder():
+            if node.is_leaf():
+                terms.append(builder.symbol(node.symbol))
+            elif node.type in ('star', 'plus', 'optional'):
+                child = terms.pop()
+                if node.type == 'star':
+                    terms.append(builder.star(child))
+                elif node.type == 'plus':
+                    terms.append(builder.concat(child, builder.star(child)))
+                else:
+                    terms.append(builder.union(builder.epsilon, child))
+            else:
+                right = terms.pop()
+                left = terms.pop()
+                if node.type == 'concat':
+                    terms.append(builder.concat(left, right))
+                else:
+                    terms.append(builder.union(left, right))
+        return terms.pop()
+    
+    def simplify(self, term: RegexNode) -> RegexNode:
+        """Simplify a term built with this simplifier's builder"""
+        memo = self._memo
+        for node in term.postorder():
+            if node.id in memo:
+                continue
+            if node.type == 'concat':
+                result = self.concat([memo[child.id] for child in node.children])
+            elif node.type == 'union':
+                result = self.union([memo[child.id] for child in node.children])
+            elif node.type == 'star':
+                result = self.star(memo[node.children[0].id])
+            else:
+                result = node
+            memo[node.id] = result
+        return memo[term.id]
+    
+    def concat(self, items: List[RegexNode]) -> RegexNode:
+        """Concatenation of simplified terms"""
+        builder = self.builder
+        sequence: List[RegexNode] = []
+        for item in items:
+            if item is builder.empty:
+                return builder.empty
+            for factor in (item.children if item.type == 'concat' else (item,)):
+                if factor is builder.epsilon:
+                    continue
+                if factor.type == 'star':
+                    if sequence and sequence[-1] is factor:
+                        continue  # r*r* = r*
+                    base = factor.children[0]
+                    while sequence and self.optional_of(sequence[-1]) is base:
+                        sequence.pop()  # (ε|r)r* = r*
+                elif sequence and sequence[-1].type == 'star' and sequence[-1].children[0] is factor:
+                    # r*r = rr*, and r*rr* = rr*
+                    star = sequence.pop()
+                    while sequence and sequence[-1] is star:
+                        sequence.pop()
+                    sequence.append(factor)
+                    factor = star
+                sequence.append(factor)
+        return builder.sequence(sequence)
+    
+    def union(self, alternatives: List[RegexNode]) -> RegexNode:
+        """Union of simplified terms"""
+        builder = self.builder
+        distinct: Dict[int, RegexNode] = {}
+        for alternative in alternatives:
+            for term in (alternative.children if alternative.type == 'union' else (alternative,)):
+                if term is not builder.empty:
+                    distinct.setdefault(term.id, term)
+        
+        # r|r* = r*, and likewise for anything built only from r, r* and,
+        # for a starred union, its alternatives
+        stars = [term for term in distinct.values() if term.type == 'star']
+        kept = [term for term in distinct.values()
+                if not any(term is not star and self.within_star(term, star) for star in stars)]
+        
+        if builder.epsilon in kept:
+            pluses = [term for term in kept if self.plus_of(term) is not None]
+            if pluses:
+                # ε|rr* = r*
+                kept = [term for term in kept if term is not builder.epsilon and term not in pluses]
+                kept.extend(builder.star(self.plus_of(term)) for term in pluses)
+            if any(term.nullable and term is not builder.epsilon for term in kept):
+                kept = [term for term in kept if term is not builder.epsilon]
+        
+        if self.factor_alternatives and len(kept) > 1:
+            kept = self.factor(self.factor(kept, from_end=False), from_end=True)
+        return builder.alternation(kept)
+    
+    def star(self, child: RegexNode) -> RegexNode:
+        """Kleene star of a simplified term"""
+        builder = self.builder
+        if child.type == 'concat' and all(item.type == 'star' for item in child.children):
+            child = self.union([item.children[0] for item in child.children])  # (r*s*)* = (r|s)*
+        elif self.plus_of(child) is not None:
+            child = self.plus_of(child)  # (rr*)* = r*
+        if child.type == 'union':
+            child = self.union([
+                term.children[0] if term.type == 'star' else self.plus_of(term) or term
+                for term in child.children if term is not builder.epsilon
+            ])
+        return builder.star(child)
+    
+    def plus_of(self, term: RegexNode) -> Optional[RegexNode]:
+        """r when the term is rr* (r+), otherwise None"""
+        if term.type != 'concat' or term.children[-1].type != 'star':
+            return None
+        base = term.children[-1].children[0]
+        prefix = term.children[:-1]
+        if len(prefix) == 1 and prefix[0] is base:
+            return base
+        if base.type == 'concat' and base.children == prefix:
+            return base
+        return None
+    
+    def optional_of(self, term: RegexNode) -> Optional[RegexNode]:
+        """r when the term is ε|r, otherwise None"""
+        if term.type == 'union' and len(term.children) == 2 and term.children[0] is self.builder.epsilon:
+            return term.children[1]
+        return None
+    
+    def within_star(self, term: RegexNode, star: RegexNode) -> bool:
+        """Whether the term only matches strings of star, judged from its pieces"""
+        inner = star.children[0]
+        pieces = {star.id, inner.id}
+        if inner.type == 'union':
+            pieces.update(child.id for child in inner.children)
+        
+        def piece(node: RegexNode) -> bool:
+            return node.id in pieces or (node.type == 'star' and node.children[0].id in pieces)
+        
+        if piece(term):
+            return True
+        return term.type == 'concat' and all(piece(factor) for factor in term.children)
+    
+    def factor(self, alternatives: List[RegexNode], from_end: bool) -> List[RegexNode]:
+        """Factor the longest common prefix (or suffix) out of alternatives sharing their first (last) factor"""
+        builder = self.builder
+        groups: Dict[int, List[List[RegexNode]]] = {}
+        result: List[RegexNode] = []
+        for term in alternatives:
+            if term is builder.epsilon:
+                result.append(term)
+                continue
+            factors = list(term.children) if term.type == 'concat' else [term]
+            if from_end:
+                factors.reverse()
+            groups.setdefault(factors[0].id, []).append(factors)
+        
+        for group in groups.values():
+            terms = [builder.sequence(factors[::-1] if from_end else factors) for factors in group]
+            if len(group) == 1:
+                result.extend(terms)
+                continue
+            
+            shared = 1
+            shortest = min(len(factors) for factors in group)
+            while shared < shortest and all(factors[shared] is group[0][shared] for factors in group):
+                shared += 1
+            
+            common = group[0][:shared]
+            rests = [factors[shared:] for factors in group]
+            if from_end:
+                common.reverse()
+                rests = [rest[::-1] for rest in rests]
+            rest = self.union([builder.sequence(rest) for rest in rests])
+            factored = self.concat([rest, builder.sequence(common)] if from_end
+                                   else [builder.sequence(common), rest])
+            
+            if factored.size < sum(term.size for term in terms):
+                result.append(factored)
+            else:
+                result.extend(terms)
+        return result
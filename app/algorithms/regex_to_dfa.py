@@ -3,380 +3,647 @@ Regular Expression to DFA conversion using direct construction method
 """
 
 import re
-from typing import List, Dict, Set, Optional, Any
-from .automata_structures import DFA, State, Transition, AutomataUtils
+from collections import deque
+from typing import List, Dict, Set, Optional, Any, Tuple, Iterator, Generator
+from .automata_structures import (
+    DFA, State, Transition, AutomataUtils, AlphabetPartition, StateStore, TransitionStore
+)
+from .dfa_minimization import DFAMinimizer
+from .step_trace import StepTrace, Snapshot, DEFAULT_TRACE_DETAIL, collect_steps
 import logging
 
 logger = logging.getLogger(__name__)
 
 class SyntaxTreeNode:
-    """Node in the syntax tree for regular expression"""
+    """Node in the syntax tree for regular expression.
+    
+    firstpos, lastpos and followpos are stored as position bitmasks (bit
+    ``i`` set for position ``i``). Masks are immutable ints, so a node can
+    share its child's mask without copying it; the set views are only built
+    when they are read.
+    """
     
     def __init__(self, node_type: str, symbol: str = None, left=None, right=None):
-        self.type = node_type  # 'symbol', 'concat', 'union', 'star'
-        self.symbol = symbol
+        self.type = node_type  # 'symbol', 'concat', 'union', 'star', 'plus', 'optional'
+        self.symbol = symbol  # Leaf label: a symbol, 'ε', '∅', '#' or a class like '[a-z]'
+        self.symbols = frozenset()  # Symbols a leaf matches
         self.left = left
         self.right = right
         self.position = None  # Position number for leaves
         self.nullable = False
-        self.firstpos = set()
-        self.lastpos = set()
-        self.followpos = set()
+        self.first_mask = 0
+        self.last_mask = 0
+        self.follow_mask = 0  # Leaves only
+    
+    @property
+    def firstpos(self) -> Set[int]:
+        return set(AutomataUtils.bits(self.first_mask))
+    
+    @property
+    def lastpos(self) -> Set[int]:
+        return set(AutomataUtils.bits(self.last_mask))
+    
+    @property
+    def followpos(self) -> Set[int]:
+        return set(AutomataUtils.bits(self.follow_mask))
     
     def is_leaf(self):
         return self.type == 'symbol'
     
+    def postorder(self) -> List['SyntaxTreeNode']:
+        """List the nodes of this subtree children-first, without recursion"""
+        order = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        order.reverse()
+        return order
+    
     def to_dict(self):
         """Convert node to dictionary for serialization"""
-        return {
-            'type': self.type,
-            'symbol': self.symbol,
-            'position': self.position,
-            'nullable': self.nullable,
-            'firstpos': list(self.firstpos),
-            'lastpos': list(self.lastpos),
-            'followpos': list(self.followpos),
-            'left': self.left.to_dict() if self.left else None,
-            'right': self.right.to_dict() if self.right else None
-        }
+        bits = AutomataUtils.bits
+        converted = {}
+        for node in self.postorder():
+            converted[id(node)] = {
+                'type': node.type,
+                'symbol': node.symbol,
+                'position': node.position,
+                'nullable': node.nullable,
+                'firstpos': bits(node.first_mask),
+                'lastpos': bits(node.last_mask),
+                'followpos': bits(node.follow_mask),
+                'left': converted[id(node.left)] if node.left else None,
+                'right': converted[id(node.right)] if node.right else None
+            }
+        return converted[id(self)]
+
+class RegexSyntaxError(ValueError):
+    """Syntax error in a regular expression, with the offending character offset"""
+    
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
 
 class RegexParser:
-    """Parser for regular expressions"""
+    """Parser for regular expressions.
+    
+    The regex is tokenized in a single pass and parsed with an iterative
+    shunting-yard loop, so parsing is linear in the length of the regex and
+    deep nesting cannot hit the recursion limit. Concatenation is implicit
+    and binds tighter than union; the postfix operators ``*``, ``+``, ``?``
+    and ``{m,n}`` bind tightest. A character class such as ``[a-z0-9]`` is
+    a single leaf carrying its symbol set. Errors are raised as
+    RegexSyntaxError carrying the offset of the offending character.
+    """
+    
+    END_MARKER = '#'
+    OPERATORS = {
+        '|': 'union', '*': 'star', '+': 'plus', '?': 'optional',
+        '(': 'lparen', ')': 'rparen'
+    }
+    POSTFIX = {'star', 'plus', 'optional', 'repeat'}
+    PRECEDENCE = {'union': 1, 'concat': 2}
+    MAX_REPEAT = 1000  # Upper bound for m and n in {m,n}
     
     def __init__(self, regex: str):
-        self.regex = self.preprocess_regex(regex)
+        self.regex = regex
+        self.tokens = self.tokenize(regex)
         self.position_counter = 0
-        self.position_symbols = {}  # position -> symbol mapping
-    
-    def preprocess_regex(self, regex: str) -> str:
-        """Preprocess regex to handle implicit concatenation"""
-        # Add explicit concatenation operators
-        result = ""
-        for i, char in enumerate(regex):
-            result += char
-            if i < len(regex) - 1:
-                next_char = regex[i + 1]
-                # Add concat operator between: symbol-symbol, )-symbol, )-( , *-symbol, *-(
-                if ((char.isalnum() or char in [')', '*']) and 
-                    (next_char.isalnum() or next_char == '(')):
-                    result += '·'  # Concatenation operator
-        return result
+        self.position_symbols = {}  # position -> symbol (or class) label
+        self.position_sets = {}  # position -> set of symbols matched there
     
-    def parse(self) -> SyntaxTreeNode:
-        """Parse regex and return syntax tree"""
-        return self.parse_union()
+    @staticmethod
+    def tokenize(regex: str) -> List[Tuple[str, Any, int]]:
+        """Split a regex into (kind, value, offset) tokens"""
+        operators = RegexParser.OPERATORS
+        tokens = []
+        offset = 0
+        length = len(regex)
+        while offset < length:
+            char = regex[offset]
+            kind = operators.get(char)
+            if kind is not None:
+                tokens.append((kind, char, offset))
+                offset += 1
+            elif char == '[':
+                end = RegexParser._class_end(regex, offset)
+                tokens.append(('class', (regex[offset:end], RegexParser._class_symbols(regex, offset, end)), offset))
+                offset = end
+            elif char == '{':
+                end = regex.find('}', offset)
+                if end < 0:
+                    raise RegexSyntaxError("Unterminated repetition", offset)
+                tokens.append(('repeat', RegexParser._repeat_bounds(regex[offset + 1:end], offset), offset))
+                offset = end + 1
+            elif char == RegexParser.END_MARKER:
+                raise RegexSyntaxError(f"'{char}' is reserved for the end marker", offset)
+            elif char.isalnum() or char in ('ε', '∅'):
+                tokens.append(('symbol', char, offset))
+                offset += 1
+            else:
+                raise RegexSyntaxError(f"Unexpected character '{char}'", offset)
+        return tokens
     
-    def parse_union(self) -> SyntaxTreeNode:
-        """Parse union (|) operations"""
-        left = self.parse_concat()
-        
-        while self.current_char() == '|':
-            self.consume('|')
-            right = self.parse_concat()
-            left = SyntaxTreeNode('union', left=left, right=right)
-        
-        return left
+    @staticmethod
+    def _class_end(regex: str, start: int) -> int:
+        end = regex.find(']', start + 1)
+        if end < 0:
+            raise RegexSyntaxError("Unterminated character class", start)
+        return end + 1
+    
+    @staticmethod
+    def _class_symbols(regex: str, start: int, end: int) -> frozenset:
+        """Expand the members and ranges of the class regex[start:end]"""
+        symbols = set()
+        offset = start + 1
+        last = end - 1  # Offset of the closing ']'
+        if offset < last and regex[offset] == '^':
+            raise RegexSyntaxError("Negated character classes are not supported", offset)
+        while offset < last:
+            char = regex[offset]
+            if not char.isalnum():
+                raise RegexSyntaxError(f"Unexpected character '{char}' in character class", offset)
+            if offset + 2 < last and regex[offset + 1] == '-':
+                high = regex[offset + 2]
+                if not high.isalnum() or high < char:
+                    raise RegexSyntaxError(f"Invalid range '{char}-{high}'", offset)
+                symbols.update(c for c in map(chr, range(ord(char), ord(high) + 1)) if c.isalnum())
+                offset += 3
+            else:
+                symbols.add(char)
+                offset += 1
+        if not symbols:
+            raise RegexSyntaxError("Empty character class", start)
+        return frozenset(symbols)
     
-    def parse_concat(self) -> SyntaxTreeNode:
-        """Parse concatenation (·) operations"""
-        left = self.parse_star()
+    @staticmethod
+    def _repeat_bounds(body: str, offset: int) -> Tuple[int, Optional[int]]:
+        """Parse the inside of {m}, {m,} or {m,n}; an open upper bound is None"""
+        match = re.fullmatch(r'(\d+)(,(\d*))?', body)
+        if not match:
+            raise RegexSyntaxError(f"Invalid repetition '{{{body}}}'", offset)
+        minimum = int(match.group(1))
+        if match.group(2) is None:
+            maximum = minimum
+        else:
+            maximum = int(match.group(3)) if match.group(3) else None
+        if maximum is not None and maximum < minimum:
+            raise RegexSyntaxError(f"Repetition minimum exceeds maximum in '{{{body}}}'", offset)
+        if max(minimum, maximum or 0) > RegexParser.MAX_REPEAT:
+            raise RegexSyntaxError(f"Repetition count exceeds {RegexParser.MAX_REPEAT}", offset)
+        return minimum, maximum
+    
+    def parse(self, augment: bool = False) -> SyntaxTreeNode:
+        """Parse regex and return syntax tree, optionally followed by the end marker"""
+        operands: List[SyntaxTreeNode] = []
+        operators: List[Tuple[str, int]] = []  # (operator, offset), including open parentheses
+        expect_operand = True
+        
+        for kind, value, offset in self.tokens:
+            if kind in ('symbol', 'class', 'lparen'):
+                if not expect_operand:
+                    self._push_operator('concat', operands, operators, offset)
+                if kind == 'symbol':
+                    operands.append(self.make_leaf(value))
+                    expect_operand = False
+                elif kind == 'class':
+                    operands.append(self.make_leaf(*value))
+                    expect_operand = False
+                else:
+                    operators.append(('lparen', offset))
+                    expect_operand = True
+            elif expect_operand:
+                if kind in self.POSTFIX:
+                    raise RegexSyntaxError(f"Nothing to repeat before '{self.regex[offset]}'", offset)
+                raise RegexSyntaxError(f"Expected a symbol or '(' before '{value}'", offset)
+            elif kind == 'repeat':
+                operands[-1] = self.repeat(operands[-1], *value)
+            elif kind in self.POSTFIX:
+                operands[-1] = SyntaxTreeNode(kind, left=operands[-1])
+            elif kind == 'union':
+                self._push_operator('union', operands, operators, offset)
+                expect_operand = True
+            else:
+                while operators and operators[-1][0] != 'lparen':
+                    self._reduce(operands, operators.pop()[0])
+                if not operators:
+                    raise RegexSyntaxError("Unbalanced ')'", offset)
+                operators.pop()
         
-        while self.current_char() == '·':
-            self.consume('·')
-            right = self.parse_star()
-            left = SyntaxTreeNode('concat', left=left, right=right)
+        if expect_operand:
+            raise RegexSyntaxError("Unexpected end of regular expression", len(self.regex))
+        while operators:
+            operator, offset = operators.pop()
+            if operator == 'lparen':
+                raise RegexSyntaxError("Unbalanced '('", offset)
+            self._reduce(operands, operator)
         
-        return left
+        tree = operands[0]
+        if augment:
+            tree = SyntaxTreeNode('concat', left=tree, right=self.make_leaf(self.END_MARKER))
+        return tree
     
-    def parse_star(self) -> SyntaxTreeNode:
-        """Parse Kleene star (*) operations"""
-        node = self.parse_factor()
+    def _push_operator(self, operator: str, operands: List[SyntaxTreeNode],
+                       operators: List[Tuple[str, int]], offset: int):
+        """Reduce operators of equal or higher precedence, then push a binary operator"""
+        precedence = self.PRECEDENCE[operator]
+        while operators and operators[-1][0] != 'lparen' and self.PRECEDENCE[operators[-1][0]] >= precedence:
+            self._reduce(operands, operators.pop()[0])
+        operators.append((operator, offset))
+    
+    def _reduce(self, operands: List[SyntaxTreeNode], operator: str):
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(SyntaxTreeNode(operator, left=left, right=right))
+    
+    def repeat(self, node: SyntaxTreeNode, minimum: int, maximum: Optional[int]) -> SyntaxTreeNode:
+        """Expand x{m,n} using as few copies of x as its positions allow.
         
-        while self.current_char() == '*':
-            self.consume('*')
-            node = SyntaxTreeNode('star', left=node)
+        Open and trivial bounds map onto existing operators (x{0,} is x*,
+        x{m,} is m-1 copies followed by x+). Otherwise the m required copies
+        are followed by nested optionals x(x(x)?)? rather than x?x?x?, which
+        keeps followpos linear in n - m. The parsed subtree is reused as the
+        first copy, and every further copy gets fresh positions.
+        """
+        if maximum is None and minimum == 0:
+            return SyntaxTreeNode('star', left=node)
+        if maximum == 0:
+            return self.make_leaf('ε')
         
-        return node
-    
-    def parse_factor(self) -> SyntaxTreeNode:
-        """Parse factors (symbols, parentheses)"""
-        if self.current_char() == '(':
-            self.consume('(')
-            node = self.parse_union()
-            self.consume(')')
-            return node
-        elif self.current_char() in ['ε', '∅'] or (self.current_char() and self.current_char().isalnum()):
-            symbol = self.current_char()
-            self.consume()
-            
-            # Create leaf node with position
-            self.position_counter += 1
-            node = SyntaxTreeNode('symbol', symbol=symbol)
-            node.position = self.position_counter
-            self.position_symbols[self.position_counter] = symbol
-            
-            return node
+        copies = [node] + [self.clone(node) for _ in range((maximum or minimum) - 1)]
+        if maximum is None:
+            copies[-1] = SyntaxTreeNode('plus', left=copies[-1])
+            required, optional = copies, []
         else:
-            raise ValueError(f"Unexpected character: {self.current_char()}")
-    
-    def current_char(self) -> Optional[str]:
-        """Get current character without consuming"""
-        if hasattr(self, 'pos') and self.pos < len(self.regex):
-            return self.regex[self.pos]
-        elif not hasattr(self, 'pos'):
-            self.pos = 0
-            return self.regex[self.pos] if self.pos < len(self.regex) else None
-        return None
-    
-    def consume(self, expected: str = None):
-        """Consume current character"""
-        if expected and self.current_char() != expected:
-            raise ValueError(f"Expected '{expected}', got '{self.current_char()}'")
+            required, optional = copies[:minimum], copies[minimum:]
         
-        if hasattr(self, 'pos'):
-            self.pos += 1
-        else:
-            self.pos = 1
+        tail = None
+        for copy in reversed(optional):
+            tail = SyntaxTreeNode('optional', left=copy if tail is None else SyntaxTreeNode('concat', left=copy, right=tail))
+        
+        result = None
+        for part in required + ([tail] if tail else []):
+            result = part if result is None else SyntaxTreeNode('concat', left=result, right=part)
+        return result
+    
+    def clone(self, node: SyntaxTreeNode) -> SyntaxTreeNode:
+        """Copy a subtree, giving its leaves fresh positions"""
+        copies = {}
+        for original in node.postorder():
+            if original.is_leaf():
+                copy = self.make_leaf(original.symbol, original.symbols)
+            else:
+                copy = SyntaxTreeNode(original.type,
+                                      left=copies[id(original.left)] if original.left else None,
+                                      right=copies[id(original.right)] if original.right else None)
+            copies[id(original)] = copy
+        return copies[id(node)]
+    
+    def make_leaf(self, symbol: str, symbols: Optional[frozenset] = None) -> SyntaxTreeNode:
+        """Create a leaf node with the next position number"""
+        if symbols is None:
+            symbols = frozenset() if symbol in ('ε', '∅', self.END_MARKER) else frozenset((symbol,))
+        self.position_counter += 1
+        node = SyntaxTreeNode('symbol', symbol=symbol)
+        node.symbols = symbols
+        node.position = self.position_counter
+        self.position_symbols[self.position_counter] = symbol
+        if symbols:
+            self.position_sets[self.position_counter] = symbols
+        return node
+
+# DFA constructions RegexToDFAConverter can use
+REGEX_ENGINES = ('followpos', 'derivatives')
 
 class RegexToDFAConverter:
-    """Convert regular expression to DFA using direct construction"""
+    """Convert regular expression to DFA using direct construction.
     
-    def __init__(self, regex: str):
+    The default 'followpos' engine builds the DFA from position sets; the
+    'derivatives' engine uses Brzozowski derivatives (DerivativeDFABuilder).
+    """
+    
+    def __init__(self, regex: str, minimize: bool = False, engine: str = 'followpos',
+                 detail: str = DEFAULT_TRACE_DETAIL):
         self.regex = regex
+        self.minimize = minimize
+        self.engine = engine
+        self.detail = detail  # Step trace detail level, see TRACE_DETAILS
+        self.derivatives = {}  # DFA state -> derivative regex, for the 'derivatives' engine
         self.steps = []
         self.syntax_tree = None
         self.position_symbols = {}
-        self.followpos_table = {}
+        self.position_sets = {}  # Position -> symbols matched there
+        self.postorder = []
+        self.followpos_masks = []  # Position -> followpos bitmask
+        self._followpos_table = None
     
     def convert(self) -> Dict[str, Any]:
         """Main conversion method"""
-        self.steps = []
-        
+        result = collect_steps(self.iter_convert())
+        self.steps = result['steps']
+        return result
+    
+    def iter_convert(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run the conversion, yielding ('step', step) as each step is recorded and then ('result', result)"""
         try:
+            self.trace = StepTrace(self.detail)
+            
             # Step 1: Validate and preprocess regex
             self.validate_regex()
             
-            # Step 2: Create augmented regex
-            augmented_regex = self.create_augmented_regex()
-            self.add_step('augment', 'Create Augmented Regular Expression',
-                         f'Add end marker to regex: {self.regex} → {augmented_regex}',
-                         {'originalRegex': self.regex, 'augmentedRegex': augmented_regex})
-            
-            # Step 3: Build syntax tree
-            self.syntax_tree = self.build_syntax_tree(augmented_regex)
-            self.add_step('syntax_tree', 'Build Syntax Tree',
-                         'Construct syntax tree from augmented regular expression',
-                         {'syntaxTree': self.syntax_tree.to_dict()})
-            
-            # Step 4: Calculate functions (nullable, firstpos, lastpos)
-            self.calculate_functions()
-            self.add_step('functions', 'Calculate nullable, firstpos, lastpos',
-                         'Compute attributes for each node in syntax tree',
-                         {'syntaxTree': self.syntax_tree.to_dict()})
-            
-            # Step 5: Calculate followpos
-            self.calculate_followpos()
-            self.add_step('followpos', 'Calculate followpos',
-                         'Compute followpos for each position',
-                         {'followposTable': self.serialize_followpos()})
+            if self.engine == 'derivatives':
+                dfa = yield from self.convert_with_derivatives()
+            else:
+                # Step 2: Create augmented regex
+                augmented_regex = self.create_augmented_regex()
+                yield from self.add_step('augment', 'Create Augmented Regular Expression',
+                                        f'Add end marker to regex: {self.regex} → {augmented_regex}',
+                                        {'originalRegex': self.regex, 'augmentedRegex': augmented_regex})
+                
+                # Step 3: Build syntax tree
+                self.syntax_tree = self.build_syntax_tree(self.regex)
+                yield from self.add_step('syntax_tree', 'Build Syntax Tree',
+                                        'Construct syntax tree from augmented regular expression',
+                                        {'syntaxTree': Snapshot('syntaxTree', self.syntax_tree.to_dict)})
+                
+                # Step 4: Calculate functions (nullable, firstpos, lastpos)
+                self.calculate_functions()
+                yield from self.add_step('functions', 'Calculate nullable, firstpos, lastpos',
+                                        'Compute attributes for each node in syntax tree',
+                                        {'syntaxTree': Snapshot('syntaxTree', self.syntax_tree.to_dict)})
+                
+                # Step 5: Calculate followpos
+                self.calculate_followpos()
+                yield from self.add_step('followpos', 'Calculate followpos',
+                                        'Compute followpos for each position',
+                                        {'followposTable': self.serialize_followpos})
+                
+                # Step 6: Construct DFA
+                dfa = self.construct_dfa()
+                yield from self.add_step('construct_dfa', 'Construct DFA',
+                                        'Build DFA states and transitions using position sets',
+                                        {'dfa': Snapshot('dfa', dfa.to_dict)})
             
-            # Step 6: Construct DFA
-            dfa = self.construct_dfa()
-            self.add_step('construct_dfa', 'Construct DFA',
-                         'Build DFA states and transitions using position sets',
-                         {'dfa': dfa.to_dict()})
+            # Step 7: Optionally minimize the DFA
+            if self.minimize:
+                minimizer = DFAMinimizer(dfa)
+                dfa = minimizer.minimize()
+                summary = minimizer.summary(dfa)
+                yield from self.add_step('minimize', 'Minimize DFA',
+                                        'Merge equivalent states using Hopcroft partition refinement '
+                                        f'({summary["statesBefore"]} → {summary["statesAfter"]} states)',
+                                        {'minimizedDFA': Snapshot('dfa', dfa.to_dict), **summary})
             
             simplified_regex = self.simplify_regex(self.regex)
             
-            return {
+            result = {
                 'success': True,
                 'dfa': dfa.to_dict(),
-                'steps': self.steps,
-                'syntaxTree': self.syntax_tree.to_dict(),
-                'followposTable': self.serialize_followpos(),
                 'regex': simplified_regex
             }
+            # The trace-only extras are skipped below full detail
+            if self.detail == 'full':
+                result['syntaxTree'] = self.syntax_tree.to_dict()
+                if self.engine == 'derivatives':
+                    result['derivatives'] = self.derivatives
+                else:
+                    result['followposTable'] = self.serialize_followpos()
+            yield 'result', result
             
         except Exception as e:
             logger.error(f"Error in regex-to-dfa conversion: {str(e)}")
-            return {
+            result = {
                 'success': False,
                 'error': str(e),
-                'steps': self.steps,
                 'regex': self.regex
             }
+            if isinstance(e, RegexSyntaxError):
+                result['errorOffset'] = e.offset
+            yield 'result', result
+    
+    def build_dfa(self) -> DFA:
+        """Build the DFA directly, without recording conversion steps"""
+        self.validate_regex()
+        if self.engine == 'derivatives':
+            from .regex_derivatives import DerivativeDFABuilder
+            self.syntax_tree = RegexParser(self.regex).parse()
+            dfa = DerivativeDFABuilder(self.syntax_tree).build_dfa()
+        else:
+            self.syntax_tree = self.build_syntax_tree(self.regex)
+            self.calculate_functions()
+            self.calculate_followpos()
+            dfa = self.construct_dfa()
+        if self.minimize:
+            dfa = DFAMinimizer(dfa).minimize()
+        return dfa
     
     def validate_regex(self):
         """Validate the input regular expression"""
         if not self.regex:
             raise ValueError("Regular expression cannot be empty")
         
-        # Check for balanced parentheses
-        paren_count = 0
-        for char in self.regex:
-            if char == '(':
-                paren_count += 1
-            elif char == ')':
-                paren_count -= 1
-                if paren_count < 0:
-                    raise ValueError("Unbalanced parentheses")
+        if self.engine not in REGEX_ENGINES:
+            raise ValueError(f"Unknown engine '{self.engine}'; expected one of: {', '.join(REGEX_ENGINES)}")
+        
+        # Reject unknown characters up front; structural errors come from the parser
+        RegexParser.tokenize(self.regex)
+    
+    def convert_with_derivatives(self) -> Generator[Tuple[str, Dict[str, Any]], None, DFA]:
+        """Steps of the derivative construction, returning the DFA; it needs no end marker or position functions"""
+        from .regex_derivatives import DerivativeDFABuilder  # Imported here: it builds on this module
+        
+        self.syntax_tree = RegexParser(self.regex).parse()
+        yield from self.add_step('syntax_tree', 'Build Syntax Tree',
+                                'Construct syntax tree from the regular expression',
+                                {'syntaxTree': Snapshot('syntaxTree', self.syntax_tree.to_dict)})
+        
+        builder = DerivativeDFABuilder(self.syntax_tree)
+        dfa = builder.build_dfa()
+        
+        def derivatives() -> Dict[str, str]:
+            self.derivatives = builder.serialize_derivatives()
+            return self.derivatives
         
-        if paren_count != 0:
-            raise ValueError("Unbalanced parentheses")
+        yield from self.add_step('derivatives', 'Compute Brzozowski Derivatives',
+                                'Each state is a derivative of the regex: its a-transition goes to the derivative '
+                                'by a, and states whose derivative matches the empty string are final',
+                                {'derivatives': derivatives})
+        
+        yield from self.add_step('construct_dfa', 'Construct DFA',
+                                f'Build DFA states and transitions from the {len(dfa.states)} distinct derivatives',
+                                {'dfa': Snapshot('dfa', dfa.to_dict)})
+        return dfa
     
     def create_augmented_regex(self) -> str:
         """Create augmented regular expression by adding end marker"""
         return f"({self.regex})#"
     
     def build_syntax_tree(self, regex: str) -> SyntaxTreeNode:
-        """Build syntax tree from regular expression"""
+        """Build the syntax tree of the augmented regular expression"""
         parser = RegexParser(regex)
-        tree = parser.parse()
+        tree = parser.parse(augment=True)
         self.position_symbols = parser.position_symbols
+        self.position_sets = parser.position_sets
         return tree
     
     def calculate_functions(self):
-        """Calculate nullable, firstpos, and lastpos for all nodes"""
-        self._calculate_functions_recursive(self.syntax_tree)
-    
-    def _calculate_functions_recursive(self, node: SyntaxTreeNode):
-        """Recursively calculate functions for syntax tree nodes"""
-        if node.is_leaf():
-            # Leaf node
-            if node.symbol in ['ε', 'epsilon']:
-                node.nullable = True
-                node.firstpos = set()
-                node.lastpos = set()
-            else:
-                node.nullable = False
-                node.firstpos = {node.position}
-                node.lastpos = {node.position}
-        else:
-            # Internal node - calculate for children first
-            if node.left:
-                self._calculate_functions_recursive(node.left)
-            if node.right:
-                self._calculate_functions_recursive(node.right)
+        """Calculate nullable, firstpos, and lastpos for all nodes in one post-order pass"""
+        self.postorder = self.syntax_tree.postorder()
+        
+        for node in self.postorder:
+            left = node.left
+            right = node.right
+            if node.is_leaf():
+                if node.symbol in ['ε', 'epsilon']:
+                    node.nullable = True
+                    node.first_mask = node.last_mask = 0
+                else:
+                    node.nullable = False
+                    node.first_mask = node.last_mask = 1 << node.position
+            
+            elif node.type == 'union':
+                node.nullable = left.nullable or right.nullable
+                node.first_mask = left.first_mask | right.first_mask
+                node.last_mask = left.last_mask | right.last_mask
             
-            # Calculate based on node type
-            if node.type == 'union':
-                node.nullable = node.left.nullable or node.right.nullable
-                node.firstpos = node.left.firstpos | node.right.firstpos
-                node.lastpos = node.left.lastpos | node.right.lastpos
-                
             elif node.type == 'concat':
-                node.nullable = node.left.nullable and node.right.nullable
-                if node.left.nullable:
-                    node.firstpos = node.left.firstpos | node.right.firstpos
-                else:
-                    node.firstpos = node.left.firstpos
-                
-                if node.right.nullable:
-                    node.lastpos = node.left.lastpos | node.right.lastpos
-                else:
-                    node.lastpos = node.right.lastpos
-                    
-            elif node.type == 'star':
+                node.nullable = left.nullable and right.nullable
+                node.first_mask = left.first_mask | right.first_mask if left.nullable else left.first_mask
+                node.last_mask = left.last_mask | right.last_mask if right.nullable else right.last_mask
+            
+            elif node.type in ('star', 'optional'):
                 node.nullable = True
-                node.firstpos = node.left.firstpos
-                node.lastpos = node.left.lastpos
+                node.first_mask = left.first_mask
+                node.last_mask = left.last_mask
+            
+            elif node.type == 'plus':
+                node.nullable = left.nullable
+                node.first_mask = left.first_mask
+                node.last_mask = left.last_mask
     
     def calculate_followpos(self):
-        """Calculate followpos for each position"""
-        self.followpos_table = {pos: set() for pos in self.position_symbols.keys()}
-        self._calculate_followpos_recursive(self.syntax_tree)
-    
-    def _calculate_followpos_recursive(self, node: SyntaxTreeNode):
-        """Recursively calculate followpos"""
-        if node.type == 'concat':
-            # For concat: followpos(i) includes firstpos(right) for all i in lastpos(left)
-            for pos in node.left.lastpos:
-                self.followpos_table[pos] |= node.right.firstpos
-                
-        elif node.type == 'star':
-            # For star: followpos(i) includes firstpos(star) for all i in lastpos(star)
-            for pos in node.lastpos:
-                self.followpos_table[pos] |= node.firstpos
+        """Calculate followpos for each position as a list of bitmasks indexed by position"""
+        bits = AutomataUtils.bits
+        follow = [0] * (len(self.position_symbols) + 1)
+        leaves = []
+        
+        for node in self.postorder:
+            if node.type == 'concat':
+                # followpos(i) includes firstpos(right) for all i in lastpos(left)
+                first = node.right.first_mask
+                if first:
+                    for pos in bits(node.left.last_mask):
+                        follow[pos] |= first
+            elif node.type in ('star', 'plus'):
+                # followpos(i) includes firstpos(star) for all i in lastpos(star), and likewise for plus
+                first = node.first_mask
+                if first:
+                    for pos in bits(node.last_mask):
+                        follow[pos] |= first
+            elif node.is_leaf():
+                leaves.append(node)
         
-        # Recurse on children
-        if node.left:
-            self._calculate_followpos_recursive(node.left)
-        if node.right:
-            self._calculate_followpos_recursive(node.right)
+        for leaf in leaves:
+            leaf.follow_mask = follow[leaf.position]
+        self.followpos_masks = follow
+        self._followpos_table = None
+    
+    @property
+    def followpos_table(self) -> Dict[int, Set[int]]:
+        """followpos as sets, built from the bitmasks the first time it is read"""
+        if self._followpos_table is None:
+            bits = AutomataUtils.bits
+            self._followpos_table = {
+                pos: set(bits(self.followpos_masks[pos])) for pos in self.position_symbols
+            }
+        return self._followpos_table
     
     def construct_dfa(self) -> DFA:
-        """Construct DFA from syntax tree and followpos table"""
-        states = []
-        transitions = []
-        alphabet = set()
+        """Construct DFA from syntax tree and followpos table.
         
-        # Extract alphabet (excluding end marker #)
-        for symbol in self.position_symbols.values():
-            if symbol not in ['#', 'ε', 'epsilon', '∅']:
-                alphabet.add(symbol)
+        Positions are indexed up front by symbol, symbols found at exactly
+        the same positions are merged into one class with a single position
+        bitmask, and the end marker position is found once. DFA states are
+        position bitmasks interned to integer IDs and explored
+        breadth-first: the successor of a state on a class is the OR of
+        followpos over ``state & positions(class)``, taken only for the
+        classes that occur in the state. Readable ``{1,2,3}`` state IDs and
+        per-symbol transitions are built once exploration has finished.
+        """
+        bits = AutomataUtils.bits
+        follow = self.followpos_masks
         
-        # Start state is firstpos of root
-        start_positions = self.syntax_tree.firstpos
-        start_state_id = self.positions_to_state_id(start_positions)
+        # Index positions by symbol; a class position is indexed under each of its symbols
+        positions_by_symbol = {}
+        for pos, symbols in self.position_sets.items():
+            for symbol in symbols:
+                positions_by_symbol.setdefault(symbol, []).append(pos)
+        alphabet = sorted(positions_by_symbol)
         
-        # BFS to construct states
-        state_queue = [(start_state_id, start_positions)]
-        processed_states = {start_state_id}
-        state_mapping = {start_state_id: start_positions}
+        # Symbols occurring at exactly the same positions form one class
+        partition = AlphabetPartition({symbol: tuple(positions) for symbol, positions in positions_by_symbol.items()})
+        class_symbols = partition.classes
+        class_masks = [AutomataUtils.mask(positions_by_symbol[members[0]]) for members in class_symbols]
+        position_columns = [()] * (len(self.position_symbols) + 1)
+        for pos, symbols in self.position_sets.items():
+            position_columns[pos] = tuple({partition.class_of[symbol] for symbol in symbols})
+        end_marker_mask = AutomataUtils.mask(pos for pos, symbol in self.position_symbols.items()
+                                             if symbol == RegexParser.END_MARKER)
         
-        while state_queue:
-            current_state_id, current_positions = state_queue.pop(0)
-            
-            # Check if this is a final state (contains end marker position)
-            end_marker_pos = None
-            for pos, symbol in self.position_symbols.items():
-                if symbol == '#':
-                    end_marker_pos = pos
-                    break
-            
-            is_final = end_marker_pos in current_positions
-            
-            # Create state
-            states.append(State(
-                current_state_id,
-                current_state_id,
-                current_state_id == start_state_id,
-                is_final
-            ))
+        # Start state is firstpos of root
+        start_mask = self.syntax_tree.first_mask
+        masks = [start_mask]
+        state_index = {start_mask: 0}
+        queue = deque([start_mask])
+        edges = []
+        
+        while queue:
+            current_mask = queue.popleft()
+            current = state_index[current_mask]
+            columns = set()
+            for pos in bits(current_mask):
+                columns.update(position_columns[pos])
             
-            # For each symbol in alphabet
-            for symbol in alphabet:
-                next_positions = set()
-                
-                # Find positions with this symbol
-                for pos in current_positions:
-                    if self.position_symbols.get(pos) == symbol:
-                        next_positions |= self.followpos_table[pos]
+            for column in sorted(columns):
+                next_mask = 0
+                for pos in bits(current_mask & class_masks[column]):
+                    next_mask |= follow[pos]
+                if not next_mask:
+                    continue
                 
-                if next_positions:
-                    next_state_id = self.positions_to_state_id(next_positions)
-                    
-                    # Add transition
-                    transitions.append(Transition(
-                        current_state_id,
-                        next_state_id,
-                        symbol
-                    ))
-                    
-                    # Add new state if not processed
-                    if next_state_id not in processed_states:
-                        state_queue.append((next_state_id, next_positions))
-                        processed_states.add(next_state_id)
-                        state_mapping[next_state_id] = next_positions
+                target = state_index.get(next_mask)
+                if target is None:
+                    target = len(masks)
+                    state_index[next_mask] = target
+                    masks.append(next_mask)
+                    queue.append(next_mask)
+                edges.append((current, target, column))
         
-        final_states = [s.id for s in states if s.is_final]
-        dfa = DFA(states, transitions, list(alphabet), start_state_id, final_states)
+        states = StateStore()
+        state_ids = []
+        final_states = []
+        for i, mask in enumerate(masks):
+            state_id = self.positions_to_state_id(bits(mask))
+            is_final = bool(mask & end_marker_mask)
+            states.append(state_id, state_id, i == 0, is_final)
+            state_ids.append(state_id)
+            if is_final:
+                final_states.append(state_id)
+        
+        transitions = TransitionStore()
+        for current, target, column in edges:
+            for symbol in class_symbols[column]:
+                transitions.append(state_ids[current], state_ids[target], symbol, check_duplicates=False)
+        
+        dfa = DFA(states, transitions, alphabet, state_ids[0], final_states)
         
         # Set positions for visualization
-        positions = AutomataUtils.generate_state_positions(len(states))
-        for i, state in enumerate(states):
-            if i < len(positions):
-                state.position = positions[i]
+        dfa.states.set_positions(AutomataUtils.generate_state_positions(len(masks)))
         
         return dfa
     
@@ -388,18 +655,14 @@ class RegexToDFAConverter:
     
     def serialize_followpos(self) -> Dict[str, List[int]]:
         """Serialize followpos table for JSON"""
-        return {str(pos): list(followpos) for pos, followpos in self.followpos_table.items()}
-    
-    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]):
-        """Add a conversion step"""
-        self.steps.append({
-            'id': f"step_{len(self.steps) + 1}",
-            'type': step_type,
-            'title': title,
-            'description': description,
-            'data': data,
-            'timestamp': len(self.steps) + 1
-        })
+        bits = AutomataUtils.bits
+        return {str(pos): bits(self.followpos_masks[pos]) for pos in self.position_symbols}
+    
+    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Record a conversion step at the trace's detail level, yielding it to the step stream"""
+        step = self.trace.add(step_type, title, description, data)
+        if step is not None:
+            yield 'step', step
 
     def simplify_regex(self, regex: str) -> str:
         # Implementation of simplify_regex method
@@ -0,0 +1,188 @@
+"""
+Regular Expression to NFA conversion using Thompson's construction
+"""
+
+from collections import deque
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+from .automata_structures import NFA, AutomataUtils, StateStore, TransitionStore, EPSILON_SYMBOLS
+from .regex_to_dfa import RegexParser, RegexSyntaxError, SyntaxTreeNode
+from .step_trace import StepTrace, Snapshot, DEFAULT_TRACE_DETAIL, collect_steps
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RegexToNFAConverter:
+    """Convert regular expression to NFA using Thompson's construction.
+    
+    Every syntax tree node becomes a fragment with one entry and one exit
+    state, so the NFA has at most two states and four transitions per node
+    and is linear in the size of the regex. No determinization happens
+    here; the NFA can be handed to NFAToDFAConverter, NFAToRegexConverter
+    or LazyDFAMatcher as is.
+    """
+    
+    def __init__(self, regex: str, detail: str = DEFAULT_TRACE_DETAIL):
+        self.regex = regex
+        self.detail = detail  # Step trace detail level, see TRACE_DETAILS
+        self.steps = []
+        self.syntax_tree = None
+    
+    def convert(self) -> Dict[str, Any]:
+        """Main conversion method"""
+        result = collect_steps(self.iter_convert())
+        self.steps = result['steps']
+        return result
+    
+    def iter_convert(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run the conversion, yielding ('step', step) as each step is recorded and then ('result', result)"""
+        try:
+            self.trace = StepTrace(self.detail)
+            
+            # Step 1: Parse the regex into a syntax tree
+            self.syntax_tree = self.build_syntax_tree()
+            yield from self.add_step('syntax_tree', 'Build Syntax Tree',
+                                    'Construct syntax tree from the regular expression',
+                                    {'syntaxTree': Snapshot('syntaxTree', self.syntax_tree.to_dict)})
+            
+            # Step 2: Build NFA fragments bottom-up
+            nfa = self.thompson_construction(self.syntax_tree)
+            yield from self.add_step('thompson', "Apply Thompson's Construction",
+                                    'Build an NFA fragment for every node of the syntax tree and '
+                                    'join the fragments with ε-transitions',
+                                    {'nfa': Snapshot('nfa', nfa.to_dict)})
+            
+            result = {
+                'success': True,
+                'nfa': nfa.to_dict(),
+                'regex': self.regex
+            }
+            if self.detail == 'full':
+                result['syntaxTree'] = self.syntax_tree.to_dict()
+            yield 'result', result
+        
+        except Exception as e:
+            logger.error(f"Error in regex-to-nfa conversion: {str(e)}")
+            result = {
+                'success': False,
+                'error': str(e),
+                'regex': self.regex
+            }
+            if isinstance(e, RegexSyntaxError):
+                result['errorOffset'] = e.offset
+            yield 'result', result
+    
+    def build_nfa(self) -> NFA:
+        """Build the NFA directly, without recording conversion steps"""
+        self.syntax_tree = self.build_syntax_tree()
+        return self.thompson_construction(self.syntax_tree)
+    
+    def build_syntax_tree(self) -> SyntaxTreeNode:
+        """Validate and parse the regular expression"""
+        if not self.regex:
+            raise ValueError("Regular expression cannot be empty")
+        return RegexParser(self.regex).parse()
+    
+    def thompson_construction(self, tree: SyntaxTreeNode) -> NFA:
+        """Build the NFA for a syntax tree, one fragment per node in post-order"""
+        edges: List[Tuple[int, int, str]] = []
+        fragments: List[Tuple[int, int]] = []  # (entry, exit) of each pending subtree
+        count = 0
+        
+        for node in tree.postorder():
+            if node.is_leaf():
+                entry, exit_ = count, count + 1
+                count += 2
+                if node.symbol in EPSILON_SYMBOLS:
+                    edges.append((entry, exit_, 'ε'))
+                for symbol in sorted(node.symbols):
+                    edges.append((entry, exit_, symbol))
+            
+            elif node.type == 'concat':
+                right_entry, right_exit = fragments.pop()
+                left_entry, left_exit = fragments.pop()
+                edges.append((left_exit, right_entry, 'ε'))
+                entry, exit_ = left_entry, right_exit
+            
+            elif node.type == 'union':
+                right_entry, right_exit = fragments.pop()
+                left_entry, left_exit = fragments.pop()
+                entry, exit_ = count, count + 1
+                count += 2
+                edges.extend([
+                    (entry, left_entry, 'ε'), (entry, right_entry, 'ε'),
+                    (left_exit, exit_, 'ε'), (right_exit, exit_, 'ε')
+                ])
+            
+            elif node.type == 'star':
+                child_entry, child_exit = fragments.pop()
+                entry, exit_ = count, count + 1
+                count += 2
+                edges.extend([
+                    (entry, child_entry, 'ε'), (entry, exit_, 'ε'),
+                    (child_exit, child_entry, 'ε'), (child_exit, exit_, 'ε')
+                ])
+            
+            elif node.type == 'plus':
+                child_entry, child_exit = fragments.pop()
+                entry, exit_ = count, count + 1
+                count += 2
+                edges.extend([
+                    (entry, child_entry, 'ε'),
+                    (child_exit, child_entry, 'ε'), (child_exit, exit_, 'ε')
+                ])
+            
+            elif node.type == 'optional':
+                child_entry, child_exit = fragments.pop()
+                entry, exit_ = count, count + 1
+                count += 2
+                edges.extend([
+                    (entry, child_entry, 'ε'), (entry, exit_, 'ε'),
+                    (child_exit, exit_, 'ε')
+                ])
+            
+            fragments.append((entry, exit_))
+        
+        start, accept = fragments.pop()
+        return self.build_nfa_from_edges(count, edges, start, accept)
+    
+    def build_nfa_from_edges(self, count: int, edges: List[Tuple[int, int, str]],
+                             start: int, accept: int) -> NFA:
+        """Materialize the NFA, naming states q0, q1, ... in breadth-first order from the start"""
+        adjacency = [[] for _ in range(count)]
+        for from_state, to_state, _ in edges:
+            adjacency[from_state].append(to_state)
+        
+        order = [start]
+        seen = bytearray(count)
+        seen[start] = 1
+        queue = deque(order)
+        while queue:
+            for target in adjacency[queue.popleft()]:
+                if not seen[target]:
+                    seen[target] = 1
+                    order.append(target)
+                    queue.append(target)
+        order.extend(state for state in range(count) if not seen[state])
+        
+        names = [None] * count
+        for i, state in enumerate(order):
+            names[state] = f"q{i}"
+        
+        states = StateStore()
+        for state in order:
+            states.append(names[state], names[state], state == start, state == accept)
+        
+        transitions = TransitionStore()
+        for from_state, to_state, symbol in edges:
+            transitions.append(names[from_state], names[to_state], symbol, check_duplicates=False)
+        
+        alphabet = sorted({symbol for _, _, symbol in edges if symbol not in EPSILON_SYMBOLS})
+        nfa = NFA(states, transitions, alphabet, [names[start]], [names[accept]])
+        nfa.states.set_positions(AutomataUtils.generate_state_positions(count))
+        return nfa
+    
+    def add_step(self, step_type: str, title: str, description: str, data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Record a conversion step at the trace's detail level, yielding it to the step stream"""
+        step = self.trace.add(step_type, title, description, data)
+        if step is not None:
+            yield 'step', step
@@ -0,0 +1,172 @@
+"""
+Conversion step traces at selectable detail levels, with delta-encoded snapshots
+"""
+
+import copy
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 'none' records no steps, 'summary' records each step without its snapshots
+# or other deferred data, and 'full' records everything
+TRACE_DETAILS = ('none', 'summary', 'full')
+DEFAULT_TRACE_DETAIL = 'full'
+
+def validate_trace_detail(detail: str) -> str:
+    """Check that the detail level exists"""
+    if detail not in TRACE_DETAILS:
+        raise ValueError(f"Unknown detail level '{detail}'; expected one of: {', '.join(TRACE_DETAILS)}")
+    return detail
+
+class Snapshot:
+    """Deferred snapshot of an evolving structure (an automaton, a GNFA, a syntax tree).
+    
+    Snapshots of the same ``stream`` are delta-encoded against each other
+    in a full trace, and ``build`` is only called when the trace needs it.
+    """
+    
+    __slots__ = ('stream', 'build')
+    
+    def __init__(self, stream: str, build: Callable[[], Any]):
+        self.stream = stream
+        self.build = build
+
+class StepTrace:
+    """Conversion steps recorded at a detail level.
+    
+    Step data values may be deferred: a callable is only evaluated in a
+    full trace, and a Snapshot additionally becomes a JSON merge patch
+    (RFC 7386) against the previous snapshot of its stream. Such fields are
+    listed in the step's ``snapshots`` (field -> stream) and the patched
+    ones hold ``{'$patch': ...}``; reconstruct_steps() restores the full
+    values. Plain values are kept in summary and full traces alike.
+    
+    The trace does not keep the steps: add() returns each one for the
+    converter to yield, so a streamed trace is never held in memory.
+    """
+    
+    def __init__(self, detail: str = DEFAULT_TRACE_DETAIL):
+        self.detail = validate_trace_detail(detail)
+        self.count = 0
+        self._latest: Dict[str, Any] = {}  # Stream -> its last snapshot
+    
+    def add(self, step_type: str, title: str, description: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build a step, evaluating and encoding its data as the detail level requires; None records nothing"""
+        if self.detail == 'none':
+            return None
+        self.count += 1
+        step = {
+            'id': f"step_{self.count}",
+            'type': step_type,
+            'title': title,
+            'description': description,
+            'data': {},
+            'timestamp': self.count
+        }
+        snapshots = {}
+        for key, value in data.items():
+            if isinstance(value, Snapshot):
+                if self.detail == 'full':
+                    step['data'][key] = self._encode(value)
+                    snapshots[key] = value.stream
+            elif callable(value):
+                if self.detail == 'full':
+                    step['data'][key] = value()
+            else:
+                step['data'][key] = value
+        if snapshots:
+            step['snapshots'] = snapshots
+        return step
+    
+    def _encode(self, snapshot: Snapshot) -> Any:
+        value = snapshot.build()
+        previous = self._latest.get(snapshot.stream)
+        self._latest[snapshot.stream] = value
+        if previous is None:
+            return value
+        patch = merge_patch(previous, value)
+        return value if patch is None else {'$patch': patch}
+
+def merge_patch(source: Any, target: Any) -> Optional[Any]:
+    """JSON merge patch turning source into target, or None if one cannot express it.
+    
+    Objects are diffed key by key and everything else is replaced whole;
+    a merge patch cannot set a value to null, so such changes give None.
+    Nested objects are walked with an explicit stack rather than compared
+    with ``==``, so snapshots as deep as a long regex's syntax tree cannot
+    hit the recursion limit.
+    """
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return None if target is None else target
+    patch: Dict[str, Any] = {}
+    pending = [(source, target, patch)]
+    nested = []  # (parent patch, key, child patch), every parent before its children
+    while pending:
+        old, new, out = pending.pop()
+        for key, value in new.items():
+            if key in old:
+                previous = old[key]
+                if isinstance(previous, dict) and isinstance(value, dict):
+                    out[key] = child = {}
+                    nested.append((out, key, child))
+                    pending.append((previous, value, child))
+                    continue
+                if previous == value:
+                    continue
+            if value is None:
+                return None
+            out[key] = value
+        for key in old:
+            if key not in new:
+                out[key] = None
+    # Drop the patches of unchanged objects, innermost first
+    for parent, key, child in reversed(nested):
+        if not child:
+            del parent[key]
+    return patch
+
+def apply_merge_patch(source: Any, patch: Any) -> Any:
+    """Apply a JSON merge patch, returning a new value"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(source) if isinstance(source, dict) else {}
+    pending = [(result, patch)]
+    while pending:
+        out, changes = pending.pop()
+        for key, value in changes.items():
+            if value is None:
+                out.pop(key, None)
+            elif isinstance(value, dict):
+                current = out.get(key)
+                out[key] = child = dict(current) if isinstance(current, dict) else {}
+                pending.append((child, value))
+            else:
+                out[key] = copy.deepcopy(value)
+    return result
+
+def reconstruct_steps(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of a full trace with every delta-encoded snapshot expanded"""
+    latest: Dict[str, Any] = {}
+    expanded = []
+    for step in steps:
+        step = dict(step)
+        snapshots = step.pop('snapshots', None)
+        if snapshots:
+            step['data'] = data = dict(step['data'])
+            for key, stream in snapshots.items():
+                value = data[key]
+                if isinstance(value, dict) and set(value) == {'$patch'}:
+                    value = apply_merge_patch(latest[stream], value['$patch'])
+                latest[stream] = value
+                data[key] = value
+        expanded.append(step)
+    return expanded
+
+def collect_steps(events: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Drain a converter's iter_convert() into the result it ends with, its steps gathered under 'steps'"""
+    steps: List[Dict[str, Any]] = []
+    result: Dict[str, Any] = {}
+    for kind, value in events:
+        if kind == 'step':
+            steps.append(value)
+        else:
+            result = value
+    return {**result, 'steps': steps}
@@ -0,0 +1,346 @@
+"""
+Streaming DFA matching over large files
+"""
+
+import argparse
+import codecs
+import json
+import mmap
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from .automata_structures import DFA, NFA, State, Transition
+from .regex_to_dfa import RegexToDFAConverter
+from .nfa_to_dfa import NFAToDFAConverter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Encodings where an ASCII byte always decodes to that ASCII character
+BYTE_SAFE_ENCODINGS = frozenset({'ascii', 'utf-8', 'iso8859-1', 'cp1252'})
+
+@contextmanager
+def map_file(source):
+    """Memory-map a file path or open binary file read-only"""
+    owned = not hasattr(source, 'fileno')
+    handle = open(source, 'rb') if owned else source
+    try:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield b''  # Empty files cannot be mapped
+        else:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                yield mapped
+    finally:
+        if owned:
+            handle.close()
+
+class StreamMatcher:
+    """Run a DFA over files too large to load into memory.
+    
+    The file is memory-mapped and read in fixed-size chunks, and only the
+    current DFA state is carried from one chunk to the next. When every
+    alphabet symbol is a single ASCII character the DFA runs directly on
+    bytes through per-state 256-entry rows, built the first time a state is
+    entered; a non-ASCII byte can never match, exactly as with decoded
+    text. Otherwise each chunk goes through an incremental decoder and the
+    DFA runs on characters. Scanning stops as soon as the dead state is
+    reached.
+    """
+    
+    DEFAULT_CHUNK_SIZE = 1 << 20
+    
+    def __init__(self, dfa: DFA, encoding: str = 'utf-8', chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        codec = codecs.lookup(encoding)
+        if '\n'.encode(codec.name) != b'\n':
+            raise ValueError(f"Encoding '{encoding}' is not ASCII-compatible")
+        
+        self.dfa = dfa
+        self.compiled = dfa.compile()
+        self.encoding = codec.name
+        self.chunk_size = chunk_size
+        self.byte_mode = codec.name in BYTE_SAFE_ENCODINGS and all(
+            len(symbol) == 1 and ord(symbol) < 128 for symbol in self.compiled.symbols
+        )
+        self._rows: List[Optional[List[int]]] = [None] * (self.compiled.num_states + 1)
+    
+    @classmethod
+    def from_regex(cls, regex: str, **options) -> 'StreamMatcher':
+        """Build a matcher for a regular expression, through its minimal DFA"""
+        return cls(RegexToDFAConverter(regex, minimize=True).build_dfa(), **options)
+    
+    @classmethod
+    def from_nfa(cls, nfa: NFA, **options) -> 'StreamMatcher':
+        """Build a matcher for an NFA, through its minimal DFA"""
+        return cls(NFAToDFAConverter(nfa, minimize=True).build_dfa(), **options)
+    
+    def _byte_row(self, state: int) -> List[int]:
+        """Expand one state's table row to all 256 byte values"""
+        compiled = self.compiled
+        base = state * compiled.width
+        row = [compiled.table[base + compiled.num_classes]] * 256
+        for symbol, column in compiled.symbol_index.items():
+            row[ord(symbol)] = compiled.table[base + column]
+        self._rows[state] = row
+        return row
+    
+    def _feed_bytes(self, state: int, data: bytes) -> int:
+        dead = self.compiled.dead
+        rows = self._rows
+        row = rows[state] or self._byte_row(state)
+        for byte in data:
+            state = row[byte]
+            if state == dead:
+                return dead
+            row = rows[state] or self._byte_row(state)
+        return state
+    
+    def _feed_text(self, state: int, text: str) -> int:
+        compiled = self.compiled
+        table = compiled.table
+        width = compiled.width
+        dead = compiled.dead
+        lookup = compiled.symbol_index.get
+        other = compiled.num_classes
+        for char in text:
+            state = table[state * width + lookup(char, other)]
+            if state == dead:
+                return dead
+        return state
+    
+    def _feeder(self):
+        """Return ``feed(state, data, final)`` and ``reset()`` functions for the current mode.
+        
+        ``final`` marks the end of an input string, after which any
+        undecoded bytes are discarded.
+        """
+        if self.byte_mode:
+            return (lambda state, data, final: self._feed_bytes(state, data)), (lambda: None)
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        feed_text = self._feed_text
+        
+        def feed(state, data, final):
+            state = feed_text(state, decoder.decode(data, final))
+            if final:
+                decoder.reset()
+            return state
+        return feed, decoder.reset
+    
+    def match_stream(self, source) -> Dict[str, Any]:
+        """Run the DFA over the whole file as a single input string"""
+        started = time.perf_counter()
+        compiled = self.compiled
+        dead = compiled.dead
+        feed, _ = self._feeder()
+        state = compiled.start
+        scanned = 0
+        
+        with map_file(source) as mapped:
+            size = len(mapped)
+            for offset in range(0, size, self.chunk_size):
+                data = mapped[offset:offset + self.chunk_size]
+                scanned += len(data)
+                state = feed(state, data, scanned == size)
+                if state == dead:
+                    break
+        
+        return report_throughput({
+            'accepted': bool(compiled.accepting[state]),
+            'finalState': compiled.state_id(state),
+            'bytesTotal': size
+        }, scanned, started)
+    
+    def _scan_lines(self, mapped) -> Iterator[Tuple[int, int, int, bool]]:
+        """Yield (line number, start offset, end offset, accepted) for every line of a mapped file.
+        
+        Lines end at '\\n' and a '\\r' just before it is not part of the
+        line. Chunk boundaries never separate the two, so only the DFA
+        state has to survive from one chunk to the next.
+        """
+        compiled = self.compiled
+        start = compiled.start
+        dead = compiled.dead
+        accepting = compiled.accepting
+        feed, reset = self._feeder()
+        size = len(mapped)
+        
+        state = start
+        line_number = 1
+        line_start = 0
+        offset = 0
+        while offset < size:
+            end = min(offset + self.chunk_size, size)
+            if end < size and mapped[end - 1] == 13:
+                # Keep a '\r' in the same chunk as the byte after it
+                end = end - 1 if end - 1 > offset else end + 1
+            data = mapped[offset:end]
+            position = 0
+            while True:
+                newline = data.find(b'\n', position)
+                segment_end = len(data) if newline < 0 else newline
+                if newline >= 0 and segment_end > position and data[segment_end - 1] == 13:
+                    segment_end -= 1
+                final = newline >= 0 or end == size
+                if state != dead:
+                    state = feed(state, data[position:segment_end], final)
+                elif final:
+                    reset()
+                if newline < 0:
+                    break
+                yield line_number, line_start, offset + segment_end, bool(accepting[state])
+                line_number += 1
+                line_start = offset + newline + 1
+                position = newline + 1
+                state = start
+            offset = end
+        
+        if line_start < size:
+            yield line_number, line_start, size, bool(accepting[state])
+    
+    def iter_lines(self, source) -> Iterator[Tuple[int, int, int, bool]]:
+        """Yield (line number, start offset, end offset, accepted) for every line"""
+        with map_file(source) as mapped:
+            yield from self._scan_lines(mapped)
+    
+    def accepted_lines(self, source) -> Iterator[Tuple[int, str]]:
+        """Yield (line number, text) for every line the DFA accepts"""
+        with map_file(source) as mapped:
+            for line_number, start, end, accepted in self._scan_lines(mapped):
+                if accepted:
+                    yield line_number, self._line_text(mapped, start, end)
+    
+    def match_lines(self, source, max_matches: Optional[int] = 1000) -> Dict[str, Any]:
+        """Match every line separately, counting accepted lines and keeping the first matches"""
+        started = time.perf_counter()
+        total = 0
+        accepted_count = 0
+        matches = []
+        
+        with map_file(source) as mapped:
+            size = len(mapped)
+            for line_number, start, end, accepted in self._scan_lines(mapped):
+                total += 1
+                if not accepted:
+                    continue
+                accepted_count += 1
+                if max_matches is None or len(matches) < max_matches:
+                    matches.append({
+                        'line': line_number,
+                        'offset': start,
+                        'text': self._line_text(mapped, start, end)
+                    })
+        
+        return report_throughput({
+            'totalLines': total,
+            'acceptedLines': accepted_count,
+            'matches': matches,
+            'truncated': len(matches) < accepted_count
+        }, size, started)
+    
+    def _line_text(self, mapped, start: int, end: int) -> str:
+        return mapped[start:end].decode(self.encoding, errors='replace')
+
+def report_throughput(result: Dict[str, Any], scanned: int, started: float) -> Dict[str, Any]:
+    """Add byte counts, elapsed time and throughput since ``started`` to a result"""
+    seconds = time.perf_counter() - started
+    result['bytesScanned'] = scanned
+    result['seconds'] = round(seconds, 6)
+    result['throughputMBps'] = round(scanned / 1e6 / seconds, 2) if seconds > 0 else None
+    return result
+
+def load_automaton(path: str, automaton_type: str):
+    """Load a DFA or NFA from a JSON file in the API format"""
+    with open(path, encoding='utf-8') as handle:
+        data = json.load(handle)
+    
+    states = [
+        State(state['id'], state.get('label', state['id']),
+              state.get('isStart', False), state.get('isFinal', False))
+        for state in data.get('states', [])
+    ]
+    transitions = [
+        Transition(transition['from'], transition['to'], transition['symbol'])
+        for transition in data.get('transitions', [])
+    ]
+    alphabet = data.get('alphabet', [])
+    final_states = data.get('finalStates', [])
+    
+    if automaton_type == 'dfa':
+        return DFA(states, transitions, alphabet, data.get('startState'), final_states)
+    return NFA(states, transitions, alphabet, data.get('startStates', []), final_states)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: ``python -m app.algorithms.stream_matcher``"""
+    parser = argparse.ArgumentParser(
+        prog='python -m app.algorithms.stream_matcher',
+        description='Match large files against a regular expression, DFA or NFA.'
+    )
+    automaton = parser.add_mutually_exclusive_group(required=True)
+    automaton.add_argument('-e', '--regex', help='regular expression to match')
+    automaton.add_argument('--dfa', metavar='FILE', help='DFA as JSON in the API format')
+    automaton.add_argument('--nfa', metavar='FILE', help='NFA as JSON in the API format')
+    parser.add_argument('files', nargs='+', help='files to scan')
+    parser.add_argument('-l', '--lines', action='store_true',
+                        help='match every line separately and print the accepted lines')
+    parser.add_argument('-c', '--count', action='store_true',
+                        help='with --lines, only print the number of accepted lines')
+    parser.add_argument('--json', action='store_true', help='print a JSON summary per file')
+    parser.add_argument('--max-matches', type=int, default=1000,
+                        help='with --lines --json, the number of matches to include (default: 1000)')
+    parser.add_argument('--encoding', default='utf-8', help='text encoding (default: utf-8)')
+    parser.add_argument('--chunk-size', type=int, default=StreamMatcher.DEFAULT_CHUNK_SIZE,
+                        help='bytes read per chunk (default: 1 MiB)')
+    args = parser.parse_args(argv)
+    
+    try:
+        options = {'encoding': args.encoding, 'chunk_size': args.chunk_size}
+        if args.regex is not None:
+            matcher = StreamMatcher.from_regex(args.regex, **options)
+        elif args.dfa:
+            matcher = StreamMatcher(load_automaton(args.dfa, 'dfa'), **options)
+        else:
+            matcher = StreamMatcher.from_nfa(load_automaton(args.nfa, 'nfa'), **options)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(str(e))
+    
+    any_accepted = False
+    show_names = len(args.files) > 1
+    for path in args.files:
+        prefix = f"{path}:" if show_names else ''
+        try:
+            if not args.lines:
+                result = matcher.match_stream(path)
+                accepted = result['accepted']
+                print(json.dumps({'file': path, **result}) if args.json
+                      else f"{prefix}{'accepted' if accepted else 'rejected'}")
+            elif args.json or args.count:
+                # JSON keeps the first matches only, so memory stays bounded on huge files
+                result = matcher.match_lines(path, max_matches=args.max_matches if args.json else 0)
+                accepted = result['acceptedLines'] > 0
+                print(json.dumps({'file': path, **result}) if args.json
+                      else f"{prefix}{result['acceptedLines']}")
+            else:
+                started = time.perf_counter()
+                accepted = False
+                for line_number, text in matcher.accepted_lines(path):
+                    accepted = True
+                    print(f"{prefix}{line_number}:{text}")
+                result = report_throughput({}, os.path.getsize(path), started)
+        except OSError as e:
+            print(f"{path}: {e.strerror or e}", file=sys.stderr)
+            continue
+        
+        any_accepted = any_accepted or accepted
+        if not args.json:
+            print(f"{path}: {result['bytesScanned']} bytes in {result['seconds']:.3f}s "
+                  f"({result['throughputMBps']} MB/s)", file=sys.stderr)
+    
+    return 0 if any_accepted else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Content-addressed cache for conversion responses
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+def canonical_automaton(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize automaton JSON so that equal automata get equal cache keys.
+    
+    Fields the converters ignore (positions, transition IDs) are dropped
+    and the sets (alphabet, start and final states) are sorted. States and
+    transitions keep their input order and symbols their spelling, since
+    both show up in the response: in the step snapshots of the input, in
+    the echoed input, and through the tie-breaks of state elimination.
+    Exact duplicate transitions are dropped, as the automaton drops them.
+    """
+    states = [
+        [state['id'], state.get('label', state['id']), bool(state.get('isStart', False)),
+         bool(state.get('isFinal', False))]
+        for state in data.get('states', [])
+    ]
+    transitions = dict.fromkeys((t['from'], t['symbol'], t['to']) for t in data.get('transitions', []))
+    
+    canonical = {
+        'states': states,
+        'transitions': [list(t) for t in transitions],
+        'alphabet': sorted(set(data.get('alphabet', []))),
+        'finalStates': sorted(set(data.get('finalStates', [])))
+    }
+    if 'startStates' in data:
+        canonical['startStates'] = sorted(set(data['startStates']))
+    if 'startState' in data:
+        canonical['startState'] = data['startState']
+    return canonical
+
+class ConversionCache:
+    """LRU cache of serialized conversion responses, bounded by their total size in bytes.
+    
+    Entries are keyed by a SHA-256 hash of the conversion name and its
+    canonical input, and hold the exact response body, so a hit is
+    returned without re-running the conversion or re-serializing its steps.
+    A ``max_bytes`` of 0 disables caching.
+    """
+    
+    KEY_VERSION = 2  # Bumped when the canonical input changes, so stored responses under old keys go unused
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def key(conversion: str, payload: Dict[str, Any]) -> str:
+        """Content address of a conversion request"""
+        text = json.dumps([ConversionCache.KEY_VERSION, conversion, payload], sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body for a key and mark it most recently used"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+    
+    def put(self, key: str, body: bytes):
+        """Store a body, evicting least recently used entries to stay within max_bytes"""
+        cost = len(body) + len(key)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old) + len(key)
+            while self._entries and self.size + cost > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted) + len(evicted_key)
+                self.evictions += 1
+            self._entries[key] = body
+            self.size += cost
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and size counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
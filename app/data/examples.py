@@ -2,12 +2,23 @@
 Example problems database for automata theory conversions
 """
 
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Any, Dict
 from ..algorithms.automata_structures import NFA, DFA, State, Transition
 from ..algorithms.nfa_to_dfa import NFABuilder
 from ..algorithms.dfa_to_regex import DFABuilder
 
 def get_examples():
-    """Get all example problems organized by conversion type"""
+    """Get all example problems organized by conversion type.
+    
+    The catalogue is built once at import and is read-only.
+    """
+    return CATALOGUE.examples
+
+def build_examples():
+    """Build the example problems from scratch, organized by conversion type"""
     return {
         'regex-to-dfa': get_regex_to_dfa_examples(),
         'nfa-to-dfa': get_nfa_to_dfa_examples(),
@@ -911,3 +922,41 @@ def get_nfa_to_regex_examples():
             }
         ]
     }
+
+def _freeze(value):
+    """Read-only copy of nested dicts and lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class ExampleCatalogue:
+    """The examples, built once, with their API responses serialized up front.
+    
+    ``responses`` holds the JSON body of /api/examples/<type> for every
+    conversion type and ``etags`` a content hash of each body, so requests
+    are answered from bytes and revalidated with If-None-Match. ``html_json``
+    is the whole catalogue escaped for embedding in a <script> tag.
+    """
+    
+    def __init__(self, examples: Dict[str, Any]):
+        self.examples = _freeze(examples)
+        self.responses: Dict[str, bytes] = {}
+        self.etags: Dict[str, str] = {}
+        for conversion_type, levels in examples.items():
+            body = json.dumps({'success': True, 'examples': levels}, ensure_ascii=False,
+                              separators=(',', ':')).encode('utf-8')
+            self.responses[conversion_type] = body
+            self.etags[conversion_type] = hashlib.sha256(body).hexdigest()[:32]
+        
+        # Same escaping as the tojson template filter
+        self.html_json = (json.dumps(examples, ensure_ascii=False)
+                          .replace('<', '\\u003c').replace('>', '\\u003e')
+                          .replace('&', '\\u0026').replace("'", '\\u0027'))
+    
+    def payloads(self, conversion_type: str):
+        """Fresh, mutable copies of one conversion type's examples"""
+        return json.loads(self.responses[conversion_type])['examples']
+
+CATALOGUE = ExampleCatalogue(build_examples())
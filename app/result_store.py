@@ -0,0 +1,155 @@
+"""
+Persistent conversion result store shared by all worker processes
+"""
+
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Optional
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+db = SQLAlchemy()
+
+class ConversionResult(db.Model):
+    """One compressed conversion response, addressed by its ConversionCache key"""
+    
+    __tablename__ = 'conversion_results'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    body = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON response
+    size = db.Column(db.Integer, nullable=False)  # Compressed size in bytes
+    created_at = db.Column(db.Float, nullable=False)
+    last_used = db.Column(db.Float, nullable=False, index=True)
+
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite(connection, _record):
+    """Let several workers read SQLite while one writes"""
+    if isinstance(connection, sqlite3.Connection):
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+class ResultStore:
+    """Compressed conversion responses in a database shared across workers and restarts.
+    
+    Bodies are stored zlib-compressed exactly as they were sent, so a hit
+    is decompressed and returned without parsing or re-serializing JSON.
+    Entries older than ``ttl`` seconds are ignored and later pruned, and
+    once the compressed bodies exceed ``max_bytes`` the least recently used
+    ones are deleted. Every storage error is logged and treated as a miss,
+    so the store can never fail a conversion. A ``max_bytes`` of 0 disables
+    the store. The table is created on first use, not when the app is
+    imported.
+    """
+    
+    PRUNE_EVERY = 100  # Writes between pruning passes
+    TOUCH_INTERVAL = 60.0  # Seconds before a hit refreshes last_used again
+    
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max(0, max_bytes)
+        self._writes = 0
+        self._ready = False  # Whether the table is known to exist
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+    
+    def _prepare(self):
+        """Create the instance folder and the table the first time the store is used"""
+        if not self._ready:
+            os.makedirs(current_app.instance_path, exist_ok=True)
+            db.create_all()
+            self._ready = True
+    
+    def _expired(self, entry: ConversionResult, now: float) -> bool:
+        return self.ttl > 0 and entry.created_at < now - self.ttl
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored response body for a key, or None"""
+        try:
+            self._prepare()
+            now = time.time()
+            entry = db.session.get(ConversionResult, key)
+            if entry is None or self._expired(entry, now):
+                self.misses += 1
+                return None
+            body = zlib.decompress(entry.body)
+            if entry.last_used < now - self.TOUCH_INTERVAL:
+                entry.last_used = now
+                db.session.commit()
+            self.hits += 1
+            return body
+        except (SQLAlchemyError, OSError, zlib.error) as e:
+            db.session.rollback()
+            self.errors += 1
+            logger.warning(f"Result store read failed: {str(e)}")
+            return None
+    
+    def put(self, key: str, body: bytes):
+        """Store a response body, pruning the table every PRUNE_EVERY writes"""
+        compressed = zlib.compress(body, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        try:
+            self._prepare()
+            now = time.time()
+            db.session.merge(ConversionResult(key=key, body=compressed, size=len(compressed),
+                                              created_at=now, last_used=now))
+            db.session.commit()
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self.prune()
+        except (SQLAlchemyError, OSError) as e:
+            db.session.rollback()
+            self.errors += 1
+            logger.warning(f"Result store write failed: {str(e)}")
+    
+    def prune(self) -> int:
+        """Delete expired entries, then least recently used ones until within max_bytes"""
+        self._prepare()
+        removed = 0
+        if self.ttl > 0:
+            removed += ConversionResult.query.filter(
+                ConversionResult.created_at < time.time() - self.ttl).delete(synchronize_session=False)
+        
+        total = db.session.query(db.func.coalesce(db.func.sum(ConversionResult.size), 0)).scalar()
+        if total > self.max_bytes:
+            stale = []
+            rows = db.session.query(ConversionResult.key, ConversionResult.size).order_by(ConversionResult.last_used)
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append(key)
+                total -= size
+            for start in range(0, len(stale), 500):
+                removed += ConversionResult.query.filter(
+                    ConversionResult.key.in_(stale[start:start + 500])).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for this worker, plus the size of the shared table"""
+        stats = {'hits': self.hits, 'misses': self.misses, 'errors': self.errors,
+                 'maxBytes': self.max_bytes, 'ttl': self.ttl}
+        try:
+            self._prepare()
+            entries, size = db.session.query(
+                db.func.count(ConversionResult.key), db.func.coalesce(db.func.sum(ConversionResult.size), 0)).one()
+            stats.update({'entries': entries, 'bytes': size})
+        except (SQLAlchemyError, OSError) as e:
+            db.session.rollback()
+            logger.warning(f"Result store stats failed: {str(e)}")
+        return stats
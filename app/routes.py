@@ -1,11 +1,19 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, stream_with_context
+from werkzeug.exceptions import BadRequest
 from . import app
 from .algorithms.regex_to_dfa import RegexToDFAConverter
+from .algorithms.regex_to_nfa import RegexToNFAConverter
 from .algorithms.nfa_to_dfa import NFAToDFAConverter
-from .algorithms.dfa_to_regex import DFAToRegexConverter
+from .algorithms.dfa_to_regex import DFAToRegexConverter, DEFAULT_ELIMINATION_ORDER
 from .algorithms.automata_structures import NFA, DFA, State, Transition
-from .data.examples import get_examples
+from .algorithms.step_trace import DEFAULT_TRACE_DETAIL, collect_steps
+from .data.examples import get_examples, CATALOGUE
 from .algorithms.nfa_to_regex import NFAToRegexConverter
+from .algorithms.lazy_dfa import LazyDFAMatcher
+from .algorithms.equivalence import EquivalenceChecker
+from .conversion_cache import ConversionCache, canonical_automaton
+from .result_store import ResultStore
+import click
 import json
 import logging
 import io
@@ -16,6 +24,12 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Shared by all /api/convert/* endpoints; CONVERSION_CACHE_MAX_BYTES=0 turns it off
+conversion_cache = ConversionCache(int(os.environ.get('CONVERSION_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+# Behind the per-process cache, shared by all workers; RESULT_STORE_MAX_BYTES=0 turns it off
+result_store = ResultStore(ttl=float(os.environ.get('RESULT_STORE_TTL', 7 * 24 * 3600)),
+                           max_bytes=int(os.environ.get('RESULT_STORE_MAX_BYTES', 256 * 1024 * 1024)))
+
 # Define the order of topics for navigation
 TOPIC_ORDER = [
     'toa_home',
@@ -60,43 +74,84 @@ def convert_regex_to_dfa():
         if not regex:
             return jsonify({'success': False, 'error': 'Regular expression is required'})
         
-        converter = RegexToDFAConverter(regex)
-        result = converter.convert()
+        options = {'minimize': bool_option(data, 'minimize', False), 'engine': data.get('engine', 'followpos'),
+                   'detail': data.get('detail', DEFAULT_TRACE_DETAIL)}
+        
+        def convert():
+            converter = RegexToDFAConverter(regex, **options)
+            for kind, result in converter.iter_convert():
+                if kind == 'step':
+                    yield kind, result
+            yield 'result', {
+                'success': result['success'],
+                'dfa': result.get('dfa'),
+                'derivatives': result.get('derivatives'),
+                'error': result.get('error'),
+                'errorOffset': result.get('errorOffset')
+            }
         
-        return jsonify({
-            'success': result['success'],
-            'dfa': result.get('dfa'),
-            'steps': result.get('steps', []),
-            'error': result.get('error')
-        })
+        return cached_conversion('regex-to-dfa', {'regex': regex, **options}, convert)
     
     except Exception as e:
         logger.error(f"Error in regex-to-dfa conversion: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/convert/regex-to-nfa', methods=['POST'])
+def convert_regex_to_nfa():
+    """Convert regular expression to NFA using Thompson's construction"""
+    try:
+        data = request.get_json()
+        regex = data.get('regex', '')
+        
+        if not regex:
+            return jsonify({'success': False, 'error': 'Regular expression is required'})
+        
+        detail = data.get('detail', DEFAULT_TRACE_DETAIL)
+        
+        def convert():
+            converter = RegexToNFAConverter(regex, detail=detail)
+            for kind, result in converter.iter_convert():
+                if kind == 'step':
+                    yield kind, result
+            yield 'result', {
+                'success': result['success'],
+                'nfa': result.get('nfa'),
+                'error': result.get('error'),
+                'errorOffset': result.get('errorOffset')
+            }
+        
+        return cached_conversion('regex-to-nfa', {'regex': regex, 'detail': detail}, convert)
+    
+    except Exception as e:
+        logger.error(f"Error in regex-to-nfa conversion: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/convert/nfa-to-dfa', methods=['POST'])
 def convert_nfa_to_dfa():
     """Convert NFA to DFA"""
     try:
         data = request.get_json()
-        nfa_data = data.get('nfa', {})
         
-        if not nfa_data:
+        if not data.get('nfa') and not data.get('regex'):
             return jsonify({'success': False, 'error': 'NFA data is required'})
+        options = {'minimize': bool_option(data, 'minimize', True), 'detail': data.get('detail', DEFAULT_TRACE_DETAIL)}
         
-        # Build NFA from input data
-        nfa = build_nfa_from_data(nfa_data)
-        converter = NFAToDFAConverter(nfa)
-        result = converter.convert()
+        def convert():
+            # Build NFA from input data
+            nfa = nfa_from_request(data)
+            converter = NFAToDFAConverter(nfa, **options)
+            for kind, result in converter.iter_convert():
+                if kind == 'step':
+                    yield kind, result
+            yield 'result', {
+                'success': result['success'],
+                'originalNfa': nfa.to_dict(),
+                'dfa': result.get('dfa'),
+                'stateMapping': result.get('stateMapping', {}),
+                'error': result.get('error')
+            }
         
-        return jsonify({
-            'success': result['success'],
-            'originalNfa': nfa.to_dict(),
-            'dfa': result.get('dfa'),
-            'steps': result.get('steps', []),
-            'stateMapping': result.get('stateMapping', {}),
-            'error': result.get('error')
-        })
+        return cached_conversion('nfa-to-dfa', {**nfa_cache_key(data), **options}, convert)
     
     except Exception as e:
         logger.error(f"Error in nfa-to-dfa conversion: {str(e)}")
@@ -112,18 +167,25 @@ def convert_dfa_to_regex():
         if not dfa_data:
             return jsonify({'success': False, 'error': 'DFA data is required'})
 
-        # Build DFA from input data
-        dfa = build_dfa_from_data(dfa_data)
-        converter = DFAToRegexConverter(dfa)
-        result = converter.convert()
+        options = {'minimize': bool_option(data, 'minimize', False),
+                   'elimination_order': data.get('eliminationOrder', DEFAULT_ELIMINATION_ORDER),
+                   'detail': data.get('detail', DEFAULT_TRACE_DETAIL)}
         
-        return jsonify({
-            'success': result['success'],
-            'regex': result.get('regex'),
-            'originalDfa': dfa.to_dict(),
-            'steps': result.get('steps', []),
-            'error': result.get('error')
-        })
+        def convert():
+            # Build DFA from input data
+            dfa = build_dfa_from_data(dfa_data)
+            converter = DFAToRegexConverter(dfa, **options)
+            for kind, result in converter.iter_convert():
+                if kind == 'step':
+                    yield kind, result
+            yield 'result', {
+                'success': result['success'],
+                'regex': result.get('regex'),
+                'originalDfa': dfa.to_dict(),
+                'error': result.get('error')
+            }
+        
+        return cached_conversion('dfa-to-regex', {'dfa': canonical_automaton(dfa_data), **options}, convert)
     
     except Exception as e:
         logger.error(f"Error in dfa-to-regex conversion: {str(e)}")
@@ -134,37 +196,339 @@ def convert_nfa_to_regex():
     """Convert NFA to regular expression"""
     try:
         data = request.get_json()
-        nfa_data = data.get('nfa', {})
-        if not nfa_data:
+        if not data.get('nfa') and not data.get('regex'):
             return jsonify({'success': False, 'error': 'NFA data is required'})
-        nfa = build_nfa_from_data(nfa_data)
-        converter = NFAToRegexConverter(nfa)
-        result = converter.convert()
-        return jsonify({
-            'success': result['success'],
-            'regex': result.get('regex'),
-            'originalNfa': nfa.to_dict(),
-            'steps': result.get('steps', []),
-            'error': result.get('error')
-        })
+        options = {'minimize': bool_option(data, 'minimize', False),
+                   'elimination_order': data.get('eliminationOrder', DEFAULT_ELIMINATION_ORDER),
+                   'detail': data.get('detail', DEFAULT_TRACE_DETAIL)}
+        
+        def convert():
+            nfa = nfa_from_request(data)
+            converter = NFAToRegexConverter(nfa, **options)
+            for kind, result in converter.iter_convert():
+                if kind == 'step':
+                    yield kind, result
+            yield 'result', {
+                'success': result['success'],
+                'regex': result.get('regex'),
+                'originalNfa': nfa.to_dict(),
+                'error': result.get('error')
+            }
+        
+        return cached_conversion('nfa-to-regex', {**nfa_cache_key(data), **options}, convert)
     except Exception as e:
         logger.error(f"Error in nfa-to-regex conversion: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/cache/stats')
+def conversion_cache_stats():
+    """Hit, miss and size counters of the conversion cache and the result store"""
+    return jsonify({'success': True, 'cache': conversion_cache.stats(), 'store': result_store.stats()})
+
+def cached_conversion(conversion, key_payload, convert):
+    """Serve a conversion response from the cache or the result store, or run convert() and keep its response.
+    
+    ``convert`` returns the conversion's events: ('step', step) as each
+    step is recorded and finally ('result', response fields).
+    
+    ``Cache-Control: no-cache`` recomputes and refreshes the entry, and
+    ``no-store`` bypasses both entirely. Failed conversions are not kept.
+    The X-Cache response header reports HIT, STORE, MISS or BYPASS.
+    Clients that accept NDJSON or Server-Sent Events get the steps
+    streamed as the conversion records them, see stream_conversion().
+    """
+    directives = request.headers.get('Cache-Control', '').lower()
+    enabled = conversion_cache.max_bytes > 0 or result_store.enabled
+    lookup = enabled and 'no-cache' not in directives and 'no-store' not in directives
+    store = enabled and 'no-store' not in directives
+    key = ConversionCache.key(conversion, key_payload)
+    stream_format = requested_stream_format()
+    
+    body, source = None, None
+    if lookup:
+        body, source = conversion_cache.get(key), 'HIT'
+        if body is None and result_store.enabled:
+            body, source = result_store.get(key), 'STORE'
+            if body is not None:
+                conversion_cache.put(key, body)
+    if body is not None:
+        if stream_format:
+            return stream_response(replay_conversion(body), stream_format, source)
+        return Response(body, mimetype='application/json', headers={'X-Cache': source})
+    
+    status = 'MISS' if lookup else 'BYPASS'
+    if stream_format:
+        return stream_response(stream_conversion(conversion, key if store else None, convert), stream_format, status)
+    
+    result = collect_steps(convert())
+    response = jsonify(result)
+    if store and result.get('success'):
+        keep_conversion(key, response.get_data())
+    response.headers['X-Cache'] = status
+    return response
+
+def keep_conversion(key, body):
+    """Put a successful conversion response in the cache and the result store"""
+    conversion_cache.put(key, body)
+    if result_store.enabled:
+        result_store.put(key, body)
+
+# Streamed conversion formats, by the media type a client asks for in Accept
+STREAM_FORMATS = {'application/x-ndjson': 'ndjson', 'text/event-stream': 'sse'}
+
+def requested_stream_format():
+    """'ndjson' or 'sse' if the client prefers a streamed response to plain JSON, else None"""
+    best = request.accept_mimetypes.best_match(['application/json', *STREAM_FORMATS])
+    return STREAM_FORMATS.get(best)
+
+def stream_conversion(conversion, key, convert):
+    """Run a conversion and yield ('step', json) per step as it is recorded, then ('result', json).
+    
+    The conversion advances only as its steps are sent, and stops as soon
+    as the client goes away. Each step is serialized and released once it
+    is sent. To still fill the cache and the result store, the serialized
+    steps are kept until they outgrow the largest of the two, past which
+    the response would not fit in either; ``key`` None keeps nothing.
+    """
+    retain = max(conversion_cache.max_bytes, result_store.max_bytes)
+    kept, kept_bytes = ([] if key is not None else None), 0
+    events = None
+    try:
+        events = convert()
+        for kind, value in events:
+            text = app.json.dumps(value)
+            if kind == 'step' and kept is not None:
+                kept_bytes += len(text)
+                if kept_bytes <= retain:
+                    kept.append(text)
+                else:
+                    kept = None
+            elif kind == 'result' and kept is not None and value.get('success'):
+                # The step-less result with the kept steps spliced in, as convert() would have returned it
+                body = '{"steps": [' + ', '.join(kept) + '], ' + text[1:]
+                keep_conversion(key, body.encode('utf-8'))
+            yield kind, text
+    except Exception as e:
+        logger.error(f"Error in streamed {conversion} conversion: {str(e)}")
+        yield 'result', app.json.dumps({'success': False, 'error': str(e)})
+    finally:
+        if events is not None:
+            events.close()
+
+def replay_conversion(body):
+    """Yield the steps and then the rest of a stored conversion response, as stream_conversion() does"""
+    result = json.loads(body)
+    for step in result.pop('steps', None) or []:
+        yield 'step', app.json.dumps(step)
+    yield 'result', app.json.dumps(result)
+
+def stream_response(events, stream_format, cache_status):
+    """Send (kind, json) events as NDJSON lines ({"step": ...} / {"result": ...}) or as Server-Sent Events"""
+    sse = stream_format == 'sse'
+    
+    def lines():
+        try:
+            for kind, text in events:
+                yield f"event: {kind}\ndata: {text}\n\n" if sse else f'{{"{kind}": {text}}}\n'
+        finally:
+            # A client that disconnects closes the response, and with it the conversion
+            events.close()
+    
+    mimetype = 'text/event-stream' if sse else 'application/x-ndjson'
+    # Proxies must not buffer the stream, or the client gets no step before the last one
+    return Response(stream_with_context(lines()), mimetype=mimetype,
+                    headers={'X-Cache': cache_status, 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def bool_option(data, name, default):
+    """Read a boolean request field, rejecting strings like "false" that bool() would turn into True"""
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f"'{name}' must be true or false")
+    return value
+
+def int_option(data, name, default, minimum):
+    """Read an integer request field, raising BadRequest (HTTP 400) if it is not an integer or is below minimum"""
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise BadRequest(f"'{name}' must be an integer of at least {minimum}")
+    return value
+
+def nfa_cache_key(data):
+    """Cache key fields for the NFA (or regex) of a request, as read by nfa_from_request"""
+    if data.get('nfa'):
+        return {'nfa': canonical_automaton(data['nfa'])}
+    return {'regex': data['regex']}
+
+# Upper bound on the number of strings accepted by one simulation request
+MAX_SIMULATION_STRINGS = 10000
+
+@app.route('/api/simulate', methods=['POST'])
+def simulate():
+    """Test a batch of strings against a DFA, NFA or regular expression"""
+    try:
+        data = request.get_json()
+        automaton_type = data.get('type') or next(
+            (key for key in ('dfa', 'nfa', 'regex') if data.get(key)), None)
+        return jsonify(simulate_strings(automaton_type, data))
+    
+    except BadRequest as e:
+        return jsonify({'success': False, 'error': e.description}), 400
+    
+    except Exception as e:
+        logger.error(f"Error in simulation: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/simulate/lazy', methods=['POST'])
+def simulate_lazy():
+    """Test strings against an NFA using lazy determinization"""
+    try:
+        return jsonify(simulate_strings('nfa', request.get_json()))
+    
+    except BadRequest as e:
+        return jsonify({'success': False, 'error': e.description}), 400
+    
+    except Exception as e:
+        logger.error(f"Error in lazy simulation: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+def simulate_strings(automaton_type, data):
+    """Compile the automaton in a simulation request once and run every string through it"""
+    strings = data.get('strings', [])
+    include_final = bool_option(data, 'includeFinalState', False)
+    max_states = int_option(data, 'maxStates', LazyDFAMatcher.DEFAULT_MAX_STATES, 2)
+    
+    if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+        return {'success': False, 'error': 'strings must be a list of strings'}
+    if len(strings) > MAX_SIMULATION_STRINGS:
+        return {'success': False, 'error': f'At most {MAX_SIMULATION_STRINGS} strings can be simulated per request'}
+    if automaton_type not in ('dfa', 'nfa', 'regex') or not data.get(automaton_type):
+        return {'success': False, 'error': 'A DFA, NFA or regular expression is required'}
+    
+    response = {'success': True, 'type': automaton_type}
+    # Regexes go through a Thompson NFA so only the visited DFA states are ever built, unless
+    # final states were asked for: those are reported as DFA state IDs, as they always have been
+    lazy_regex = automaton_type == 'regex' and not include_final
+    if automaton_type == 'nfa' or lazy_regex:
+        if automaton_type == 'nfa':
+            nfa = build_nfa_from_data(data['nfa'])
+        else:
+            nfa = RegexToNFAConverter(data['regex']).build_nfa()
+        matcher = LazyDFAMatcher(nfa, max_states=max_states)
+        masks = [matcher.run(s) for s in strings]
+        accepted = [matcher.is_accepting(mask) for mask in masks]
+        if include_final:
+            final_states = [sorted(nfa.mask_to_states(mask)) for mask in masks]
+        if automaton_type == 'nfa':
+            response['cache'] = matcher.stats()
+    else:
+        if automaton_type == 'dfa':
+            dfa = build_dfa_from_data(data['dfa'])
+        else:
+            dfa = RegexToDFAConverter(data['regex']).build_dfa()
+        compiled = dfa.compile()
+        finals = compiled.run_many(strings)
+        accepted = [bool(compiled.accepting[state]) for state in finals]
+        if include_final:
+            final_states = [compiled.state_id(state) for state in finals]
+    
+    results = []
+    for i, input_string in enumerate(strings):
+        result = {'input': input_string, 'accepted': accepted[i]}
+        if include_final:
+            result['finalState'] = final_states[i]
+        results.append(result)
+    
+    response['results'] = results
+    response['acceptedCount'] = sum(accepted)
+    return response
+
+@app.route('/api/equivalent', methods=['POST'])
+def check_equivalent():
+    """Check whether two regexes or automata accept the same language"""
+    try:
+        checker = checker_from_request(request.get_json())
+        return jsonify({'success': True, **checker.check_equivalence()})
+    
+    except Exception as e:
+        logger.error(f"Error in equivalence check: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/includes', methods=['POST'])
+def check_includes():
+    """Check whether the first language includes the second"""
+    try:
+        checker = checker_from_request(request.get_json())
+        return jsonify({'success': True, **checker.check_inclusion()})
+    
+    except Exception as e:
+        logger.error(f"Error in inclusion check: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+def checker_from_request(data):
+    """Build an EquivalenceChecker from the request's 'first' and 'second' operands"""
+    operands = []
+    for key in ('first', 'second'):
+        operand = data.get(key)
+        if isinstance(operand, str):
+            operand = {'regex': operand}
+        if not isinstance(operand, dict) or not any(operand.get(kind) for kind in ('dfa', 'nfa', 'regex')):
+            raise ValueError(f"'{key}' must be a DFA, NFA or regular expression")
+        operands.append(automaton_from_data(operand))
+    return EquivalenceChecker(*operands)
+
+def automaton_from_data(operand):
+    """Build the DFA or NFA described by a {'dfa'|'nfa'|'regex': ...} object"""
+    if operand.get('dfa'):
+        return build_dfa_from_data(operand['dfa'])
+    if operand.get('nfa'):
+        return build_nfa_from_data(operand['nfa'])
+    return RegexToDFAConverter(operand['regex']).build_dfa()
+
 @app.route('/api/examples/<conversion_type>')
 def get_conversion_examples(conversion_type):
-    """Get examples for a specific conversion type"""
+    """Get examples for a specific conversion type, from the pre-serialized catalogue"""
     try:
-        examples = get_examples()
-        if conversion_type in examples:
-            return jsonify({'success': True, 'examples': examples[conversion_type]})
-        else:
+        body = CATALOGUE.responses.get(conversion_type)
+        if body is None:
             return jsonify({'success': False, 'error': 'Invalid conversion type'})
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(CATALOGUE.etags[conversion_type])
+        response.cache_control.no_cache = True  # Revalidate with If-None-Match, answered with 304
+        return response.make_conditional(request)
     
     except Exception as e:
         logger.error(f"Error getting examples: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+# Request field holding the input of each conversion type's examples
+EXAMPLE_INPUTS = {
+    'regex-to-dfa': 'regex',
+    'nfa-to-dfa': 'nfa',
+    'dfa-to-regex': 'dfa',
+    'nfa-to-regex': 'nfa'
+}
+
+@app.cli.command('warm-examples')
+def warm_examples_command():
+    """Convert every bundled example, filling the result store for all workers"""
+    click.echo(f"Warmed {warm_example_conversions()} example conversions")
+
+def warm_example_conversions():
+    """Convert every example the way the conversion page requests it, filling the conversion caches"""
+    client = app.test_client()
+    warmed = 0
+    for conversion_type, field in EXAMPLE_INPUTS.items():
+        for level in CATALOGUE.payloads(conversion_type).values():
+            for example in level:
+                response = client.post(f'/api/convert/{conversion_type}', json={field: example[field]})
+                if response.get_json().get('success'):
+                    warmed += 1
+                else:
+                    logger.warning(f"Example {example['id']} failed to convert during warm-up")
+    logger.info(f"Warmed {warmed} example conversions")
+    return warmed
+
 def build_nfa_from_data(nfa_data):
     """Build NFA object from JSON data"""
     states = []
@@ -195,6 +559,14 @@ def build_nfa_from_data(nfa_data):
     
     return NFA(states, transitions, alphabet, start_states, final_states)
 
+def nfa_from_request(data):
+    """Build the request's NFA from its 'nfa' object, or from a 'regex' via Thompson's construction"""
+    if data.get('nfa'):
+        return build_nfa_from_data(data['nfa'])
+    if data.get('regex'):
+        return RegexToNFAConverter(data['regex']).build_nfa()
+    return None
+
 def build_dfa_from_data(dfa_data):
     """Build DFA object from JSON data"""
     states = []
@@ -230,10 +602,6 @@ def build_dfa_from_data(dfa_data):
     alphabet = dfa_data.get('alphabet', [])
     final_states = dfa_data.get('finalStates', [])
 
-    # Debugging print statements
-    print(f"DEBUG: dfa_data in build_dfa_from_data: {dfa_data}")
-    print(f"DEBUG: start_state_id extracted: {start_state_id}")
-
     return DFA(states, transitions, alphabet, start_state_id, final_states)
 
 @app.errorhandler(404)
@@ -338,7 +706,8 @@ def context_sensitive():
 def conversion():
     previous_page, next_page = get_nav_links('conversion')
     examples = get_examples()
-    return render_template('conversion.html', active_page='conversion', previous_page=previous_page, next_page=next_page, examples=examples)
+    return render_template('conversion.html', active_page='conversion', previous_page=previous_page, next_page=next_page,
+                           examples=examples, examples_json=CATALOGUE.html_json)
 
 @app.route('/run_python_code', methods=['POST'])
 def run_python_code():
@@ -613,17 +613,10 @@ async function convertRegexToDfa() {
     hideError('regexError');
     
     try {
-        const response = await fetch('/api/convert/regex-to-dfa', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ regex: regex })
-        });
-        
-        const result = await response.json();
+        const result = await fetchConversion('/api/convert/regex-to-dfa', { regex: regex });
         
         if (result.success) {
+            result.steps = reconstructSteps(result.steps);
             window.AutomataEdu.conversionData = result;
             window.AutomataEdu.currentStep = 0;
             window.AutomataEdu.totalSteps = result.steps.length;
@@ -649,17 +642,10 @@ async function convertNfaToDfa() {
     hideError('nfaError');
     
     try {
-        const response = await fetch('/api/convert/nfa-to-dfa', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ nfa: nfaData })
-        });
-        
-        const result = await response.json();
+        const result = await fetchConversion('/api/convert/nfa-to-dfa', { nfa: nfaData });
         
         if (result.success) {
+            result.steps = reconstructSteps(result.steps);
             window.AutomataEdu.conversionData = result;
             window.AutomataEdu.currentStep = 0;
             window.AutomataEdu.totalSteps = result.steps.length;
@@ -685,17 +671,10 @@ async function convertDfaToRegex() {
     hideError('dfaError');
     
     try {
-        const response = await fetch('/api/convert/dfa-to-regex', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ dfa: dfaData })
-        });
-        
-        const result = await response.json();
+        const result = await fetchConversion('/api/convert/dfa-to-regex', { dfa: dfaData });
         
         if (result.success) {
+            result.steps = reconstructSteps(result.steps);
             window.AutomataEdu.conversionData = result;
             window.AutomataEdu.currentStep = 0;
             window.AutomataEdu.totalSteps = result.steps.length;
@@ -729,17 +708,10 @@ async function convertNfaExample() {
         hideError('nfaError');
         
         try {
-            const response = await fetch('/api/convert/nfa-to-dfa', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ nfa: exampleData.nfa })
-            });
-            
-            const result = await response.json();
+            const result = await fetchConversion('/api/convert/nfa-to-dfa', { nfa: exampleData.nfa });
             
             if (result.success) {
+                result.steps = reconstructSteps(result.steps);
                 window.AutomataEdu.conversionData = result;
                 window.AutomataEdu.currentStep = 0;
                 window.AutomataEdu.totalSteps = result.steps.length;
@@ -774,17 +746,10 @@ async function convertDfaExample() {
         hideError('dfaError');
         
         try {
-            const response = await fetch('/api/convert/dfa-to-regex', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ dfa: exampleData.dfa })
-            });
-            
-            const result = await response.json();
+            const result = await fetchConversion('/api/convert/dfa-to-regex', { dfa: exampleData.dfa });
             
             if (result.success) {
+                result.steps = reconstructSteps(result.steps);
                 window.AutomataEdu.conversionData = result;
                 window.AutomataEdu.currentStep = 0;
                 window.AutomataEdu.totalSteps = result.steps.length;
@@ -1158,6 +1123,102 @@ function displayDfaResults(result) {
     updateNavigationButtons('dfa');
 }
 
+// Request a conversion as an NDJSON stream and parse each step as it
+// arrives, instead of one large JSON document at the end.
+// Resolves to the same object the plain JSON response would hold.
+async function fetchConversion(url, payload) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/x-ndjson',
+        },
+        body: JSON.stringify(payload)
+    });
+    if (!response.body || !(response.headers.get('Content-Type') || '').includes('ndjson')) {
+        return response.json();
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const steps = [];
+    let result = null;
+    let buffer = '';
+    const handleLine = line => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.step) {
+            steps.push(event.step);
+        } else if (event.result) {
+            result = event.result;
+        }
+    };
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+    
+    if (!result) {
+        throw new Error('Conversion stream ended without a result');
+    }
+    result.steps = steps;
+    return result;
+}
+
+// Expand delta-encoded snapshots in a full step trace.
+// Fields listed in step.snapshots hold either a full value or
+// {"$patch": ...}, a JSON merge patch against the previous snapshot
+// of the same stream.
+// Patches are applied with an explicit stack, since a syntax tree
+// snapshot can be nested deeper than the call stack allows.
+function applyMergePatch(source, patch) {
+    const isObject = value => value !== null && typeof value === 'object' && !Array.isArray(value);
+    if (!isObject(patch)) {
+        return patch;
+    }
+    const result = isObject(source) ? { ...source } : {};
+    const pending = [[result, patch]];
+    while (pending.length) {
+        const [target, changes] = pending.pop();
+        for (const [key, value] of Object.entries(changes)) {
+            if (value === null) {
+                delete target[key];
+            } else if (isObject(value)) {
+                target[key] = isObject(target[key]) ? { ...target[key] } : {};
+                pending.push([target[key], value]);
+            } else {
+                target[key] = value;
+            }
+        }
+    }
+    return result;
+}
+
+function reconstructSteps(steps) {
+    const latest = {};
+    return (steps || []).map(step => {
+        if (!step.snapshots) return step;
+        const data = { ...step.data };
+        for (const [key, stream] of Object.entries(step.snapshots)) {
+            let value = data[key];
+            const keys = value && typeof value === 'object' ? Object.keys(value) : [];
+            if (keys.length === 1 && keys[0] === '$patch') {
+                value = applyMergePatch(latest[stream], value.$patch);
+            }
+            latest[stream] = value;
+            data[key] = value;
+        }
+        const { snapshots, ...rest } = step;
+        return { ...rest, data };
+    });
+}
+
 // Step navigation
 function navigateStep(type, direction) {
     const currentStep = window.AutomataEdu.currentStep;
@@ -1447,6 +1508,18 @@ function formatStepData(step) {
             }
             break;
             
+        case 'derivatives':
+            if (step.data.derivatives) {
+                html += '<p><strong>Derivative of each state:</strong></p>';
+                html += '<table class="table table-sm">';
+                html += '<thead><tr><th>State</th><th>Regex</th></tr></thead><tbody>';
+                for (const [state, regex] of Object.entries(step.data.derivatives)) {
+                    html += `<tr><td>${state}</td><td><code>${regex}</code></td></tr>`;
+                }
+                html += '</tbody></table>';
+            }
+            break;
+            
         case 'construct_dfa':
             html += '<p><strong>DFA construction completed</strong></p>';
             break;
@@ -1557,15 +1630,9 @@ async function convertNfaToRegex() {
     }
     hideError('nfaToRegexError');
     try {
-        const response = await fetch('/api/convert/nfa-to-regex', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ nfa: nfaData })
-        });
-        const result = await response.json();
+        const result = await fetchConversion('/api/convert/nfa-to-regex', { nfa: nfaData });
         if (result.success) {
+            result.steps = reconstructSteps(result.steps);
             window.AutomataEdu.conversionData = result;
             window.AutomataEdu.currentStep = 0;
             window.AutomataEdu.totalSteps = result.steps.length;
@@ -1592,15 +1659,9 @@ async function convertNfaToRegexExample() {
     if (exampleData && exampleData.nfa) {
         hideError('nfaToRegexError');
         try {
-            const response = await fetch('/api/convert/nfa-to-regex', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ nfa: exampleData.nfa })
-            });
-            const result = await response.json();
+            const result = await fetchConversion('/api/convert/nfa-to-regex', { nfa: exampleData.nfa });
             if (result.success) {
+                result.steps = reconstructSteps(result.steps);
                 window.AutomataEdu.conversionData = result;
                 window.AutomataEdu.currentStep = 0;
                 window.AutomataEdu.totalSteps = result.steps.length;
@@ -0,0 +1,105 @@
+"""
+Benchmark the state elimination ordering strategies on the bundled examples
+
+Every DFA and NFA in app/data/examples.py is converted to a regex with each
+strategy in ELIMINATION_STRATEGIES. For each strategy the script reports the
+total length of the regexes straight out of elimination, the total length
+after simplification, how often the strategy gave the shortest raw regex,
+and the best-of-N elimination time.
+
+Usage:
+    python -m benchmarks.elimination_order [--repeat N] [--verbose]
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.algorithms.automata_structures import DFA
+from app.algorithms.dfa_to_regex import DFABuilder, DFAToRegexConverter, ELIMINATION_STRATEGIES
+from app.algorithms.nfa_to_dfa import NFABuilder
+from app.algorithms.nfa_to_regex import NFAToRegexConverter
+from app.data.examples import get_examples
+
+def edges(data: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    return [(t['from'], t['symbol'], t['to']) for t in data['transitions']]
+
+def collect_automata() -> List[Tuple[str, Any]]:
+    """All example automata, labelled '<conversion>/<example id>'"""
+    automata = []
+    for conversion, levels in get_examples().items():
+        for examples in levels.values():
+            for example in examples:
+                name = f"{conversion}/{example['id']}"
+                if example.get('dfa'):
+                    data = example['dfa']
+                    automata.append((name, DFABuilder.create_simple_dfa(
+                        data['alphabet'], edges(data), data['startState'], data['finalStates'])))
+                elif example.get('nfa'):
+                    data = example['nfa']
+                    automata.append((name, NFABuilder.create_simple_nfa(
+                        data['alphabet'], edges(data), data['startStates'][0], data['finalStates'])))
+    return automata
+
+def eliminate(automaton, strategy: str) -> Tuple[str, str, float]:
+    """Run state elimination once; returns the raw regex, the simplified regex and the elimination time"""
+    if isinstance(automaton, DFA):
+        converter = DFAToRegexConverter(automaton, elimination_order=strategy)
+    else:
+        converter = NFAToRegexConverter(automaton, elimination_order=strategy)
+
+    start = time.perf_counter()
+    converter.gnfa = converter.create_generalized_nfa()
+    gnfa = converter.gnfa
+    state = gnfa.next_state_to_eliminate(strategy)
+    while state is not None:
+        gnfa.remove_state(state)
+        state = gnfa.next_state_to_eliminate(strategy)
+    term = gnfa.get_transition(gnfa.start_state, gnfa.final_state)
+    raw = term.to_string()
+    elapsed = time.perf_counter() - start
+
+    return raw, converter.simplify_regex(term), elapsed
+
+def run(repeat: int, verbose: bool) -> Dict[str, Dict[str, float]]:
+    automata = collect_automata()
+    totals = {strategy: {'raw': 0, 'simplified': 0, 'best': 0, 'seconds': 0.0}
+              for strategy in ELIMINATION_STRATEGIES}
+
+    for name, automaton in automata:
+        lengths = {}
+        for strategy in ELIMINATION_STRATEGIES:
+            timings = []
+            for _ in range(repeat):
+                raw, simplified, elapsed = eliminate(automaton, strategy)
+                timings.append(elapsed)
+            lengths[strategy] = len(raw)
+            totals[strategy]['raw'] += len(raw)
+            totals[strategy]['simplified'] += len(simplified)
+            totals[strategy]['seconds'] += min(timings)
+
+        shortest = min(lengths.values())
+        for strategy, length in lengths.items():
+            if length == shortest:
+                totals[strategy]['best'] += 1
+        if verbose:
+            print(f"{name:<32}" + ''.join(f"{lengths[strategy]:>12}" for strategy in ELIMINATION_STRATEGIES))
+
+    print(f"{len(automata)} automata, best of {repeat} runs\n")
+    print(f"{'strategy':<12}{'raw chars':>12}{'simplified':>12}{'shortest':>10}{'time (ms)':>12}")
+    for strategy, total in totals.items():
+        print(f"{strategy:<12}{total['raw']:>12}{total['simplified']:>12}"
+              f"{total['best']:>10}{total['seconds'] * 1000:>12.2f}")
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per automaton and strategy')
+    parser.add_argument('--verbose', action='store_true', help='Print the raw regex length of every example')
+    args = parser.parse_args()
+    if args.verbose:
+        print(f"{'example':<32}" + ''.join(f"{strategy:>12}" for strategy in ELIMINATION_STRATEGIES))
+    run(max(1, args.repeat), args.verbose)
+
+if __name__ == '__main__':
+    main()
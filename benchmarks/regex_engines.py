@@ -0,0 +1,87 @@
+"""
+Benchmark the regex-to-DFA engines against each other
+
+Every regex example in app/data/examples.py, plus a few larger stress
+expressions, is converted with each engine in REGEX_ENGINES. The script
+reports the number of DFA states each engine builds, the size of the
+minimal DFA, and the best-of-N construction time.
+
+Usage:
+    python -m benchmarks.regex_engines [--repeat N] [--verbose]
+"""
+
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+from app.algorithms.dfa_minimization import DFAMinimizer
+from app.algorithms.regex_to_dfa import RegexToDFAConverter, REGEX_ENGINES
+from app.data.examples import get_examples
+
+# Larger expressions where the constructions differ more
+STRESS_REGEXES = [
+    '(a|b)*a(a|b){8}',
+    '[a-z0-9]*x[a-z0-9]{7}',
+    '(ab|ba)*(a|b){0,6}',
+    '((a|b)(a|b)(a|b))*(ab*a)+',
+    '(a*b*)*a(a|b){5}c+',
+]
+
+def collect_regexes() -> List[Tuple[str, str]]:
+    """Example and stress regexes, labelled by example id"""
+    regexes = []
+    for examples in get_examples()['regex-to-dfa'].values():
+        for example in examples:
+            regexes.append((example['id'], example['regex']))
+    regexes.extend((f"stress_{i + 1}", regex) for i, regex in enumerate(STRESS_REGEXES))
+    return regexes
+
+def build(regex: str, engine: str, repeat: int) -> Tuple[int, float, object]:
+    """Build the DFA `repeat` times; returns its state count, the best time and the DFA"""
+    best = float('inf')
+    dfa = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dfa = RegexToDFAConverter(regex, engine=engine).build_dfa()
+        best = min(best, time.perf_counter() - start)
+    return len(dfa.states), best, dfa
+
+def run(repeat: int, verbose: bool) -> Dict[str, Dict[str, float]]:
+    totals = {engine: {'states': 0, 'minimal': 0, 'seconds': 0.0} for engine in REGEX_ENGINES}
+    minimal_total = 0
+
+    for name, regex in collect_regexes():
+        row = {}
+        minimal = None
+        for engine in REGEX_ENGINES:
+            states, seconds, dfa = build(regex, engine, repeat)
+            if minimal is None:
+                minimal = len(DFAMinimizer(dfa).minimize().states)
+            row[engine] = (states, seconds)
+            totals[engine]['states'] += states
+            totals[engine]['seconds'] += seconds
+            if states == minimal:
+                totals[engine]['minimal'] += 1
+        minimal_total += minimal
+        if verbose:
+            cells = ''.join(f"{row[engine][0]:>8}{row[engine][1] * 1000:>10.2f}" for engine in REGEX_ENGINES)
+            print(f"{name:<14}{minimal:>8}{cells}  {regex}")
+
+    print(f"\n{len(collect_regexes())} regexes, best of {repeat} runs, {minimal_total} minimal states in total\n")
+    print(f"{'engine':<14}{'states':>10}{'minimal':>10}{'time (ms)':>12}")
+    for engine, total in totals.items():
+        print(f"{engine:<14}{total['states']:>10}{total['minimal']:>10}{total['seconds'] * 1000:>12.2f}")
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per regex and engine')
+    parser.add_argument('--verbose', action='store_true', help='Print states and time for every regex')
+    args = parser.parse_args()
+    if args.verbose:
+        header = ''.join(f"{engine[:8]:>8}{'ms':>10}" for engine in REGEX_ENGINES)
+        print(f"{'regex':<14}{'minimal':>8}{header}")
+    run(max(1, args.repeat), args.verbose)
+
+if __name__ == '__main__':
+    main()
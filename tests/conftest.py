@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the shared result store
+os.environ.setdefault('RESULT_STORE_MAX_BYTES', '0')
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
@@ -0,0 +1,34 @@
+from app.algorithms.automata_structures import DFA, State, Transition
+
+def even_as_dfa():
+    states = [State('q0'), State('q1')]
+    transitions = [
+        Transition('q0', 'q1', 'a'), Transition('q1', 'q0', 'a'),
+        Transition('q0', 'q0', 'b'), Transition('q1', 'q1', 'b'),
+    ]
+    return DFA(states, transitions, ['a', 'b'], 'q0', ['q0'])
+
+def test_compiled_table_follows_final_and_start_states():
+    dfa = even_as_dfa()
+    assert dfa.accepts_many(['', 'a', 'aa']) == [True, False, True]
+    
+    dfa.final_states = ['q1']
+    assert dfa.accepts_many(['', 'a', 'aa']) == [False, True, False]
+    
+    dfa.start_state = 'q1'
+    assert dfa.accepts_many(['', 'a', 'aa']) == [True, False, True]
+    
+    # In-place changes need an explicit invalidation
+    dfa.final_states.add('q0')
+    dfa._invalidate()
+    assert dfa.accepts('ab')
+
+def test_epsilon_regex_nfa_converts_to_dfa(client):
+    headers = {'Cache-Control': 'no-store'}
+    nfa = client.post('/api/convert/regex-to-nfa', json={'regex': 'ε'}, headers=headers).get_json()
+    assert nfa['success'] and nfa['nfa']['alphabet'] == []
+    
+    result = client.post('/api/convert/nfa-to-dfa', json={'nfa': nfa['nfa']}, headers=headers).get_json()
+    assert result['success'], result.get('error')
+    dfa = result['dfa']
+    assert dfa['alphabet'] == [] and dfa['finalStates'] == [dfa['startState']]
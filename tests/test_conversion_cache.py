@@ -0,0 +1,106 @@
+from app import routes
+from app.conversion_cache import ConversionCache
+
+DFA = {
+    'states': [
+        {'id': 'q0', 'isStart': True, 'position': {'x': 10, 'y': 20}},
+        {'id': 'q1'},
+        {'id': 'q2', 'isFinal': True},
+    ],
+    'transitions': [
+        {'id': 't1', 'from': 'q0', 'to': 'q1', 'symbol': 'a'},
+        {'id': 't2', 'from': 'q1', 'to': 'q2', 'symbol': 'b'},
+        {'id': 't3', 'from': 'q2', 'to': 'q0', 'symbol': 'a'},
+        {'id': 't4', 'from': 'q1', 'to': 'q1', 'symbol': 'a'},
+    ],
+    'alphabet': ['a', 'b'],
+    'startState': 'q0',
+    'finalStates': ['q2']
+}
+
+def test_hit_and_miss_counters():
+    cache = ConversionCache(1000)
+    key = ConversionCache.key('regex-to-dfa', {'regex': 'a*'})
+    assert cache.get(key) is None
+    cache.put(key, b'{}')
+    assert cache.get(key) == b'{}'
+    assert cache.get(key) == b'{}'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+    assert stats['bytes'] == len(key) + 2
+
+def test_lru_eviction_by_bytes():
+    keys = [ConversionCache.key('regex-to-dfa', {'regex': regex}) for regex in ('a', 'b', 'c')]
+    cost = len(keys[0]) + 10
+    cache = ConversionCache(2 * cost)
+    cache.put(keys[0], b'0' * 10)
+    cache.put(keys[1], b'1' * 10)
+    cache.get(keys[0])  # Now keys[1] is least recently used
+    cache.put(keys[2], b'2' * 10)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    assert cache.stats()['evictions'] == 1 and cache.size == 2 * cost
+    
+    # A body larger than the whole cache is not kept and evicts nothing
+    cache.put(keys[1], b'x' * 2 * cost)
+    assert cache.get(keys[1]) is None and cache.stats()['entries'] == 2
+
+def test_zero_max_bytes_disables_caching(client, monkeypatch):
+    cache = ConversionCache(0)
+    cache.put('key', b'{}')
+    assert cache.get('key') is None and cache.stats()['entries'] == 0
+    
+    monkeypatch.setattr(routes, 'conversion_cache', cache)
+    for _ in range(2):
+        response = client.post('/api/convert/regex-to-dfa', json={'regex': 'a*b'})
+        assert response.headers['X-Cache'] == 'BYPASS'
+        assert response.get_json()['success']
+
+def convert(client, url, payload, cache_control=None):
+    headers = {'Cache-Control': cache_control} if cache_control else {}
+    response = client.post(url, json=payload, headers=headers)
+    return response.headers['X-Cache'], response.get_json()
+
+def test_cached_response_matches_uncached(client):
+    routes.conversion_cache.clear()
+    requests = [
+        ('/api/convert/regex-to-dfa', {'regex': '(a|b)*abb', 'minimize': True}),
+        ('/api/convert/regex-to-nfa', {'regex': '(a|b)*abb'}),
+        ('/api/convert/nfa-to-dfa', {'regex': 'a(a|b)*'}),
+        ('/api/convert/dfa-to-regex', {'dfa': DFA}),
+        ('/api/convert/nfa-to-regex', {'regex': '(ab|ba)*'}),
+    ]
+    for url, payload in requests:
+        assert convert(client, url, payload)[0] == 'MISS'
+        status, cached = convert(client, url, payload)
+        assert status == 'HIT'
+        assert cached == convert(client, url, payload, 'no-store')[1]
+    
+    # Positions and transition IDs are ignored
+    moved = {**DFA, 'states': [{**state, 'position': {'x': 0, 'y': 0}} for state in DFA['states']],
+             'transitions': [{**t, 'id': t['id'] + 'x'} for t in DFA['transitions']]}
+    assert convert(client, '/api/convert/dfa-to-regex', {'dfa': moved})[0] == 'HIT'
+
+def test_input_order_and_spelling_get_their_own_entries(client):
+    routes.conversion_cache.clear()
+    variants = [
+        DFA,
+        {**DFA, 'states': DFA['states'][::-1]},
+        {**DFA, 'transitions': DFA['transitions'][::-1]},
+    ]
+    for order in ('weight', 'degree', 'scc', 'arbitrary'):
+        for dfa in variants:
+            payload = {'dfa': dfa, 'eliminationOrder': order}
+            convert(client, '/api/convert/dfa-to-regex', payload)
+            assert convert(client, '/api/convert/dfa-to-regex', payload)[1] == \
+                convert(client, '/api/convert/dfa-to-regex', payload, 'no-store')[1]
+    
+    # An ε alias is echoed back as it was sent
+    nfa = {'states': [{'id': 'p', 'isStart': True}, {'id': 'r', 'isFinal': True}],
+           'transitions': [{'from': 'p', 'to': 'r', 'symbol': 'ε'}],
+           'alphabet': ['a'], 'startStates': ['p'], 'finalStates': ['r']}
+    aliased = {**nfa, 'transitions': [{'from': 'p', 'to': 'r', 'symbol': 'epsilon'}]}
+    for data in (nfa, aliased, nfa, aliased):
+        status, result = convert(client, '/api/convert/nfa-to-dfa', {'nfa': data})
+        assert result['originalNfa']['transitions'][0]['symbol'] == data['transitions'][0]['symbol']
+    assert status == 'HIT'
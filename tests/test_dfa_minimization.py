@@ -0,0 +1,65 @@
+from app.algorithms.automata_structures import DFA, State, Transition
+from app.algorithms.dfa_minimization import DFAMinimizer
+from app.algorithms.equivalence import EquivalenceChecker
+from app.algorithms.nfa_to_dfa import NFABuilder, NFAToDFAConverter
+
+def make_dfa(alphabet, transitions, start_state, final_states):
+    state_ids = {start_state, *final_states}
+    for from_state, _, to_state in transitions:
+        state_ids.update((from_state, to_state))
+    states = [State(state_id) for state_id in sorted(state_ids)]
+    return DFA(states, [Transition(from_state, to_state, symbol) for from_state, symbol, to_state in transitions],
+               alphabet, start_state, final_states)
+
+def minimize(dfa):
+    minimized = DFAMinimizer(dfa).minimize()
+    assert EquivalenceChecker(dfa, minimized).check_equivalence()['equivalent']
+    return minimized
+
+def test_merges_equivalent_states():
+    # Strings ending in 'a', with q2 duplicating q0 and q3 duplicating q1; q4 is unreachable
+    dfa = make_dfa(['a', 'b'], [
+        ('q0', 'a', 'q1'), ('q0', 'b', 'q2'), ('q1', 'a', 'q1'), ('q1', 'b', 'q2'),
+        ('q2', 'a', 'q3'), ('q2', 'b', 'q2'), ('q3', 'a', 'q1'), ('q3', 'b', 'q2'),
+        ('q4', 'a', 'q0'), ('q4', 'b', 'q4'),
+    ], 'q0', ['q1', 'q3'])
+    minimizer = DFAMinimizer(dfa)
+    minimized = minimizer.minimize()
+    assert len(minimized.states) == 2
+    assert EquivalenceChecker(dfa, minimized).check_equivalence()['equivalent']
+    assert minimizer.summary(minimized)['mergedStates'] == {'q0': ['q0', 'q2'], 'q1': ['q1', 'q3']}
+
+def test_already_minimal_dfa_is_unchanged():
+    # Binary numbers divisible by three
+    dfa = make_dfa(['0', '1'], [
+        ('r0', '0', 'r0'), ('r0', '1', 'r1'), ('r1', '0', 'r2'),
+        ('r1', '1', 'r0'), ('r2', '0', 'r1'), ('r2', '1', 'r2'),
+    ], 'r0', ['r0'])
+    assert len(minimize(dfa).states) == 3
+
+def test_drops_dead_states():
+    # Only "ab", with an explicit trap state
+    dfa = make_dfa(['a', 'b'], [
+        ('s0', 'a', 's1'), ('s0', 'b', 'trap'), ('s1', 'a', 'trap'), ('s1', 'b', 's2'),
+        ('s2', 'a', 'trap'), ('s2', 'b', 'trap'), ('trap', 'a', 'trap'), ('trap', 'b', 'trap'),
+    ], 's0', ['s2'])
+    minimized = minimize(dfa)
+    assert sorted(minimized.states.keys()) == ['s0', 's1', 's2']
+    assert len(minimized.transitions) == 2
+
+def test_empty_language_keeps_only_the_start_state():
+    dfa = make_dfa(['a'], [('s0', 'a', 's1'), ('s1', 'a', 's0')], 's0', [])
+    minimized = minimize(dfa)
+    assert list(minimized.states.keys()) == ['s0']
+    assert not minimized.final_states and not len(minimized.transitions)
+
+def test_state_mapping_follows_the_minimized_dfa():
+    # a* twice over: the subsets {s} and {s,t} merge
+    nfa = NFABuilder.create_simple_nfa(['a'], [('s', 'a', 's'), ('s', 'a', 't'), ('t', 'a', 't')], 's', ['s', 't'])
+    result = NFAToDFAConverter(nfa).convert()
+    assert result['success'], result.get('error')
+    assert len(result['dfa']['states']) == 1
+    assert result['stateMapping'] == {'{s}': ['s', 't']}
+    
+    result = NFAToDFAConverter(nfa, minimize=False).convert()
+    assert result['stateMapping'] == {'{s}': ['s'], '{s,t}': ['s', 't']}
@@ -0,0 +1,47 @@
+import pytest
+
+from app.algorithms.equivalence import EquivalenceChecker
+from app.algorithms.regex_to_dfa import RegexToDFAConverter
+from app.algorithms.regex_to_nfa import RegexToNFAConverter
+
+def dfa(regex):
+    return RegexToDFAConverter(regex).build_dfa()
+
+def nfa(regex):
+    return RegexToNFAConverter(regex).build_nfa()
+
+@pytest.mark.parametrize('build_first, build_second', [(dfa, dfa), (nfa, nfa), (dfa, nfa), (nfa, dfa)])
+def test_equal_languages(build_first, build_second):
+    result = EquivalenceChecker(build_first('(a|b)*'), build_second('(a*b*)*')).check_equivalence()
+    assert result['equivalent'] and result['counterexample'] is None
+
+@pytest.mark.parametrize('build_first, build_second', [(dfa, dfa), (nfa, nfa), (dfa, nfa), (nfa, dfa)])
+def test_shortest_counterexample(build_first, build_second):
+    result = EquivalenceChecker(build_first('(a|b)*abb'), build_second('(a|b)*ab')).check_equivalence()
+    assert not result['equivalent']
+    assert result['counterexample'] == 'ab'
+    assert result['acceptedBy'] == 'second'
+    
+    result = EquivalenceChecker(build_first('a*'), build_second('aa*')).check_equivalence()
+    assert (result['counterexample'], result['acceptedBy']) == ('', 'first')
+
+def test_different_alphabets():
+    result = EquivalenceChecker(dfa('ab*'), nfa('ac*')).check_equivalence()
+    assert not result['equivalent']
+    assert result['counterexample'] in ('ab', 'ac')
+
+def test_inclusion():
+    assert EquivalenceChecker(nfa('(a|b)*'), dfa('abb')).check_inclusion()['included']
+    result = EquivalenceChecker(dfa('abb'), nfa('(a|b)*')).check_inclusion()
+    assert not result['included'] and result['counterexample'] == ''
+
+def test_max_pairs_guard(monkeypatch):
+    first, second = nfa('(a|b)*a(a|b)(a|b)'), nfa('(a|b)*(aaa|aab|aba|abb)')
+    assert EquivalenceChecker(first, second).check_equivalence()['equivalent']
+    
+    monkeypatch.setattr(EquivalenceChecker, 'MAX_PAIRS', 5)
+    checker = EquivalenceChecker(first, second)
+    with pytest.raises(ValueError, match='exceeded 5 state pairs'):
+        checker.check_equivalence()
+    with pytest.raises(ValueError, match='exceeded 5 state pairs'):
+        checker.check_inclusion()
@@ -0,0 +1,22 @@
+from app import app
+from app.data.examples import CATALOGUE
+
+def test_examples_revalidate_with_etag(client):
+    response = client.get('/api/examples/regex-to-dfa')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{CATALOGUE.etags["regex-to-dfa"]}"'
+    assert 'no-cache' in response.headers['Cache-Control']
+    assert response.get_json()
+    
+    cached = client.get('/api/examples/regex-to-dfa', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    
+    stale = client.get('/api/examples/regex-to-dfa', headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200 and stale.get_data() == response.get_data()
+
+def test_warm_examples_command():
+    result = app.test_cli_runner().invoke(args=['warm-examples'])
+    assert result.exit_code == 0
+    words = result.output.split()
+    assert words[0] == 'Warmed' and int(words[1]) > 0
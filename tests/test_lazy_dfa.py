@@ -0,0 +1,26 @@
+from itertools import product
+
+from app.algorithms.lazy_dfa import LazyDFAMatcher
+from app.algorithms.nfa_to_dfa import NFABuilder, NFAToDFAConverter
+
+def third_from_last_is_a():
+    # Its subset DFA has eight states, so a small cache has to flush
+    return NFABuilder.create_simple_nfa(['a', 'b', 'ε'], [
+        ('q0', 'a', 'q0'), ('q0', 'b', 'q0'), ('q0', 'a', 'q1'),
+        ('q1', 'a', 'q2'), ('q1', 'b', 'q2'), ('q2', 'a', 'q3'), ('q2', 'b', 'q3'),
+        ('q3', 'ε', 'q4'),
+    ], 'q0', ['q4'])
+
+def test_small_cache_matches_full_dfa():
+    nfa = third_from_last_is_a()
+    dfa = NFAToDFAConverter(nfa, minimize=False).build_dfa()
+    inputs = [''.join(letters) for length in range(9) for letters in product('ab', repeat=length)]
+    inputs += ['ab' * 500 + 'abb', 'ab' * 500 + 'bab', 'aac', 'caaa']
+    expected = dfa.accepts_many(inputs)
+    
+    for max_states in (2, 3, 5, LazyDFAMatcher.DEFAULT_MAX_STATES):
+        matcher = LazyDFAMatcher(nfa, max_states=max_states)
+        assert matcher.accepts_many(inputs) == expected
+        assert len(matcher._masks) <= max_states
+        if max_states < len(dfa.states):
+            assert matcher.flushes > 0
@@ -0,0 +1,43 @@
+import pytest
+
+from app.algorithms.regex_to_dfa import RegexParser, RegexSyntaxError, RegexToDFAConverter
+from app.algorithms.regex_to_nfa import RegexToNFAConverter
+
+@pytest.mark.parametrize('regex, message, offset', [
+    ('a{3,2}', "Repetition minimum exceeds maximum in '{3,2}'", 1),
+    ('a{2', 'Unterminated repetition', 1),
+    ('ab{x}', "Invalid repetition '{x}'", 2),
+    ('[b-a]', "Invalid range 'b-a'", 1),
+    ('x[]', 'Empty character class', 1),
+    ('[ab', 'Unterminated character class', 0),
+    ('(ab', "Unbalanced '('", 0),
+    ('a(b(c)', "Unbalanced '('", 1),
+    ('ab)', "Unbalanced ')'", 2),
+    ('a|', 'Unexpected end of regular expression', 2),
+    ('|a', "Expected a symbol or '(' before '|'", 0),
+    ('a||b', "Expected a symbol or '(' before '|'", 2),
+    ('(|a)', "Expected a symbol or '(' before '|'", 1),
+    ('*a', "Nothing to repeat before '*'", 0),
+    ('a#', "'#' is reserved for the end marker", 1),
+])
+def test_malformed_regex(regex, message, offset):
+    with pytest.raises(RegexSyntaxError) as error:
+        RegexParser(regex).parse()
+    assert error.value.offset == offset
+    assert str(error.value) == f"{message} at offset {offset}"
+
+def test_valid_regex_parses():
+    for regex in ('a{2,3}', 'a{2,}', '[a-c0-9]+', '(a|b)*abb', 'ε', '((a))?'):
+        assert RegexParser(regex).parse() is not None
+
+@pytest.mark.parametrize('converter', [RegexToDFAConverter, RegexToNFAConverter])
+def test_converters_report_error_offset(converter):
+    result = converter('(a|b)*[c-a]').convert()
+    assert not result['success']
+    assert result['errorOffset'] == 7
+    assert result['error'] == "Invalid range 'c-a' at offset 7"
+
+def test_route_reports_error_offset(client):
+    result = client.post('/api/convert/regex-to-dfa', json={'regex': 'ab{3,2}'}).get_json()
+    assert not result['success']
+    assert result['errorOffset'] == 2
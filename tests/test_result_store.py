@@ -0,0 +1,64 @@
+import itertools
+import os
+
+import pytest
+from flask import Flask
+from sqlalchemy import inspect
+
+from app import result_store as result_store_module
+from app.result_store import ConversionResult, ResultStore, db
+
+@pytest.fixture
+def store_app(tmp_path):
+    """A separate app whose store lives in a temporary SQLite database"""
+    app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'instance' / 'store.db')
+    db.init_app(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the store's clock with one that only moves when told to"""
+    now = [1000.0]
+    monkeypatch.setattr(result_store_module.time, 'time', lambda: now[0])
+    return now
+
+def test_table_is_created_on_first_use(store_app):
+    store = ResultStore(ttl=60, max_bytes=10000)
+    assert not os.path.exists(store_app.instance_path)
+    
+    assert store.get('missing') is None
+    assert os.path.isdir(store_app.instance_path)
+    assert inspect(db.engine).has_table('conversion_results')
+    store.put('key', b'{"success": true}')
+    assert store.get('key') == b'{"success": true}'
+    assert (store.hits, store.misses, store.errors) == (1, 1, 0)
+
+def test_entries_expire_after_ttl(store_app, clock):
+    store = ResultStore(ttl=60, max_bytes=10000)
+    store.put('key', b'{}')
+    clock[0] += 59
+    assert store.get('key') == b'{}'
+    clock[0] += 2
+    assert store.get('key') is None
+    
+    assert store.prune() == 1
+    assert ConversionResult.query.count() == 0
+
+def test_prunes_least_recently_used_every_hundred_writes(store_app, clock):
+    bodies = {f'key{i}': bytes([i]) * 200 for i in range(ResultStore.PRUNE_EVERY)}
+    size = len(result_store_module.zlib.compress(bodies['key0'], 6))
+    store = ResultStore(ttl=0, max_bytes=10 * size)
+    
+    for i, (key, body) in enumerate(bodies.items()):
+        clock[0] += 1
+        store.put(key, body)
+        if i < ResultStore.PRUNE_EVERY - 1:
+            assert ConversionResult.query.count() == i + 1
+    
+    kept = {key for key, in db.session.query(ConversionResult.key)}
+    assert kept == set(itertools.islice(reversed(list(bodies)), 10))
+    assert store.stats()['bytes'] <= store.max_bytes
@@ -0,0 +1,44 @@
+from app.algorithms.regex_to_dfa import RegexToDFAConverter
+
+def simulate(client, payload):
+    return client.post('/api/simulate', json=payload).get_json()
+
+def test_regex_simulation_accepts_and_rejects(client):
+    result = simulate(client, {'regex': '(a|b)*abb', 'strings': ['abb', 'aabb', 'ab', '']})
+    assert result == {
+        'success': True,
+        'type': 'regex',
+        'results': [
+            {'input': 'abb', 'accepted': True},
+            {'input': 'aabb', 'accepted': True},
+            {'input': 'ab', 'accepted': False},
+            {'input': '', 'accepted': False}
+        ],
+        'acceptedCount': 2
+    }
+
+def test_regex_simulation_reports_dfa_final_states(client):
+    strings = ['abb', 'ba', '']
+    result = simulate(client, {'regex': '(a|b)*abb', 'strings': strings, 'includeFinalState': True})
+    
+    compiled = RegexToDFAConverter('(a|b)*abb').build_dfa().compile()
+    expected = [compiled.state_id(state) for state in compiled.run_many(strings)]
+    assert [r['finalState'] for r in result['results']] == expected
+    assert all(isinstance(r['finalState'], str) for r in result['results'])
+    assert set(result) == {'success', 'type', 'results', 'acceptedCount'}
+
+def test_regex_simulation_syntax_error(client):
+    result = simulate(client, {'regex': '(a|', 'strings': ['a']})
+    assert result['success'] is False
+    assert result['error']
+
+def test_simulation_rejects_invalid_options(client):
+    payload = {'regex': 'a*', 'strings': ['aa']}
+    response = client.post('/api/simulate', json={**payload, 'maxStates': 'many'})
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': "'maxStates' must be an integer of at least 2"}
+    assert client.post('/api/simulate/lazy', json={'nfa': {}, 'maxStates': 1}).status_code == 400
+    
+    result = simulate(client, {**payload, 'includeFinalState': 'false'})
+    assert result == {'success': False, 'error': "'includeFinalState' must be true or false"}
+    assert simulate(client, {**payload, 'maxStates': 2})['acceptedCount'] == 1
@@ -0,0 +1,34 @@
+from app.algorithms.regex_to_dfa import RegexToDFAConverter
+from app.algorithms.regex_to_nfa import RegexToNFAConverter
+from app.algorithms.step_trace import apply_merge_patch, merge_patch, reconstruct_steps
+
+LONG_REGEX = 'a' * 20000
+
+def tree_depth(node):
+    depth = 0
+    while node:
+        depth += 1
+        node = node['left']
+    return depth
+
+def test_long_regex_to_dfa_at_full_detail():
+    result = RegexToDFAConverter(LONG_REGEX, detail='full').convert()
+    assert result['success'], result.get('error')
+    
+    steps = {step['type']: step for step in reconstruct_steps(result['steps'])}
+    tree = steps['functions']['data']['syntaxTree']
+    assert tree_depth(tree) == len(LONG_REGEX) + 1  # Plus the end marker
+    assert tree['firstpos'] == [1]
+
+def test_long_regex_to_nfa_at_full_detail():
+    result = RegexToNFAConverter(LONG_REGEX, detail='full').convert()
+    assert result['success'], result.get('error')
+
+def test_merge_patch_round_trip():
+    source = {'a': 1, 'b': {'c': [1, 2], 'd': {'e': 'x'}}, 'f': 2}
+    target = {'a': 1, 'b': {'c': [1, 3], 'd': {'e': 'x'}}, 'g': 3}
+    patch = merge_patch(source, target)
+    assert patch == {'b': {'c': [1, 3]}, 'f': None, 'g': 3}
+    assert apply_merge_patch(source, patch) == target
+    # Merge patches cannot set a value to null
+    assert merge_patch(source, {**target, 'a': None}) is None
@@ -0,0 +1,33 @@
+import json
+
+from app.algorithms.dfa_to_regex import DFAToRegexConverter
+from app.algorithms.regex_to_dfa import RegexToDFAConverter
+from app.algorithms.step_trace import reconstruct_steps
+
+def stream(client, url, payload):
+    response = client.post(url, json=payload, headers={'Accept': 'application/x-ndjson', 'Cache-Control': 'no-store'})
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_ndjson_stream_matches_json_response(client):
+    payload = {'regex': '(a|b)*abb', 'minimize': True}
+    plain = client.post('/api/convert/regex-to-dfa', json=payload, headers={'Cache-Control': 'no-store'}).get_json()
+    events = stream(client, '/api/convert/regex-to-dfa', payload)
+    
+    assert [step['step'] for step in events[:-1]] == plain['steps']
+    assert events[-1] == {'result': {key: value for key, value in plain.items() if key != 'steps'}}
+    assert reconstruct_steps(plain['steps'])[-1]['data']['minimizedDFA'] == plain['dfa']
+
+def test_stream_reports_conversion_errors(client):
+    events = stream(client, '/api/convert/regex-to-dfa', {'regex': '(a|'})
+    assert all('step' in event for event in events[:-1])
+    assert events[-1] == {'result': {'success': False, 'derivatives': None, 'dfa': None,
+                                     'error': 'Unexpected end of regular expression at offset 3', 'errorOffset': 3}}
+
+def test_closing_iter_convert_stops_the_conversion():
+    dfa = RegexToDFAConverter('(a|b)*a(a|b){3}').build_dfa()
+    converter = DFAToRegexConverter(dfa)
+    events = converter.iter_convert()
+    assert next(events)[0] == 'step'
+    events.close()
+    assert converter.eliminated == []